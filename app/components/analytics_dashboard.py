@@ -1,12 +1,14 @@
 from datetime import datetime, timedelta
 
-import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models.database import Client, ClientStatus, Equipment
+from app.models.database import ClientStatus, Equipment
+from app.models.rollups import (SATISFACTION_BUCKET_WIDTH, CalibrationDailyRollup,
+                                CalibrationMonthlyRollup, ClientStatusRollup,
+                                SatisfactionHistogramRollup)
 
 
 class AnalyticsDashboard:
@@ -16,11 +18,16 @@ def __init__(self, db_session: Session):
     def render_client_metrics(self):
         """Renderiza métricas de clientes"""
         try:
-            # Total de clientes
-            total_clients = self.db.query(Client).count()
-            active_clients = self.db.query(Client).filter(
-                Client.status == ClientStatus.ACTIVE
-            ).count()
+            # Los totales se leen de los rollups por estado
+            status_rows = self.db.query(ClientStatusRollup).filter(
+                ClientStatusRollup.count > 0
+            ).all()
+            total_clients = sum(r.count for r in status_rows)
+            active_clients = sum(
+                r.count for r in status_rows
+                if r.status == ClientStatus.ACTIVE.value
+            )
+            scored = sum(r.satisfaction_count for r in status_rows)
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -28,21 +35,28 @@ def render_client_metrics(self):
             with col2:
                 st.metric("Clientes Activos", active_clients)
             with col3:
-                satisfaction = self.db.query(
-                    func.avg(Client.satisfaction_score)
-                ).scalar() or 0.0
+                satisfaction = (
+                    sum(r.satisfaction_sum for r in status_rows) / scored
+                    if scored else 0.0
+                )
                 st.metric("Satisfacción Promedio", f"{satisfaction:.1f}/5.0")
 
             # Gráfico de satisfacción
-            satisfaction_data = [
-                r[0] for r in self.db.query(Client.satisfaction_score).all()
-                if r[0] is not None
-            ]
-            if satisfaction_data:
-                fig = px.histogram(
-                    satisfaction_data,
-                    title="Distribución de Satisfacción"
-                )
+            histogram = self.db.query(
+                SatisfactionHistogramRollup.bucket,
+                SatisfactionHistogramRollup.count
+            ).filter(
+                SatisfactionHistogramRollup.count > 0
+            ).order_by(SatisfactionHistogramRollup.bucket).all()
+            if histogram:
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=[b + SATISFACTION_BUCKET_WIDTH / 2 for b, _ in histogram],
+                        y=[c for _, c in histogram],
+                        width=SATISFACTION_BUCKET_WIDTH
+                    )
+                ])
+                fig.update_layout(title="Distribución de Satisfacción")
                 st.plotly_chart(fig)
             else:
                 st.info("No hay datos de satisfacción disponibles")
@@ -55,9 +69,10 @@ def render_equipment_metrics(self):
         try:
             # Total equipos calibrados
             total_equipment = self.db.query(Equipment).count()
-            calibrated = self.db.query(Equipment).filter(
-                Equipment.calibration_date > datetime.now() - timedelta(days=365)
-            ).count()
+            since = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+            calibrated = self.db.query(
+                func.coalesce(func.sum(CalibrationDailyRollup.count), 0)
+            ).filter(CalibrationDailyRollup.day > since).scalar()
 
             col1, col2 = st.columns(2)
             with col1:
@@ -67,9 +82,11 @@ def render_equipment_metrics(self):
 
             # Gráfico de calibraciones por mes
             calibration_data = self.db.query(
-                func.strftime('%Y-%m', Equipment.calibration_date).label('month'),
-                func.count(Equipment.id).label('count')
-            ).group_by('month').all()
+                CalibrationMonthlyRollup.month,
+                CalibrationMonthlyRollup.count
+            ).filter(
+                CalibrationMonthlyRollup.count > 0
+            ).order_by(CalibrationMonthlyRollup.month).all()
 
             if calibration_data:
                 fig = go.Figure(data=[
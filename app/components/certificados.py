@@ -1,12 +1,18 @@
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.utils.logger import Logger
+from app.utils.metrics import STORE_OPERATION_SECONDS, timed
+from app.utils.tracing import traced
 
 
 class Certificados:
     def __init__(self):
         self._certificates: List[Dict] = []
+        # Versión de los datos; cambia con cada alta, modificación o baja
+        self._version = 0
+        self._aggregates: Optional[Tuple[int, Dict]] = None
         self._initialize_sample_data()
 
     def _initialize_sample_data(self) -> None:
@@ -144,6 +150,8 @@ def get_total(self) -> int:
         """
         return len(self._certificates)
 
+    @traced('certificados.get_certificates')
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='get_certificates')
     def get_certificates(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Obtiene la lista de certificados.
@@ -165,6 +173,7 @@ def get_certificates(self, limit: Optional[int] = None) -> List[Dict]:
             Logger.error(f"Error obteniendo certificados: {str(e)}")
             return []
 
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='add_certificate')
     def add_certificate(self, certificate: Dict) -> None:
         """
         Agrega un nuevo certificado.
@@ -178,11 +187,13 @@ def add_certificate(self, certificate: Dict) -> None:
             if 'status' not in certificate:
                 certificate['status'] = 'pending'
             self._certificates.append(certificate)
+            self._version += 1
             Logger.info(f"Certificado agregado: {certificate.get('id', 'unknown')}")
         except Exception as e:
             Logger.error(f"Error al agregar certificado: {str(e)}")
             raise
 
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='get_certificate_by_id')
     def get_certificate_by_id(self, certificate_id: str) -> Optional[Dict]:
         """
         Busca un certificado por su ID.
@@ -202,6 +213,7 @@ def get_certificate_by_id(self, certificate_id: str) -> Optional[Dict]:
             Logger.error(f"Error al buscar certificado {certificate_id}: {str(e)}")
             return None
 
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='update_certificate')
     def update_certificate(self, certificate_id: str, updates: Dict) -> bool:
         """
         Actualiza un certificado existente.
@@ -217,6 +229,7 @@ def update_certificate(self, certificate_id: str, updates: Dict) -> bool:
             for cert in self._certificates:
                 if cert['id'] == certificate_id:
                     cert.update(updates)
+                    self._version += 1
                     Logger.info(f"Certificado {certificate_id} actualizado")
                     return True
             return False
@@ -224,6 +237,7 @@ def update_certificate(self, certificate_id: str, updates: Dict) -> bool:
             Logger.error(f"Error actualizando certificado {certificate_id}: {str(e)}")
             return False
 
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='delete_certificate')
     def delete_certificate(self, certificate_id: str) -> bool:
         """
         Elimina un certificado.
@@ -242,6 +256,7 @@ def delete_certificate(self, certificate_id: str) -> bool:
             ]
             deleted = len(self._certificates) < initial_length
             if deleted:
+                self._version += 1
                 Logger.info(f"Certificado {certificate_id} eliminado")
             return deleted
         except Exception as e:
@@ -264,3 +279,99 @@ def get_status_stats(self) -> Dict[str, int]:
         except Exception as e:
             Logger.error(f"Error obteniendo estadísticas de estados: {str(e)}")
             return {}
+
+    @property
+    def version(self) -> int:
+        """Versión actual de los datos de certificados"""
+        return self._version
+
+    @traced('certificados.get_aggregates')
+    @timed(STORE_OPERATION_SECONDS, store='certificados', operation='get_aggregates')
+    def get_aggregates(self) -> Dict:
+        """
+        Obtiene todas las métricas agregadas de los certificados.
+
+        Se calculan en una sola pasada y se reutilizan mientras los datos
+        no cambien.
+
+        Returns:
+            Dict: Totales por norma y ubicación, conteos por tipo, ubicación,
+            estado y mes, y fechas de próxima calibración ordenadas
+        """
+        cached = self._aggregates
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        try:
+            version = self._version
+            aggregates = self._compute_aggregates()
+            self._aggregates = (version, aggregates)
+            return aggregates
+        except Exception as e:
+            Logger.error(f"Error calculando agregados de certificados: {str(e)}")
+            return self._empty_aggregates()
+
+    def count_due_for_recalibration(self, days: int = 30) -> int:
+        """
+        Cuenta los certificados cuya próxima calibración vence en menos de
+        los días indicados (incluye los ya vencidos).
+
+        Args:
+            days: Ventana en días
+
+        Returns:
+            int: Cantidad de certificados
+        """
+        limit = datetime.now() + timedelta(days=days)
+        return bisect_left(self.get_aggregates()['next_calibrations'], limit)
+
+    @staticmethod
+    def _empty_aggregates() -> Dict:
+        """Estructura de agregados sin datos"""
+        return {
+            'total': 0,
+            'oiml': 0,
+            'iso_17025': 0,
+            'onsite': 0,
+            'by_type': {},
+            'by_location': {},
+            'by_status': {},
+            'by_month': {},
+            'next_calibrations': []
+        }
+
+    def _compute_aggregates(self) -> Dict:
+        """Recorre los certificados una vez y calcula todas las facetas"""
+        aggregates = self._empty_aggregates()
+        by_type = aggregates['by_type']
+        by_location = aggregates['by_location']
+        by_status = aggregates['by_status']
+        by_month = aggregates['by_month']
+
+        for cert in self.get_certificates():
+            details = cert.get('details', {})
+            norma = details.get('norma', '')
+            location = details.get('location', 'No especificado')
+
+            aggregates['total'] += 1
+            if "OIML" in norma:
+                aggregates['oiml'] += 1
+            if "17025" in norma:
+                aggregates['iso_17025'] += 1
+            if location == 'Instalaciones del Cliente':
+                aggregates['onsite'] += 1
+
+            service_type = cert.get('type', 'Otros')
+            by_type[service_type] = by_type.get(service_type, 0) + 1
+            by_location[location] = by_location.get(location, 0) + 1
+            status = cert.get('status', 'unknown')
+            by_status[status] = by_status.get(status, 0) + 1
+            month = cert['created_at'].strftime('%Y-%m')
+            by_month[month] = by_month.get(month, 0) + 1
+
+            if cert.get('next_calibration'):
+                aggregates['next_calibrations'].append(cert['next_calibration'])
+
+        aggregates['by_month'] = dict(sorted(by_month.items()))
+        aggregates['next_calibrations'].sort()
+        return aggregates
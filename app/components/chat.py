@@ -1,25 +1,46 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 import streamlit as st
 
+from app.config.configuration import Configuration
+from app.services.context_builder import ContextBuilder
+from app.services.conversation_store import DEFAULT_PAGE_SIZE, ConversationStore
 from app.services.factory import ServiceFactory
-from app.utils.cache import cached
+from app.services.response_cache import ResponseCache
+from app.services.router import RouterService
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class Chat:
     def __init__(self):
         self.service_factory = ServiceFactory()
+        self.response_cache = ResponseCache()
+        self.store = ConversationStore()
+        self.context_builder = ContextBuilder(self.store)
+        self.config = Configuration()
+        self.page_size = int(
+            (self.config.get_setting('chat') or {}).get('history_page_size', DEFAULT_PAGE_SIZE)
+        )
         self._initialize_state()
 
     def _initialize_state(self) -> None:
         """Inicializa el estado del chat"""
-        if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
+        if 'conversation_id' not in st.session_state:
+            # La conversación se retoma desde la URL tras recargar la página
+            conversation_id = st.query_params.get('conversation')
+            if not conversation_id or not self.store.exists(conversation_id):
+                conversation_id = self.store.create_conversation()
+            st.session_state.conversation_id = conversation_id
+            st.query_params['conversation'] = conversation_id
+        if 'chat_pages' not in st.session_state:
+            st.session_state.chat_pages = 1
         if 'current_provider' not in st.session_state:
-            st.session_state.current_provider = "openai"
+            st.session_state.current_provider = (
+                self.config.get_setting('default_provider') or "openai"
+            )
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la interfaz del chat"""
         try:
@@ -49,8 +70,17 @@ def render(self) -> None:
             st.error("Error en el chat")
 
     def _render_chat_history(self) -> None:
-        """Renderiza el historial del chat"""
-        for message in st.session_state.chat_history:
+        """Renderiza las páginas cargadas del historial, de la más reciente hacia atrás"""
+        limit = self.page_size * st.session_state.chat_pages
+        # Se pide un mensaje extra para saber si hay más páginas
+        messages = self.store.get_messages(st.session_state.conversation_id, limit=limit + 1)
+        if len(messages) > limit:
+            messages = messages[1:]
+            if st.button("⬆️ Cargar mensajes anteriores"):
+                st.session_state.chat_pages += 1
+                st.rerun()
+
+        for message in messages:
             with st.chat_message(message["role"]):
                 st.write(message["content"])
                 st.caption(f"via {message['provider']} - {message['timestamp']}")
@@ -64,10 +94,15 @@ def _handle_user_input(self, user_input: str) -> None:
         """
         try:
             # Agregar mensaje del usuario al historial
-            self._add_message("user", user_input)
+            saved = self._add_message("user", user_input)
+            with st.chat_message("user"):
+                st.write(user_input)
 
-            # Obtener respuesta del modelo
-            response = self._get_ai_response(user_input)
+            # Mostrar la respuesta a medida que llega
+            with st.chat_message("assistant"):
+                response = st.write_stream(
+                    self._stream_ai_response(user_input, before_id=saved['id'])
+                )
 
             # Agregar respuesta al historial
             self._add_message("assistant", response)
@@ -76,35 +111,60 @@ def _handle_user_input(self, user_input: str) -> None:
             Logger.error(f"Error procesando mensaje: {str(e)}")
             st.error("Error procesando tu mensaje")
 
-    def _add_message(self, role: str, content: str) -> None:
+    def _add_message(self, role: str, content: str) -> Dict:
         """
-        Agrega un mensaje al historial.
+        Agrega un mensaje al historial persistido.
 
         Args:
             role: El rol del mensaje (user/assistant)
             content: El contenido del mensaje
+
+        Returns:
+            El mensaje guardado, con su id
         """
-        st.session_state.chat_history.append({
-            "role": role,
-            "content": content,
-            "provider": st.session_state.current_provider,
-            "timestamp": datetime.now().strftime("%H:%M")
-        })
-
-    @cached(ttl=60)
-    def _get_ai_response(self, message: str) -> str:
+        provider = st.session_state.current_provider
+        if provider == "router" and role == "assistant":
+            backend = self.service_factory.get_service(provider).backend_for(
+                st.session_state.conversation_id
+            )
+            if backend:
+                provider = f"router → {backend}"
+
+        return self.store.add_message(st.session_state.conversation_id, role, content, provider)
+
+    def _build_prompt(self, message: str, provider: str, before_id: Optional[int] = None) -> str:
+        """Mensaje con el contexto de la conversación, acotado al límite del proveedor"""
+        return self.context_builder.build_prompt(
+            st.session_state.conversation_id, message, provider, before_id
+        )
+
+    def _stream_ai_response(self, message: str, before_id: Optional[int] = None) -> Iterator[str]:
         """
-        Obtiene respuesta del modelo con caché.
+        Obtiene la respuesta del modelo en fragmentos.
 
         Args:
             message: El mensaje del usuario
+            before_id: Id del mensaje ya guardado, para no repetirlo en el contexto
 
-        Returns:
-            La respuesta del modelo
+        Yields:
+            Fragmentos de la respuesta
         """
         try:
-            service = self.service_factory.get_service(st.session_state.current_provider)
-            return service.get_completion(message)
+            provider = st.session_state.current_provider
+            service = self.service_factory.get_service(provider)
+            model = getattr(service, 'model', '')
+            prompt = self._build_prompt(message, provider, before_id)
+            cached_response = self.response_cache.get(prompt, provider, model)
+            if cached_response is not None:
+                yield cached_response
+                return
+
+            chunks: List[str] = []
+            with RouterService.session(st.session_state.conversation_id):
+                for chunk in service.stream_completion(prompt):
+                    chunks.append(chunk)
+                    yield chunk
+            self.response_cache.put(prompt, provider, model, ''.join(chunks))
         except Exception as e:
             Logger.error(f"Error obteniendo respuesta: {str(e)}")
-            return "Lo siento, hubo un error procesando tu mensaje."
+            yield "Lo siento, hubo un error procesando tu mensaje."
@@ -8,6 +8,8 @@
 from app.components.certificados import Certificados
 from app.components.solicitudes import Solicitudes
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
+from app.utils.tracing import Tracer
 
 
 class DashboardWidgets:
@@ -88,61 +90,45 @@ def _add_sample_data(self) -> None:
             Logger.error(f"Error agregando datos de ejemplo: {str(e)}")
             raise
 
+    @render_timing()
     def show_metrics_card(self) -> None:
         """Muestra tarjeta de métricas principales"""
         try:
             col1, col2, col3, col4, col5 = st.columns(5)
+            aggregates = self.certificados.get_aggregates()
 
             with col1:
-                total_equipment = len(self.certificados.get_certificates())
                 st.metric(
                     "Total Calibraciones",
-                    total_equipment,
+                    aggregates['total'],
                     help="Total de equipos calibrados"
                 )
 
             with col2:
-                oiml_certified = len([
-                    c for c in self.certificados.get_certificates()
-                    if "OIML" in c.get('details', {}).get('norma', '')
-                ])
                 st.metric(
                     "Cert. OIML",
-                    oiml_certified,
+                    aggregates['oiml'],
                     help="Calibraciones bajo normas OIML"
                 )
 
             with col3:
-                iso_certified = len([
-                    c for c in self.certificados.get_certificates()
-                    if "17025" in c.get('details', {}).get('norma', '')
-                ])
                 st.metric(
                     "ISO 17025",
-                    iso_certified,
+                    aggregates['iso_17025'],
                     help="Calibraciones bajo ISO/IEC 17025:2017"
                 )
 
             with col4:
-                onsite = len([
-                    c for c in self.certificados.get_certificates()
-                    if c.get('details', {}).get('location') == 'Instalaciones del Cliente'
-                ])
                 st.metric(
                     "In Situ",
-                    onsite,
+                    aggregates['onsite'],
                     help="Calibraciones realizadas en instalaciones del cliente"
                 )
 
             with col5:
-                recalibration = len([
-                    c for c in self.certificados.get_certificates()
-                    if c.get('next_calibration') and
-                    (c['next_calibration'] - datetime.now()).days < 30
-                ])
                 st.metric(
                     "Próximas",
-                    recalibration,
+                    self.certificados.count_due_for_recalibration(30),
                     help="Calibraciones programadas próximos 30 días"
                 )
 
@@ -150,6 +136,7 @@ def show_metrics_card(self) -> None:
             Logger.error(f"Error mostrando métricas: {str(e)}")
             st.error("Error al mostrar métricas")
 
+    @render_timing()
     def show_requests_timeline(self) -> None:
         """Muestra línea de tiempo de calibraciones"""
         try:
@@ -208,35 +195,37 @@ def _show_filtered_timeline(self, tipo_filtro: List[str], cliente_filtro: str, e
             dates = [cert.get('created_at', datetime.now()) for cert in filtered_certs]
             types = [cert.get('type', 'N/A') for cert in filtered_certs]
 
-            fig = go.Figure()
-
-            # Agregar línea de tiempo
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=types,
-                mode='markers',
-                name='Calibraciones',
-                marker=dict(
-                    size=12,
-                    symbol='circle'
+            with Tracer.start_span("plotly.figure", chart="calibration_timeline"):
+                fig = go.Figure()
+
+                # Agregar línea de tiempo
+                fig.add_trace(go.Scatter(
+                    x=dates,
+                    y=types,
+                    mode='markers',
+                    name='Calibraciones',
+                    marker=dict(
+                        size=12,
+                        symbol='circle'
+                    )
+                ))
+
+                # Configurar layout
+                fig.update_layout(
+                    title="Línea de Tiempo de Calibraciones",
+                    xaxis_title="Fecha",
+                    yaxis_title="Tipo de Equipo",
+                    height=400,
+                    showlegend=True
                 )
-            ))
-
-            # Configurar layout
-            fig.update_layout(
-                title="Línea de Tiempo de Calibraciones",
-                xaxis_title="Fecha",
-                yaxis_title="Tipo de Equipo",
-                height=400,
-                showlegend=True
-            )
 
             # Mostrar gráfico
             st.plotly_chart(fig, use_container_width=True)
 
             # Mostrar tabla de detalles
             if st.checkbox("Ver detalles de calibraciones"):
-                df = pd.DataFrame(filtered_certs)
+                with Tracer.start_span("pandas.dataframe", rows=len(filtered_certs)):
+                    df = pd.DataFrame(filtered_certs)
                 st.dataframe(
                     df,
                     column_config={
@@ -252,6 +241,7 @@ def _show_filtered_timeline(self, tipo_filtro: List[str], cliente_filtro: str, e
             Logger.error(f"Error mostrando timeline filtrado: {str(e)}")
             st.error("Error al mostrar línea de tiempo")
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza el dashboard"""
         try:
@@ -316,28 +306,24 @@ def render(self) -> None:
     def _render_service_distribution(self) -> None:
         """Renderiza distribución por tipo de servicio"""
         try:
-            certificates = self.certificados.get_certificates()
-            if not certificates:
+            service_counts = self.certificados.get_aggregates()['by_type']
+            if not service_counts:
                 st.info("No hay datos disponibles")
                 return
 
-            service_counts = {}
-            for cert in certificates:
-                service_type = cert.get('type', 'Otros')
-                service_counts[service_type] = service_counts.get(service_type, 0) + 1
-
-            fig = go.Figure(data=[
-                go.Pie(
-                    labels=list(service_counts.keys()),
-                    values=list(service_counts.values()),
-                    hole=.3
+            with Tracer.start_span("plotly.figure", chart="service_distribution"):
+                fig = go.Figure(data=[
+                    go.Pie(
+                        labels=list(service_counts.keys()),
+                        values=list(service_counts.values()),
+                        hole=.3
+                    )
+                ])
+                fig.update_layout(
+                    title="Distribución por Tipo de Servicio",
+                    height=350,
+                    margin=dict(t=30, b=0, l=0, r=0)
                 )
-            ])
-            fig.update_layout(
-                title="Distribución por Tipo de Servicio",
-                height=350,
-                margin=dict(t=30, b=0, l=0, r=0)
-            )
             st.plotly_chart(fig, use_container_width=True)
 
         except Exception as e:
@@ -347,30 +333,26 @@ def _render_service_distribution(self) -> None:
     def _render_location_distribution(self) -> None:
         """Renderiza distribución por ubicación"""
         try:
-            certificates = self.certificados.get_certificates()
-            if not certificates:
+            location_counts = self.certificados.get_aggregates()['by_location']
+            if not location_counts:
                 st.info("No hay datos disponibles")
                 return
 
-            location_counts = {}
-            for cert in certificates:
-                location = cert.get('details', {}).get('location', 'No especificado')
-                location_counts[location] = location_counts.get(location, 0) + 1
-
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=list(location_counts.keys()),
-                    y=list(location_counts.values()),
-                    text=list(location_counts.values()),
-                    textposition='auto',
+            with Tracer.start_span("plotly.figure", chart="location_distribution"):
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=list(location_counts.keys()),
+                        y=list(location_counts.values()),
+                        text=list(location_counts.values()),
+                        textposition='auto',
+                    )
+                ])
+                fig.update_layout(
+                    title="Calibraciones por Ubicación",
+                    height=350,
+                    margin=dict(t=30, b=0, l=0, r=0),
+                    showlegend=False
                 )
-            ])
-            fig.update_layout(
-                title="Calibraciones por Ubicación",
-                height=350,
-                margin=dict(t=30, b=0, l=0, r=0),
-                showlegend=False
-            )
             st.plotly_chart(fig, use_container_width=True)
 
         except Exception as e:
@@ -8,6 +8,8 @@
 from app.components.dashboard_widgets import DashboardWidgets
 from app.components.solicitudes import Solicitudes
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
+from app.utils.tracing import Tracer
 
 
 class MetricsDashboard:
@@ -17,11 +19,14 @@ def __init__(self):
                 self.solicitudes = Solicitudes()
                 self.certificados = Certificados()
                 self.widgets = DashboardWidgets(self.solicitudes, self.certificados)
+                # Compartir el almacén de los widgets para reutilizar sus agregados
+                self.certificados = self.widgets.certificados
                 self._initialized = True
             except Exception as e:
                 Logger.error(f"Error inicializando MetricsDashboard: {str(e)}")
                 raise
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza el dashboard de métricas"""
         try:
@@ -51,24 +56,19 @@ def _render_service_stats(self) -> None:
         """Renderiza estadísticas de servicios"""
         try:
             st.subheader("Análisis de Servicios")
-            certificates = self.certificados.get_certificates()
+            service_counts = self.certificados.get_aggregates()['by_type']
 
-            if not certificates:
+            if not service_counts:
                 st.info("No hay datos disponibles")
                 return
 
-            # Contar servicios por tipo
-            service_counts = {}
-            for cert in certificates:
-                service_type = cert.get('type', 'Otros')
-                service_counts[service_type] = service_counts.get(service_type, 0) + 1
-
             # Crear gráfico
-            fig = px.pie(
-                values=list(service_counts.values()),
-                names=list(service_counts.keys()),
-                title="Distribución de Servicios"
-            )
+            with Tracer.start_span("plotly.figure", chart="service_stats"):
+                fig = px.pie(
+                    values=list(service_counts.values()),
+                    names=list(service_counts.keys()),
+                    title="Distribución de Servicios"
+                )
             st.plotly_chart(fig, use_container_width=True)
 
         except Exception as e:
@@ -119,21 +119,17 @@ def _render_detailed_analysis(self) -> None:
     def _render_status_distribution(self) -> None:
         """Renderiza distribución por estado"""
         try:
-            certificates = self.certificados.get_certificates()
-            if not certificates:
+            status_counts = self.certificados.get_aggregates()['by_status']
+            if not status_counts:
                 st.info("No hay datos disponibles")
                 return
 
-            status_counts = {}
-            for cert in certificates:
-                status = cert.get('status', 'unknown')
-                status_counts[status] = status_counts.get(status, 0) + 1
-
-            fig = px.pie(
-                values=list(status_counts.values()),
-                names=list(status_counts.keys()),
-                title="Estado de Certificaciones"
-            )
+            with Tracer.start_span("plotly.figure", chart="status_distribution"):
+                fig = px.pie(
+                    values=list(status_counts.values()),
+                    names=list(status_counts.keys()),
+                    title="Estado de Certificaciones"
+                )
             st.plotly_chart(fig, use_container_width=True)
 
         except Exception as e:
@@ -143,22 +139,18 @@ def _render_status_distribution(self) -> None:
     def _render_timeline_analysis(self) -> None:
         """Renderiza análisis de línea de tiempo"""
         try:
-            certificates = self.certificados.get_certificates()
-            if not certificates:
+            # Agrupado por mes
+            monthly_data = self.certificados.get_aggregates()['by_month']
+            if not monthly_data:
                 st.info("No hay datos disponibles")
                 return
 
-            # Agrupar por mes
-            monthly_data = {}
-            for cert in certificates:
-                month = cert['created_at'].strftime('%Y-%m')
-                monthly_data[month] = monthly_data.get(month, 0) + 1
-
-            fig = px.line(
-                x=list(monthly_data.keys()),
-                y=list(monthly_data.values()),
-                title="Tendencia Mensual de Certificaciones"
-            )
+            with Tracer.start_span("plotly.figure", chart="monthly_trend"):
+                fig = px.line(
+                    x=list(monthly_data.keys()),
+                    y=list(monthly_data.values()),
+                    title="Tendencia Mensual de Certificaciones"
+                )
             st.plotly_chart(fig, use_container_width=True)
 
         except Exception as e:
@@ -4,6 +4,7 @@
 import streamlit as st
 
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class Notifications:
@@ -17,6 +18,7 @@ def _initialize_state(self) -> None:
         if 'last_notification_check' not in st.session_state:
             st.session_state.last_notification_check = datetime.now()
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza el panel de notificaciones"""
         try:
@@ -11,6 +11,7 @@
 from app.components.solicitudes import Solicitudes
 from app.utils.cache import CacheManager
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class ReportGenerator:
@@ -28,6 +29,7 @@ def _initialize_state(self) -> None:
         if 'last_report_type' not in st.session_state:
             st.session_state.last_report_type = None
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la interfaz del generador de reportes"""
         try:
@@ -6,6 +6,7 @@
 
 from app.components.auth import Auth
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class Sidebar:
@@ -45,6 +46,7 @@ def _get_logo_base64(self) -> str:
             Logger.error(f"Error cargando logo: {str(e)}")
             return ""
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la barra lateral"""
         try:
@@ -2,6 +2,7 @@
 from typing import Dict, List, Optional
 
 from app.utils.logger import Logger
+from app.utils.metrics import STORE_OPERATION_SECONDS, timed
 
 
 class Solicitudes:
@@ -159,6 +160,7 @@ def get_total(self) -> int:
         """
         return len(self._requests)
 
+    @timed(STORE_OPERATION_SECONDS, store='solicitudes', operation='get_requests')
     def get_requests(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Obtiene la lista de solicitudes.
@@ -180,6 +182,7 @@ def get_requests(self, limit: Optional[int] = None) -> List[Dict]:
             Logger.error(f"Error obteniendo solicitudes: {str(e)}")
             return []
 
+    @timed(STORE_OPERATION_SECONDS, store='solicitudes', operation='add_request')
     def add_request(self, request: Dict) -> None:
         """
         Agrega una nueva solicitud.
@@ -198,6 +201,7 @@ def add_request(self, request: Dict) -> None:
             Logger.error(f"Error al agregar solicitud: {str(e)}")
             raise
 
+    @timed(STORE_OPERATION_SECONDS, store='solicitudes', operation='get_request_by_id')
     def get_request_by_id(self, request_id: str) -> Optional[Dict]:
         """
         Busca una solicitud por su ID.
@@ -217,6 +221,7 @@ def get_request_by_id(self, request_id: str) -> Optional[Dict]:
             Logger.error(f"Error buscando solicitud {request_id}: {str(e)}")
             return None
 
+    @timed(STORE_OPERATION_SECONDS, store='solicitudes', operation='update_request')
     def update_request(self, request_id: str, updates: Dict) -> bool:
         """
         Actualiza una solicitud existente.
@@ -239,6 +244,7 @@ def update_request(self, request_id: str, updates: Dict) -> bool:
             Logger.error(f"Error actualizando solicitud {request_id}: {str(e)}")
             return False
 
+    @timed(STORE_OPERATION_SECONDS, store='solicitudes', operation='delete_request')
     def delete_request(self, request_id: str) -> bool:
         """
         Elimina una solicitud.
@@ -15,28 +15,140 @@ def __init__(self):
                 "openai": {
                     "api_key": "",
                     "available_models": ["gpt-3.5-turbo", "gpt-4"],
-                    "max_tokens": 2048
+                    "max_tokens": 2048,
+                    "max_concurrency": 8,
+                    "requests_per_minute": 0,  # 0 = sin límite
+                    "tokens_per_minute": 0,
+                    "daily_budget": 0,  # USD; 0 = sin límite
+                    "max_connections": 10,
+                    "max_keepalive": 5,
+                    "keepalive_expiry": 30,
+                    "http2": True
                 },
                 "vertex": {
                     "project_id": "",
                     "location": "us-central1",
                     "available_models": ["text-bison", "chat-bison"],
-                    "max_tokens": 1024
+                    "max_tokens": 1024,
+                    "max_concurrency": 8,
+                    "requests_per_minute": 0,  # 0 = sin límite
+                    "tokens_per_minute": 0,
+                    "daily_budget": 0,  # USD; 0 = sin límite
+                    "max_connections": 10,
+                    "max_keepalive": 5,
+                    "keepalive_expiry": 30,
+                    "http2": True
                 },
                 "sambanova": {
                     "api_key": "",
                     "endpoint": "",
                     "available_models": ["basic", "advanced"],
-                    "max_tokens": 2048
+                    "max_tokens": 2048,
+                    "max_concurrency": 8,
+                    "requests_per_minute": 0,  # 0 = sin límite
+                    "tokens_per_minute": 0,
+                    "daily_budget": 0,  # USD; 0 = sin límite
+                    "max_connections": 10,
+                    "max_keepalive": 5,
+                    "keepalive_expiry": 30,
+                    "http2": True
                 }
             },
-            "default_provider": "openai",
+            "default_provider": "router",
+            "router": {
+                "backends": ["openai", "vertex", "sambanova"],
+                "ewma_alpha": 0.2,
+                "failure_threshold": 5,  # fallos consecutivos para abrir el circuito
+                "open_seconds": 30,
+                "sticky_ttl": 1800
+            },
             "request_timeout": 30,
             "max_retries": 3,
             "retry_delay": 1,
+            "rate_limiting": {
+                "backend": "memory",  # o "redis" para compartir la cuota entre procesos
+                "redis_url": "redis://localhost:6379/0",
+                "on_limit": "queue",  # o "fail"
+                "max_wait": 10
+            },
+            "resilience": {
+                "max_backoff": 10,
+                "retry_budget": 0.2,  # reintentos por llamada, como máximo
+                "hedging": False,
+                "hedge_percentile": 95,
+                "hedge_min_samples": 20,
+                "attempt_threads": 32,  # hilos para intentos síncronos, entre todos los proveedores
+                "max_abandoned_attempts": 8  # intentos vencidos en curso por proveedor
+            },
+            "chat": {
+                "history_page_size": 20,
+                "response_token_reserve": 0.25,  # fracción de max_tokens para la respuesta
+                "summary_token_ratio": 0.2
+            },
+            "response_cache": {
+                "enabled": True,
+                "ttl": 3600,
+                "max_entries": 2000,
+                "near_duplicates": False,
+                "similarity": 0.9,  # Jaccard estimado mínimo para reutilizar
+                "num_perm": 64,
+                "bands": 16
+            },
+            "usage": {
+                "flush_interval": 5,
+                "batch_size": 200,
+                "downgrade_ratio": 0.8,  # fracción del presupuesto diario
+                # USD por 1000 tokens: [entrada, salida]
+                "prices": {
+                    "gpt-3.5-turbo": [0.0005, 0.0015],
+                    "gpt-4": [0.03, 0.06],
+                    "text-bison": [0.0005, 0.0005],
+                    "chat-bison": [0.0005, 0.0005]
+                }
+            },
+            # Proveedor simulado de las pruebas de carga (app.services.mock_service)
+            "mock_provider": {
+                "latency": "lognormal",  # fixed, lognormal o pareto
+                "median_latency": 0.4,
+                "sigma": 0.6,
+                "pareto_alpha": 2.0,
+                "tail_probability": 0.0,
+                "tail_multiplier": 10,
+                "error_rate": 0.0,
+                "tokens_per_second": 50,
+                "response_tokens": 60
+            },
+            "triage": {
+                "enabled": True,
+                "provider": None,  # None = default_provider
+                "queue_size": 100
+            },
+            "turnaround": {
+                "instance_id": None,  # None = ACMA_INSTANCE_ID o <host>-<pid>; único por proceso
+                "flush_interval": 5,
+                "retention_days": 30  # luego se pasa al histórico
+            },
             "performance": {
                 "cache_ttl": 300,
-                "max_threads": 4
+                "max_threads": 4,
+                "warm_up_services": True,
+                "render_timing": False,
+                # Habilita ?profile=1: cProfile de un único rerun, solo con sesión iniciada
+                "profiling": False
+            },
+            "monitoring": {
+                # El endpoint /metrics no tiene autenticación: apagado por
+                # defecto y solo en loopback salvo que se indique otra interfaz
+                "metrics_enabled": False,
+                "metrics_host": "127.0.0.1",  # "0.0.0.0" expone en todas las interfaces
+                "metrics_port": 9464
+            },
+            "tracing": {
+                "enabled": False,
+                "sample_rate": 0.1,
+                "exporter": "jsonl",  # o "otlp"
+                "path": "logs/traces.jsonl",
+                "otlp_endpoint": "http://localhost:4318/v1/traces"
             },
             "notifications": {
                 "enable_email": False,
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -13,7 +14,12 @@
 
 # Importaciones del proyecto
 from app.config.configuration import Configuration
+from app.services.factory import ServiceFactory
+from app.services.usage_ledger import usage_context
 from app.utils.logger import Logger
+from app.utils.metrics import PAGE_RENDER_SECONDS, MetricsRegistry
+from app.utils.profiling import PROFILE, TIMING, RenderProfiler, render_timing
+from app.utils.tracing import Tracer
 
 
 class ACMADashboard:
@@ -56,34 +62,80 @@ def setup_session_state(self) -> None:
 
     def render(self) -> None:
         """Renderiza el dashboard"""
+        start = time.perf_counter()
+        current_page = st.session_state.get('current_page', 'home')
+        profiler = RenderProfiler(self._profiling_mode(), name="ACMADashboard.render")
         try:
-            self.sidebar.render()
-
-            if not st.session_state.authenticated:
-                st.warning("Por favor inicia sesión para acceder al dashboard")
-                return
-
-            current_page = st.session_state.get('current_page', 'home')
-
-            # Renderizar la página correspondiente
-            if current_page == "home":
-                self.metrics.render()
-            elif current_page == "clients":
-                from app.pages.clients import render_clients_page
-                render_clients_page()
-            elif current_page == "certificates":
-                self.certificados_page()
-            elif current_page == "requests":
-                self.requests_page()
-            elif current_page == "settings":
-                self.settings_page()
-            else:
-                st.error("Página no encontrada")
-
+            with profiler, Tracer.start_span("ACMADashboard.render", page=current_page), \
+                    usage_context(page=current_page, user=st.session_state.get('username')):
+                self._render_current_page()
         except Exception as e:
             Logger.error(f"Error en dashboard: {str(e)}")
             st.error("Error cargando el dashboard")
-
+        finally:
+            PAGE_RENDER_SECONDS.labels(current_page).observe(time.perf_counter() - start)
+
+        if profiler.active:
+            self._render_profile_report(profiler)
+
+    def _render_current_page(self) -> None:
+        """Renderiza la barra lateral y la página seleccionada"""
+        self.sidebar.render()
+
+        if not st.session_state.authenticated:
+            st.warning("Por favor inicia sesión para acceder al dashboard")
+            return
+
+        current_page = st.session_state.get('current_page', 'home')
+
+        # Renderizar la página correspondiente
+        if current_page == "home":
+            self.metrics.render()
+        elif current_page == "clients":
+            from app.pages.clients import render_clients_page
+            render_clients_page()
+        elif current_page == "certificates":
+            self.certificados_page()
+        elif current_page == "requests":
+            self.requests_page()
+        elif current_page == "settings":
+            self.settings_page()
+        else:
+            st.error("Página no encontrada")
+
+    def _profiling_mode(self) -> Optional[str]:
+        """
+        Determina el modo de perfilado del rerun. Con performance.profiling
+        habilitado, ?profile=1 en la URL captura cProfile de ese rerun (solo
+        con sesión iniciada); el parámetro se quita para que el siguiente
+        rerun no se perfile. performance.render_timing activa solo el árbol
+        de tiempos.
+        """
+        performance = self.config.get_setting('performance') or {}
+        if st.query_params.get('profile') in ('1', 'true'):
+            del st.query_params['profile']
+            if performance.get('profiling') and st.session_state.get('authenticated'):
+                return PROFILE
+        if performance.get('render_timing'):
+            return TIMING
+        return None
+
+    def _render_profile_report(self, profiler: RenderProfiler) -> None:
+        """Muestra el árbol de tiempos y, si corresponde, las estadísticas de cProfile"""
+        with st.expander("⏱️ Perfil de renderizado", expanded=False):
+            if profiler.notice:
+                st.info(profiler.notice)
+            st.dataframe(profiler.span_rows(), hide_index=True, use_container_width=True)
+            if profiler.profile is not None:
+                st.code(profiler.stats_text(), language="text")
+                st.download_button(
+                    "Descargar .pstats",
+                    data=profiler.stats_bytes(),
+                    file_name=f"rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats",
+                    mime="application/octet-stream"
+                )
+
+    @render_timing()
     def certificados_page(self) -> None:
         """Renderiza la página de certificados"""
         try:
@@ -120,12 +172,28 @@ def settings_page(self) -> None:
         settings_page.render()
 
 
+@st.cache_resource(show_spinner=False)
+def _warm_up_services() -> bool:
+    """Precalienta los proveedores de IA una sola vez por proceso, no en cada rerun"""
+    ServiceFactory.warm_up()
+    return True
+
+
 def main():
     """Función principal de la aplicación"""
     try:
         # Cambiar al directorio del proyecto
         os.chdir(project_dir)
 
+        config = Configuration()
+        monitoring = config.get_setting('monitoring') or {}
+        if monitoring.get('metrics_enabled'):
+            MetricsRegistry.start_http_server(monitoring.get('metrics_port', 9464),
+                                              monitoring.get('metrics_host') or '127.0.0.1')
+        Tracer.configure(config.get_setting('tracing'))
+        if (config.get_setting('performance') or {}).get('warm_up_services'):
+            _warm_up_services()
+
         dashboard = ACMADashboard()
         dashboard.render()
     except Exception as e:
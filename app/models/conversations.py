@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.models.database import Base
+
+
+class Conversation(Base):
+    __tablename__ = 'conversations'
+
+    id = Column(String(32), primary_key=True)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now)
+    # Resumen de los turnos que ya no entran en la ventana de contexto
+    summary = Column(Text, nullable=False, default='')
+    summarized_until = Column(Integer, nullable=False, default=0)  # id del último mensaje resumido
+
+    messages = relationship("ConversationMessage", back_populates="conversation")
+
+
+class ConversationMessage(Base):
+    __tablename__ = 'conversation_messages'
+    __table_args__ = (
+        # Paginación por keyset: mensajes de una conversación ordenados por id
+        Index('ix_conversation_messages_conversation_id_id', 'conversation_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    conversation_id = Column(String(32), ForeignKey('conversations.id'), nullable=False)
+    role = Column(String(16), nullable=False)  # user / assistant
+    content = Column(Text, nullable=False)
+    provider = Column(String, nullable=True)
+    tokens = Column(Integer, nullable=False, default=0)  # estimación al guardar
+    created_at = Column(DateTime, default=datetime.now)
+
+    conversation = relationship("Conversation", back_populates="messages")
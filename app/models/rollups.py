@@ -0,0 +1,293 @@
+"""
+Tablas de rollup mantenidas en forma incremental por listeners del ORM.
+
+Los listeners solo ven las operaciones por objeto (session.add, cambios de
+atributos, session.delete). Las sentencias masivas del ORM sobre clientes o
+equipos (query().update()/delete(), session.execute(update(...))) se detectan
+y provocan una reconstrucción completa tras el commit. Las que no pasan por
+el ORM (sentencias Core, bulk_*_mappings) no se detectan: después de usarlas
+hay que llamar a rebuild_rollups (python -m app.models.rollups).
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import Column, Float, Integer, String, Table, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models.database import Base, Client, Equipment
+
+# Ancho de los intervalos del histograma de satisfacción (escala 0-5)
+SATISFACTION_BUCKET_WIDTH = 0.5
+
+
+class CalibrationDailyRollup(Base):
+    __tablename__ = 'rollup_calibrations_daily'
+
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD
+    count = Column(Integer, nullable=False, default=0)
+
+
+class CalibrationMonthlyRollup(Base):
+    __tablename__ = 'rollup_calibrations_monthly'
+
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ClientStatusRollup(Base):
+    __tablename__ = 'rollup_client_status'
+
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    satisfaction_sum = Column(Float, nullable=False, default=0.0)
+    satisfaction_count = Column(Integer, nullable=False, default=0)
+
+
+class SatisfactionHistogramRollup(Base):
+    __tablename__ = 'rollup_satisfaction_histogram'
+
+    bucket = Column(Float, primary_key=True)  # límite inferior del intervalo
+    count = Column(Integer, nullable=False, default=0)
+
+
+def satisfaction_bucket(score: float) -> float:
+    """Retorna el límite inferior del intervalo al que pertenece un puntaje"""
+    return round(score // SATISFACTION_BUCKET_WIDTH * SATISFACTION_BUCKET_WIDTH, 2)
+
+
+def _status_key(status) -> Optional[str]:
+    if status is None:
+        return None
+    return getattr(status, 'value', status)
+
+
+def upsert_add(connection: Union[Connection, Session], table: Table,
+               keys: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+    """
+    Suma deltas a la fila identificada por keys, creándola si no existe, en
+    una sola sentencia INSERT ... ON CONFLICT DO UPDATE. A diferencia de
+    actualizar y luego insertar, no falla por clave duplicada cuando dos
+    transacciones crean la misma fila a la vez.
+    """
+    bind = connection.get_bind() if isinstance(connection, Session) else connection
+    dialect = bind.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        # Sin upsert nativo: actualizar y, si no había fila, insertar
+        result = connection.execute(
+            table.update()
+            .where(*(table.c[name] == value for name, value in keys.items()))
+            .values({name: table.c[name] + delta for name, delta in deltas.items()})
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values({**keys, **deltas}))
+        return
+
+    insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+    statement = insert(table).values({**keys, **deltas})
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + statement.excluded[name] for name in deltas}
+    ))
+
+
+def _bump(connection: Connection, model, key_column, key, **deltas) -> None:
+    """
+    Suma los deltas indicados a la fila de rollup identificada por key,
+    creándola si todavía no existe.
+    """
+    upsert_add(connection, model.__table__, {key_column: key}, deltas)
+
+
+def _apply_calibration(connection: Connection, date: Optional[datetime], sign: int) -> None:
+    if date is None:
+        return
+    _bump(connection, CalibrationDailyRollup, 'day', date.strftime('%Y-%m-%d'), count=sign)
+    _bump(connection, CalibrationMonthlyRollup, 'month', date.strftime('%Y-%m'), count=sign)
+
+
+def _apply_client(connection: Connection, status, score: Optional[float], sign: int) -> None:
+    key = _status_key(status)
+    if key is not None:
+        has_score = score is not None
+        _bump(
+            connection, ClientStatusRollup, 'status', key,
+            count=sign,
+            satisfaction_sum=sign * (score if has_score else 0.0),
+            satisfaction_count=sign if has_score else 0
+        )
+    if score is not None:
+        _bump(connection, SatisfactionHistogramRollup, 'bucket',
+              satisfaction_bucket(score), count=sign)
+
+
+def _previous_value(target, attribute: str):
+    """Obtiene el valor de un atributo antes de la actualización en curso"""
+    history = inspect(target).attrs[attribute].history
+    if not history.has_changes():
+        return getattr(target, attribute)
+    return history.deleted[0] if history.deleted else None
+
+
+# Mantenimiento incremental de los rollups de equipos
+@event.listens_for(Equipment, 'after_insert')
+def _equipment_inserted(mapper, connection: Connection, target: Equipment) -> None:
+    _apply_calibration(connection, target.calibration_date, 1)
+
+
+@event.listens_for(Equipment, 'after_update')
+def _equipment_updated(mapper, connection: Connection, target: Equipment) -> None:
+    if not inspect(target).attrs.calibration_date.history.has_changes():
+        return
+    _apply_calibration(connection, _previous_value(target, 'calibration_date'), -1)
+    _apply_calibration(connection, target.calibration_date, 1)
+
+
+@event.listens_for(Equipment, 'after_delete')
+def _equipment_deleted(mapper, connection: Connection, target: Equipment) -> None:
+    _apply_calibration(connection, _previous_value(target, 'calibration_date'), -1)
+
+
+# Mantenimiento incremental de los rollups de clientes
+@event.listens_for(Client, 'after_insert')
+def _client_inserted(mapper, connection: Connection, target: Client) -> None:
+    _apply_client(connection, target.status, target.satisfaction_score, 1)
+
+
+@event.listens_for(Client, 'after_update')
+def _client_updated(mapper, connection: Connection, target: Client) -> None:
+    state = inspect(target)
+    if not (state.attrs.status.history.has_changes()
+            or state.attrs.satisfaction_score.history.has_changes()):
+        return
+    _apply_client(
+        connection,
+        _previous_value(target, 'status'),
+        _previous_value(target, 'satisfaction_score'),
+        -1
+    )
+    _apply_client(connection, target.status, target.satisfaction_score, 1)
+
+
+@event.listens_for(Client, 'after_delete')
+def _client_deleted(mapper, connection: Connection, target: Client) -> None:
+    _apply_client(
+        connection,
+        _previous_value(target, 'status'),
+        _previous_value(target, 'satisfaction_score'),
+        -1
+    )
+
+
+# Sentencias masivas sobre las tablas de origen: los listeners no las ven
+_SOURCE_MAPPERS = (inspect(Client), inspect(Equipment))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bulk_statement(state: ORMExecuteState) -> None:
+    if (state.is_update or state.is_delete) and state.bind_mapper in _SOURCE_MAPPERS:
+        state.session.info['rollups_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _rebuild_after_bulk(session: Session) -> None:
+    if not session.info.pop('rollups_stale', False):
+        return
+    from app.utils.logger import Logger
+
+    Logger.warning("Actualización masiva de clientes o equipos; se reconstruyen los rollups")
+    try:
+        with Session(bind=session.get_bind()) as db:
+            rebuild_rollups(db)
+    except Exception as e:
+        Logger.error(f"Error reconstruyendo rollups: {str(e)}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bulk_flag(session: Session) -> None:
+    session.info.pop('rollups_stale', None)
+
+
+def rollups_empty(db: Session) -> bool:
+    """Indica si los rollups están vacíos pese a existir datos de origen"""
+    has_source = (
+        db.query(Client.id).first() is not None
+        or db.query(Equipment.id).first() is not None
+    )
+    has_rollups = (
+        db.query(ClientStatusRollup.status).first() is not None
+        or db.query(CalibrationMonthlyRollup.month).first() is not None
+    )
+    return has_source and not has_rollups
+
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """
+    Reconstruye todos los rollups desde las tablas de origen.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Cantidad de filas generadas por tabla de rollup
+    """
+    try:
+        daily: Counter = Counter()
+        monthly: Counter = Counter()
+        for (date,) in db.query(Equipment.calibration_date).yield_per(1000):
+            if date is not None:
+                daily[date.strftime('%Y-%m-%d')] += 1
+                monthly[date.strftime('%Y-%m')] += 1
+
+        statuses: Dict[str, Dict] = {}
+        histogram: Counter = Counter()
+        for status, score in db.query(Client.status, Client.satisfaction_score).yield_per(1000):
+            key = _status_key(status)
+            if key is not None:
+                row = statuses.setdefault(key, {
+                    'count': 0, 'satisfaction_sum': 0.0, 'satisfaction_count': 0
+                })
+                row['count'] += 1
+                if score is not None:
+                    row['satisfaction_sum'] += score
+                    row['satisfaction_count'] += 1
+            if score is not None:
+                histogram[satisfaction_bucket(score)] += 1
+
+        for model in (CalibrationDailyRollup, CalibrationMonthlyRollup,
+                      ClientStatusRollup, SatisfactionHistogramRollup):
+            db.query(model).delete(synchronize_session=False)
+
+        db.add_all(CalibrationDailyRollup(day=k, count=v) for k, v in daily.items())
+        db.add_all(CalibrationMonthlyRollup(month=k, count=v) for k, v in monthly.items())
+        db.add_all(ClientStatusRollup(status=k, **v) for k, v in statuses.items())
+        db.add_all(SatisfactionHistogramRollup(bucket=k, count=v) for k, v in histogram.items())
+        db.commit()
+
+        return {
+            CalibrationDailyRollup.__tablename__: len(daily),
+            CalibrationMonthlyRollup.__tablename__: len(monthly),
+            ClientStatusRollup.__tablename__: len(statuses),
+            SatisfactionHistogramRollup.__tablename__: len(histogram)
+        }
+    except Exception:
+        db.rollback()
+        raise
+
+
+def main() -> None:
+    """Comando de reconstrucción: python -m app.models.rollups"""
+    from app.utils.db import DatabaseManager
+    from app.utils.logger import Logger
+
+    manager = DatabaseManager()
+    with manager.get_db() as db:
+        counts = rebuild_rollups(db)
+    for table, rows in counts.items():
+        Logger.info(f"Rollup {table} reconstruido: {rows} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String
+
+from app.models.database import Base
+
+
+class AIUsageEntry(Base):
+    """Registro de solo inserción de cada llamada a un proveedor de IA"""
+    __tablename__ = 'ai_usage_ledger'
+    __table_args__ = (
+        Index('ix_ai_usage_ledger_created_at', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False, default='')
+    operation = Column(String, nullable=False)
+    page = Column(String, nullable=True)
+    user = Column(String, nullable=True)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0.0)  # USD estimado
+    ok = Column(Boolean, nullable=False, default=True)
+
+
+class AIUsageDailyRollup(Base):
+    __tablename__ = 'rollup_ai_usage_daily'
+
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD
+    provider = Column(String, primary_key=True)
+    model = Column(String, primary_key=True)
+    calls = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0.0)
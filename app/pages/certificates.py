@@ -7,6 +7,7 @@
 
 from app.components.certificados import Certificados
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class CertificatesPage:
@@ -21,6 +22,7 @@ def _initialize_state(self) -> None:
         if 'certificate_view' not in st.session_state:
             st.session_state.certificate_view = "list"
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la página de certificados"""
         try:
@@ -464,6 +466,7 @@ def _display_search_results(self, results: List[Dict]) -> None:
                 self._render_certificate_details(cert)
 
 
+@render_timing()
 def render_certificates_page():
     """Punto de entrada para la página de certificados"""
     try:
@@ -6,6 +6,7 @@
 import streamlit as st
 
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class ClientsPage:
@@ -62,6 +63,7 @@ def _load_sample_data(self) -> None:
                 }
             ]
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la página de gestión de clientes"""
         try:
@@ -250,6 +252,7 @@ def _render_clients_analysis(self) -> None:
                 st.plotly_chart(fig, use_container_width=True)
 
 
+@render_timing()
 def render_clients_page():
     """Punto de entrada para la página de clientes"""
     try:
@@ -11,6 +11,7 @@
 from app.components.solicitudes import Solicitudes
 from app.utils.cache import CacheManager
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class HomePage:
@@ -31,6 +32,7 @@ def _initialize_state(self) -> None:
                 datetime.now()
             ]
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la página de inicio"""
         try:
@@ -189,6 +191,7 @@ def _render_status_chart(self) -> None:
             st.error("Error mostrando gráfico")
 
 
+@render_timing()
 def render_home_page():
     """Punto de entrada para la página de inicio"""
     try:
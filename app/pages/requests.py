@@ -6,19 +6,30 @@
 import streamlit as st
 
 from app.components.solicitudes import Solicitudes
+from app.services.triage_worker import TriageQueue
+from app.services.turnaround_metrics import TurnaroundMetrics
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
+from app.utils.tracing import Tracer
 
 
 class RequestsPage:
     def __init__(self):
-        self.solicitudes = Solicitudes()
+        self.turnaround = TurnaroundMetrics()
+        self.triage = TriageQueue()
         self._initialize_state()
 
     def _initialize_state(self) -> None:
         """Inicializa el estado de la página"""
         if 'editing_request' not in st.session_state:
             st.session_state.editing_request = None
+        # El pre-análisis escribe en segundo plano sobre este almacén: tiene
+        # que ser el mismo en todos los reruns de la sesión
+        if 'solicitudes' not in st.session_state:
+            st.session_state.solicitudes = Solicitudes()
+        self.solicitudes = st.session_state.solicitudes
 
+    @render_timing()
     def render(self) -> None:
         """Renderiza la página de solicitudes"""
         try:
@@ -219,6 +230,8 @@ def _render_request_details(self, request: Dict) -> None:
                     **Serie:** {equipment.get('serial', 'N/A')}
                 """)
 
+            self._render_triage(request.get('ai_triage'))
+
         with col2:
             # Acciones
             st.markdown("##### Acciones")
@@ -239,6 +252,26 @@ def _render_request_details(self, request: Dict) -> None:
             if st.button("📝 Editar", key=f"edit_{request['id']}"):
                 st.session_state.editing_request = request['id']
 
+    def _render_triage(self, triage: Optional[Dict]) -> None:
+        """Renderiza el pre-análisis automático de la solicitud"""
+        if not triage:
+            return
+        st.markdown("##### Pre-análisis")
+        status = triage.get('status')
+        if status == 'queued':
+            st.caption("⏳ Pre-análisis en curso")
+        elif status == 'skipped':
+            st.caption("Pre-análisis omitido por alta demanda")
+        elif status == 'done':
+            source = "IA" if triage.get('source') == 'ai' else "reglas locales"
+            st.markdown(f"""
+                **Servicio sugerido:** {triage.get('service_type') or 'N/A'}
+                **Urgencia sugerida:** {triage.get('urgency') or 'N/A'}
+                **Modelo detectado:** {triage.get('equipment_model') or 'N/A'}
+                **Serie detectada:** {triage.get('equipment_serial') or 'N/A'}
+            """)
+            st.caption(f"Fuente: {source}")
+
     def _render_requests_summary(self) -> None:
         """Renderiza resumen de solicitudes"""
         requests = self.solicitudes.get_requests()
@@ -247,7 +280,8 @@ def _render_requests_summary(self) -> None:
             return
 
         # Convertir a DataFrame
-        df = pd.DataFrame(requests)
+        with Tracer.start_span("pandas.dataframe", rows=len(requests)):
+            df = pd.DataFrame(requests)
 
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
@@ -268,22 +302,32 @@ def _render_requests_summary(self) -> None:
 
         with col1:
             # Distribución por estado
-            fig = px.pie(
-                df,
-                names='status',
-                title="Distribución por Estado"
-            )
+            with Tracer.start_span("plotly.figure", chart="requests_by_status"):
+                fig = px.pie(
+                    df,
+                    names='status',
+                    title="Distribución por Estado"
+                )
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             # Solicitudes por tipo de servicio
             service_counts = df['service_type'].value_counts()
-            fig = px.bar(
-                service_counts,
-                title="Solicitudes por Tipo de Servicio"
-            )
+            with Tracer.start_span("plotly.figure", chart="requests_by_service"):
+                fig = px.bar(
+                    service_counts,
+                    title="Solicitudes por Tipo de Servicio"
+                )
             st.plotly_chart(fig, use_container_width=True)
 
+        # Tiempos de atención
+        st.markdown("##### Tiempos de Atención")
+        turnaround = self.turnaround.get_summary()
+        if turnaround:
+            st.dataframe(pd.DataFrame(turnaround), hide_index=True)
+        else:
+            st.info("Aún no hay solicitudes iniciadas o completadas")
+
     def _create_request(self, **kwargs) -> None:
         """Crea una nueva solicitud"""
         try:
@@ -294,6 +338,8 @@ def _create_request(self, **kwargs) -> None:
                 **kwargs
             }
             self.solicitudes.add_request(request)
+            # El pre-análisis corre en segundo plano; no demora el envío
+            self.triage.submit(self.solicitudes, request)
             st.success("✅ Solicitud enviada exitosamente")
             st.balloons()
         except Exception as e:
@@ -351,6 +397,7 @@ def _start_request(self, request: Dict) -> None:
             request['status'] = 'in_progress'
             request['started_at'] = datetime.now()
             self.solicitudes.update_request(request['id'], request)
+            self.turnaround.record_started(request)
             st.success("✅ Proceso iniciado")
             st.rerun()
         except Exception as e:
@@ -362,12 +409,14 @@ def _complete_request(self, request: Dict) -> None:
             request['status'] = 'completed'
             request['completed_at'] = datetime.now()
             self.solicitudes.update_request(request['id'], request)
+            self.turnaround.record_completed(request)
             st.success("✅ Solicitud completada")
             st.rerun()
         except Exception as e:
             st.error(f"❌ Error al completar solicitud: {str(e)}")
 
 
+@render_timing()
 def render_requests_page():
     """Punto de entrada para la página de solicitudes"""
     try:
@@ -1,12 +1,16 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import pandas as pd
 import streamlit as st
 
 from app.config.configuration import Configuration
 from app.config.secrets_manager import SecretsManager
+from app.services.factory import ServiceFactory
+from app.services.usage_ledger import UsageLedger
 from app.utils.cache import cached
 from app.utils.logger import Logger
+from app.utils.profiling import render_timing
 
 
 class SettingsPage:
@@ -26,6 +30,7 @@ def _initialize_state(self):
         if 'current_tab' not in st.session_state:
             st.session_state.current_tab = 0
 
+    @render_timing()
     def render(self):
         """Renderiza la página de configuración"""
         try:
@@ -93,6 +98,30 @@ def _render_ai_settings(self):
                     key=f"max_tokens_{provider}"
                 )
 
+        self._render_ai_usage()
+
+    def _render_ai_usage(self) -> None:
+        """Renderiza el consumo de tokens y costo de los últimos días"""
+        st.subheader("Consumo de IA (últimos 7 días)")
+        try:
+            ledger = UsageLedger()
+            daily = ledger.daily_usage(days=7)
+            if not daily:
+                st.info("Aún no hay consumo registrado")
+                return
+            st.dataframe(pd.DataFrame(daily), hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("##### Por página")
+                st.dataframe(pd.DataFrame(ledger.breakdown('page')), hide_index=True)
+            with col2:
+                st.markdown("##### Por usuario")
+                st.dataframe(pd.DataFrame(ledger.breakdown('user')), hide_index=True)
+        except Exception as e:
+            Logger.error(f"Error mostrando consumo de IA: {str(e)}")
+            st.error("Error cargando consumo de IA")
+
     def _render_database_settings(self):
         """Renderiza configuración de base de datos"""
         st.header("Configuración de Base de Datos")
@@ -177,11 +206,14 @@ def _render_save_button(self) -> None:
         if st.button("Guardar Todos los Cambios"):
             try:
                 # Aquí iría la lógica para guardar todos los cambios
+                # Los servicios compartidos se recrean con las credenciales nuevas
+                ServiceFactory.refresh()
                 st.success("Configuración guardada exitosamente")
                 st.session_state.settings_modified = False
             except Exception as e:
                 st.error(f"Error guardando configuración: {str(e)}")
 
+@render_timing()
 def render_settings_page():
     """Punto de entrada para la página de configuración"""
     try:
@@ -5,15 +5,25 @@
 """
 
 from app.services.ai_service_interface import AIServiceInterface
+from app.services.async_runtime import AsyncRuntime
 from app.services.factory import ServiceFactory
+from app.services.http_transport import HttpTransport
 from app.services.openai_service import OpenAIService
+from app.services.router import RouterService
 from app.services.sambanova_service import SambaNovaService
+from app.services.telemetry import TelemetryRegistry
+from app.services.usage_ledger import UsageLedger
 from app.services.vertex_service import VertexService
 
 __all__ = [
     'AIServiceInterface',
+    'AsyncRuntime',
     'ServiceFactory',
+    'HttpTransport',
     'OpenAIService',
+    'RouterService',
     'SambaNovaService',
+    'TelemetryRegistry',
+    'UsageLedger',
     'VertexService'
 ]
@@ -1,10 +1,47 @@
+import asyncio
+import contextvars
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Cantidad de solicitudes enviadas en simultáneo por bloque en process_batch
+DEFAULT_BATCH_CHUNK_SIZE = 16
+
+# Modelo elegido para la llamada en curso (p. ej. por el control de
+# presupuesto). Las instancias de servicio se comparten entre sesiones, así
+# que el modelo de una llamada no puede guardarse en la instancia.
+_call_model: ContextVar[Optional[str]] = ContextVar('ai_call_model', default=None)
+
+
+@contextmanager
+def call_model(model: Optional[str]) -> Iterator[None]:
+    """Usa `model` en las llamadas al proveedor hechas dentro del bloque"""
+    token = _call_model.set(model or None)
+    try:
+        yield
+    finally:
+        _call_model.reset(token)
 
 
 class AIServiceInterface(ABC):
     """Interfaz base para servicios de IA"""
 
+    batch_chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE
+    # False si el servicio ya gestiona reintentos y plazos por su cuenta
+    resilient: bool = True
+    # False si el servicio delega en otros proveedores que ya registran su consumo
+    metered: bool = True
+    # True si no es un proveedor real (delega en otros o es simulado): no se
+    # suma en los totales por proveedor
+    meta_provider: bool = False
+
+    @property
+    def supports_native_batch(self) -> bool:
+        """True si el proveedor acepta varias solicitudes en una sola llamada
+        (es decir, si implementa _acall_native_batch)"""
+        return type(self)._acall_native_batch is not AIServiceInterface._acall_native_batch
+
     @abstractmethod
     def get_completion(self, prompt: str) -> str:
         """
@@ -30,3 +67,120 @@ def process_request(self, request_data: dict) -> dict:
             Respuesta procesada
         """
         pass
+
+    def close(self) -> None:
+        """Libera los clientes y conexiones del servicio"""
+        pass
+
+    def current_model(self) -> str:
+        """
+        Modelo a enviar al proveedor en la llamada en curso: el indicado con
+        call_model o, si no hay ninguno, el modelo por defecto del servicio.
+        """
+        return _call_model.get() or getattr(self, 'model', '') or ''
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """
+        Obtiene la respuesta del modelo como fragmentos a medida que se generan.
+
+        La implementación por defecto entrega la respuesta completa en un
+        solo fragmento; los proveedores con streaming deben sobrescribirla.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Yields:
+            Fragmentos consecutivos de la respuesta
+        """
+        yield self.get_completion(prompt)
+
+    async def aget_completion(self, prompt: str) -> str:
+        """
+        Versión asíncrona de get_completion.
+
+        La implementación por defecto ejecuta get_completion en el executor
+        del loop; los proveedores con cliente asíncrono deben sobrescribirla.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Returns:
+            La respuesta generada por el modelo
+        """
+        loop = asyncio.get_running_loop()
+        # run_in_executor no propaga el contexto (modelo de la llamada, trazas)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, self.get_completion, prompt)
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        """
+        Versión asíncrona de process_request.
+
+        Args:
+            request_data: Datos de la solicitud
+
+        Returns:
+            Respuesta procesada
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, self.process_request, request_data)
+
+    def process_batch(self, requests: List[dict]) -> List[Dict[str, Any]]:
+        """
+        Procesa un lote de solicitudes.
+
+        Args:
+            requests: Lista de datos de solicitudes
+
+        Returns:
+            Un resultado por solicitud, en el mismo orden, con las claves
+            'result' y 'error' (None si la solicitud se procesó bien)
+
+        Raises:
+            RuntimeError: Si se llama desde el loop de AsyncRuntime (usar aprocess_batch)
+        """
+        from app.services.async_runtime import AsyncRuntime
+        return AsyncRuntime.run(self.aprocess_batch(requests))
+
+    async def aprocess_batch(self, requests: List[dict]) -> List[Dict[str, Any]]:
+        """
+        Versión asíncrona de process_batch.
+
+        Los proveedores sin lote nativo procesan la lista por bloques de
+        batch_chunk_size solicitudes concurrentes.
+        """
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(requests), self.batch_chunk_size):
+            chunk = requests[start:start + self.batch_chunk_size]
+            if self.supports_native_batch:
+                try:
+                    outcomes = await self._acall_native_batch(chunk)
+                    if len(outcomes) != len(chunk):
+                        # No se puede saber a qué solicitud corresponde cada resultado
+                        raise ValueError(f"El lote nativo retornó {len(outcomes)} resultados "
+                                         f"para {len(chunk)} solicitudes")
+                except Exception as e:
+                    outcomes = [e] * len(chunk)
+            else:
+                outcomes = await asyncio.gather(
+                    *(self.aprocess_request(r) for r in chunk),
+                    return_exceptions=True
+                )
+            results.extend(batch_item(outcome) for outcome in outcomes)
+        return results
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        """
+        Envía un bloque en una sola llamada al proveedor; retorna un resultado
+        o una excepción por solicitud, en el mismo orden. Los proveedores con
+        lote nativo la sobrescriben, lo que activa supports_native_batch.
+        """
+        raise NotImplementedError
+
+
+def batch_item(outcome: Any) -> Dict[str, Any]:
+    """Normaliza el resultado de una solicitud de un lote"""
+    if isinstance(outcome, BaseException):
+        return {'result': None, 'error': f"{type(outcome).__name__}: {outcome}"}
+    return {'result': outcome, 'error': None}
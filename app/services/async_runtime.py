@@ -0,0 +1,154 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, Optional
+
+from app.config.configuration import Configuration
+from app.utils.logger import Logger
+
+# Límite de llamadas simultáneas por proveedor si la configuración no lo define
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def _copy_state(task: asyncio.Future, future: Future) -> None:
+    """Pasa el resultado de la tarea del loop al Future de quien la programó"""
+    if task.cancelled():
+        future.cancel()
+        return
+    # Pasa el Future a RUNNING (o avisa que ya se canceló) de forma atómica:
+    # quien llama ya no puede cancelarlo entre el chequeo y el set_*
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        if task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+class AsyncRuntime:
+    """
+    Event loop compartido en un hilo dedicado para las llamadas asíncronas a
+    proveedores de IA.
+
+    Todas las sesiones comparten el mismo loop, y un semáforo por proveedor
+    acota cuántas llamadas se hacen en simultáneo.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _thread: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+    _semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def loop(cls) -> asyncio.AbstractEventLoop:
+        """Obtiene el loop compartido, iniciándolo si es necesario"""
+        if cls._loop is None:
+            with cls._lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    cls._thread = threading.Thread(
+                        target=cls._run_loop, args=(loop,),
+                        name="ai-async-loop", daemon=True
+                    )
+                    cls._thread.start()
+                    cls._loop = loop
+        return cls._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @classmethod
+    def submit(cls, coro: Awaitable) -> Future:
+        """
+        Programa una corrutina en el loop compartido sin esperar su resultado.
+
+        La tarea se crea dentro de una copia del contexto de quien llama, así
+        las ContextVars (span activo del tracer, atribución de consumo,
+        modelo de la llamada) llegan a la corrutina en el hilo del loop.
+        """
+        loop = cls.loop()
+        context = contextvars.copy_context()
+        future: Future = Future()
+
+        def _start() -> None:
+            if future.cancelled():
+                if asyncio.iscoroutine(coro):
+                    coro.close()
+                return
+            try:
+                # Corre dentro de `context`: la tarea copia ese contexto
+                task = asyncio.ensure_future(coro)
+            except BaseException as e:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+                raise
+            task.add_done_callback(lambda done: _copy_state(done, future))
+            future.add_done_callback(
+                lambda f: f.cancelled() and loop.call_soon_threadsafe(task.cancel)
+            )
+
+        loop.call_soon_threadsafe(_start, context=context)
+        return future
+
+    @classmethod
+    def in_loop_thread(cls) -> bool:
+        """Indica si el código actual corre en el hilo del loop compartido"""
+        return cls._thread is not None and threading.current_thread() is cls._thread
+
+    @classmethod
+    def run(cls, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Ejecuta una corrutina en el loop compartido y espera su resultado.
+
+        Puente para código síncrono (p. ej. el hilo del script de Streamlit).
+
+        Args:
+            coro: Corrutina a ejecutar
+            timeout: Tiempo máximo de espera en segundos
+
+        Raises:
+            RuntimeError: Si se llama desde el propio loop, donde esperar el
+                resultado lo bloquearía para siempre
+        """
+        if cls.in_loop_thread():
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            raise RuntimeError("AsyncRuntime.run no puede llamarse desde el loop compartido; "
+                               "usar await directamente")
+        future = cls.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Antes de 3.11 no es el TimeoutError builtin
+            future.cancel()
+            raise
+
+    @classmethod
+    def semaphore(cls, provider: str) -> asyncio.Semaphore:
+        """
+        Semáforo de concurrencia del proveedor. Debe usarse desde el loop
+        compartido, que es el único hilo que accede al diccionario.
+        """
+        semaphore = cls._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(cls._max_concurrency(provider))
+            cls._semaphores[provider] = semaphore
+        return semaphore
+
+    @staticmethod
+    def _max_concurrency(provider: str) -> int:
+        try:
+            providers = Configuration().get_setting('ai_providers') or {}
+            return int(providers.get(provider, {}).get(
+                'max_concurrency', DEFAULT_MAX_CONCURRENCY
+            ))
+        except Exception as e:
+            Logger.warning(f"Concurrencia por defecto para {provider}: {str(e)}")
+            return DEFAULT_MAX_CONCURRENCY
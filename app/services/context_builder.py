@@ -0,0 +1,149 @@
+from typing import Dict, List, Optional, Tuple
+
+from app.config.configuration import Configuration
+from app.services.conversation_store import ConversationStore
+from app.utils.logger import Logger
+from app.utils.tokens import estimate_tokens
+from app.utils.tracing import Tracer
+
+DEFAULT_MAX_TOKENS = 2048
+DEFAULT_RESPONSE_RESERVE = 0.25  # fracción de max_tokens reservada para la respuesta
+DEFAULT_SUMMARY_RATIO = 0.2      # fracción del contexto disponible para el resumen
+SUMMARY_LINE_CHARS = 160
+# Tope de mensajes leídos por página al armar el contexto o resumir
+READ_PAGE_SIZE = 50
+
+ROLE_LABELS = {'user': 'Usuario', 'assistant': 'Asistente'}
+
+
+class ContextBuilder:
+    """
+    Arma el contexto que se envía al proveedor para un nuevo mensaje.
+
+    Incluye los turnos más recientes que entran en el presupuesto de tokens
+    del proveedor (max_tokens menos la reserva para la respuesta). Los turnos
+    que quedan fuera se condensan en un resumen extractivo que se guarda en
+    la conversación, así cada turno se resume una sola vez y el costo de
+    armar el contexto no crece con el largo de la conversación.
+
+    Config (sección chat): response_token_reserve y summary_token_ratio.
+    """
+
+    def __init__(self, store: Optional[ConversationStore] = None):
+        self.store = store or ConversationStore()
+        self.config = Configuration()
+        settings = self.config.get_setting('chat') or {}
+        self.response_reserve = float(settings.get('response_token_reserve',
+                                                   DEFAULT_RESPONSE_RESERVE))
+        self.summary_ratio = float(settings.get('summary_token_ratio', DEFAULT_SUMMARY_RATIO))
+
+    def token_budget(self, provider: str) -> int:
+        """Tokens disponibles para el contexto con el proveedor indicado"""
+        providers = self.config.get_setting('ai_providers') or {}
+        if provider in providers:
+            max_tokens = providers[provider].get('max_tokens', DEFAULT_MAX_TOKENS)
+        else:
+            # Pseudo-proveedores (router): el menor límite entre los reales
+            limits = [p.get('max_tokens', DEFAULT_MAX_TOKENS) for p in providers.values()]
+            max_tokens = min(limits) if limits else DEFAULT_MAX_TOKENS
+        return int(max_tokens * (1 - self.response_reserve))
+
+    def build_messages(self, conversation_id: str, message: str, provider: str,
+                       before_id: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna los mensajes a enviar: resumen (si hay), turnos recientes y
+        el mensaje nuevo al final.
+
+        Args:
+            conversation_id: Conversación en curso
+            message: Mensaje nuevo del usuario
+            provider: Proveedor que va a responder
+            before_id: Id del mensaje nuevo si ya fue guardado, para excluirlo
+        """
+        with Tracer.start_span("chat.build_context", provider=provider) as span:
+            budget = self.token_budget(provider)
+            summary_budget = int(budget * self.summary_ratio)
+            remaining = budget - estimate_tokens(message)
+
+            state = self.store.get_summary(conversation_id)
+            summary, summarized_until = state['summary'], state['summarized_until']
+
+            recent: List[Dict] = []
+            cursor = before_id
+            overflow = False
+            while not overflow:
+                page = self.store.get_messages(conversation_id, limit=READ_PAGE_SIZE,
+                                               before_id=cursor, after_id=summarized_until)
+                if not page:
+                    break
+                for item in reversed(page):
+                    # El resumen puede ocupar hasta summary_budget
+                    if item['tokens'] > remaining - summary_budget:
+                        overflow = True
+                        break
+                    recent.append(item)
+                    remaining -= item['tokens']
+                cursor = page[0]['id']
+            recent.reverse()
+
+            if overflow:
+                oldest_kept = recent[0]['id'] if recent else before_id
+                summary, summarized_until = self._fold(
+                    conversation_id, summary, summarized_until, oldest_kept, summary_budget
+                )
+
+            messages: List[Dict] = []
+            if summary:
+                messages.append({
+                    'role': 'system',
+                    'content': f"Resumen de la conversación previa:\n{summary}"
+                })
+            messages.extend({'role': m['role'], 'content': m['content']} for m in recent)
+            messages.append({'role': 'user', 'content': message})
+            span.set_attribute("turns", len(recent))
+            span.set_attribute("budget", budget)
+            return messages
+
+    def build_prompt(self, conversation_id: str, message: str, provider: str,
+                     before_id: Optional[int] = None) -> str:
+        """Contexto renderizado como texto, para los servicios que reciben un prompt"""
+        messages = self.build_messages(conversation_id, message, provider, before_id)
+        if len(messages) == 1:
+            return message
+        lines = []
+        for item in messages:
+            if item['role'] == 'system':
+                lines.append(item['content'])
+            else:
+                lines.append(f"{ROLE_LABELS.get(item['role'], item['role'])}: {item['content']}")
+        return "\n\n".join(lines)
+
+    def _fold(self, conversation_id: str, summary: str, summarized_until: int,
+              oldest_kept: Optional[int], summary_budget: int) -> Tuple[str, int]:
+        """
+        Agrega al resumen los turnos entre summarized_until y oldest_kept, y
+        lo recorta a summary_budget descartando las líneas más antiguas.
+        """
+        lines = [line for line in summary.split('\n') if line]
+        last_id = summarized_until
+        try:
+            while True:
+                page = self.store.get_messages(conversation_id, limit=READ_PAGE_SIZE,
+                                               before_id=oldest_kept, after_id=last_id,
+                                               oldest_first=True)
+                if not page:
+                    break
+                for item in page:
+                    text = ' '.join(item['content'].split())
+                    if len(text) > SUMMARY_LINE_CHARS:
+                        text = text[:SUMMARY_LINE_CHARS - 1] + '…'
+                    lines.append(f"- {ROLE_LABELS.get(item['role'], item['role'])}: {text}")
+                last_id = page[-1]['id']
+
+            while lines and sum(estimate_tokens(line) for line in lines) > summary_budget:
+                lines.pop(0)
+            summary = '\n'.join(lines)
+            self.store.set_summary(conversation_id, summary, last_id)
+        except Exception as e:
+            Logger.error(f"Error resumiendo conversación: {str(e)}")
+        return summary, last_id
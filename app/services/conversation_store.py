@@ -0,0 +1,151 @@
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.models.conversations import Conversation, ConversationMessage
+from app.utils.db import DatabaseManager
+from app.utils.logger import Logger
+from app.utils.tokens import estimate_tokens
+from app.utils.tracing import traced
+
+# Mensajes por página al cargar el historial
+DEFAULT_PAGE_SIZE = 20
+
+
+def _to_dict(message: ConversationMessage) -> Dict:
+    return {
+        'id': message.id,
+        'role': message.role,
+        'content': message.content,
+        'provider': message.provider,
+        'tokens': message.tokens,
+        'timestamp': message.created_at.strftime("%H:%M") if message.created_at else ''
+    }
+
+
+class ConversationStore:
+    """
+    Conversaciones del chat persistidas en la base de datos de la aplicación.
+
+    Los mensajes se leen por páginas (keyset sobre conversation_id, id), de
+    modo que el costo de cada consulta no crece con el largo de la
+    conversación.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Se publica recién inicializada: otro hilo no debe verla a medias
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self) -> None:
+        self.db_manager = DatabaseManager()
+
+    def create_conversation(self) -> str:
+        """Crea una conversación vacía y retorna su id"""
+        conversation_id = uuid.uuid4().hex
+        with self.db_manager.get_db() as db:
+            db.add(Conversation(id=conversation_id))
+            db.commit()
+        return conversation_id
+
+    def exists(self, conversation_id: str) -> bool:
+        with self.db_manager.get_db() as db:
+            return db.get(Conversation, conversation_id) is not None
+
+    @traced("conversations.add_message")
+    def add_message(self, conversation_id: str, role: str, content: str,
+                    provider: Optional[str] = None) -> Dict:
+        """
+        Agrega un mensaje a la conversación.
+
+        Returns:
+            El mensaje guardado
+        """
+        with self.db_manager.get_db() as db:
+            try:
+                message = ConversationMessage(
+                    conversation_id=conversation_id,
+                    role=role,
+                    content=content,
+                    provider=provider,
+                    tokens=estimate_tokens(content)
+                )
+                db.add(message)
+                conversation = db.get(Conversation, conversation_id)
+                if conversation is not None:
+                    conversation.updated_at = datetime.now()
+                db.commit()
+                return _to_dict(message)
+            except Exception as e:
+                db.rollback()
+                Logger.error(f"Error guardando mensaje: {str(e)}")
+                raise
+
+    @traced("conversations.get_messages")
+    def get_messages(self, conversation_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                     before_id: Optional[int] = None,
+                     after_id: Optional[int] = None,
+                     oldest_first: bool = False) -> List[Dict]:
+        """
+        Retorna una página de mensajes en orden cronológico.
+
+        Args:
+            conversation_id: Conversación
+            limit: Tamaño de la página
+            before_id: Solo mensajes con id menor
+            after_id: Solo mensajes con id mayor
+            oldest_first: Si es True la página son los `limit` más antiguos
+                del rango; si no, los más recientes
+        """
+        with self.db_manager.get_db() as db:
+            query = db.query(ConversationMessage).filter(
+                ConversationMessage.conversation_id == conversation_id
+            )
+            if before_id is not None:
+                query = query.filter(ConversationMessage.id < before_id)
+            if after_id is not None:
+                query = query.filter(ConversationMessage.id > after_id)
+            if oldest_first:
+                rows = query.order_by(ConversationMessage.id.asc()).limit(limit).all()
+                return [_to_dict(row) for row in rows]
+            rows = query.order_by(ConversationMessage.id.desc()).limit(limit).all()
+            return [_to_dict(row) for row in reversed(rows)]
+
+    def count_messages(self, conversation_id: str) -> int:
+        with self.db_manager.get_db() as db:
+            return db.query(ConversationMessage).filter(
+                ConversationMessage.conversation_id == conversation_id
+            ).count()
+
+    def get_summary(self, conversation_id: str) -> Dict:
+        """Resumen acumulado y el id del último mensaje que incluye"""
+        with self.db_manager.get_db() as db:
+            conversation = db.get(Conversation, conversation_id)
+            if conversation is None:
+                return {'summary': '', 'summarized_until': 0}
+            return {
+                'summary': conversation.summary or '',
+                'summarized_until': conversation.summarized_until or 0
+            }
+
+    def set_summary(self, conversation_id: str, summary: str, summarized_until: int) -> None:
+        with self.db_manager.get_db() as db:
+            try:
+                conversation = db.get(Conversation, conversation_id)
+                if conversation is None:
+                    return
+                conversation.summary = summary
+                conversation.summarized_until = summarized_until
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                Logger.error(f"Error guardando resumen de conversación: {str(e)}")
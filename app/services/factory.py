@@ -1,10 +1,25 @@
-from typing import Dict, List, Type
+import hashlib
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Type
 
+from app.config.configuration import Configuration
 from app.services.ai_service_interface import AIServiceInterface
 from app.services.openai_service import OpenAIService
+from app.services.rate_limiter import RateLimitedService, RateLimiter
+from app.services.resilience import ResilientService
 from app.services.sambanova_service import SambaNovaService
+from app.services.telemetry import InstrumentedService
+from app.services.usage_ledger import MeteredService
 from app.services.vertex_service import VertexService
 from app.utils.logger import Logger
+from app.utils.tracing import Tracer
+
+# Secciones de configuración que afectan a la instancia de cualquier proveedor
+# (los envoltorios); además cuentan ai_providers.<proveedor> y la sección
+# propia del proveedor, si la tiene
+SHARED_CONFIG_KEYS = ('request_timeout', 'max_retries', 'retry_delay',
+                      'resilience', 'rate_limiting', 'usage')
 
 
 class ServiceFactory:
@@ -13,38 +28,159 @@ class ServiceFactory:
         "vertex": VertexService,
         "sambanova": SambaNovaService
     }
+    # Instancias listas para usar, una por proveedor, y la huella de la
+    # configuración con la que se crearon
+    _instances: Dict[str, AIServiceInterface] = {}
+    _config_keys: Dict[str, str] = {}
+    _warm_up_thread: Optional[threading.Thread] = None
+    _lock = threading.RLock()
 
     @classmethod
     def get_service(cls, provider: str) -> AIServiceInterface:
         """
-        Obtiene una instancia del servicio de IA especificado.
+        Obtiene la instancia compartida del servicio de IA especificado.
+
+        La instancia se crea una sola vez por proveedor y configuración (de
+        forma perezosa o en warm_up) y se reutiliza entre sesiones, por lo
+        que los servicios deben ser seguros para uso concurrente. Si la
+        configuración del proveedor cambia, la instancia se recrea.
 
         Args:
             provider: El nombre del proveedor de IA
 
         Returns:
-            Una instancia del servicio de IA
+            Una instancia del servicio de IA, con reintentos y plazos, cuota
+            por proveedor e instrumentada con telemetría y registro de
+            consumo en cada intento
         """
-        try:
-            if provider not in cls._services:
-                raise ValueError(f"Proveedor no soportado: {provider}")
+        config_key = cls._config_key(provider)
+        service = cls._instances.get(provider)
+        if service is not None and cls._config_keys.get(provider) == config_key:
+            return service
 
-            service_class = cls._services[provider]
-            return service_class()
+        try:
+            with cls._lock:
+                service = cls._instances.get(provider)
+                if service is not None and cls._config_keys.get(provider) != config_key:
+                    # La configuración cambió: se descarta la instancia anterior
+                    Logger.info(f"Configuración de {provider} modificada; se recrea el servicio")
+                    cls.refresh(provider)
+                    service = None
+                if service is None:
+                    service = cls._create_service(provider)
+                    cls._instances[provider] = service
+                    cls._config_keys[provider] = config_key
+            return service
 
         except Exception as e:
             Logger.error(f"Error creando servicio: {str(e)}")
             raise
 
+    @staticmethod
+    def _config_key(provider: str) -> str:
+        """Huella de la configuración que usa la instancia del proveedor"""
+        config = Configuration()
+        relevant = {key: config.get_setting(key) for key in SHARED_CONFIG_KEYS}
+        relevant['provider'] = (config.get_setting('ai_providers') or {}).get(provider)
+        relevant['section'] = (config.get_setting(provider)
+                               or config.get_setting(f"{provider}_provider"))
+        encoded = json.dumps(relevant, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _create_service(cls, provider: str) -> AIServiceInterface:
+        """Crea una instancia nueva del proveedor, con su cliente inicializado"""
+        if provider not in cls._services:
+            raise ValueError(f"Proveedor no soportado: {provider}")
+
+        service_class = cls._services[provider]
+        with Tracer.start_span("ai.create_service", provider=provider):
+            service = service_class()
+            if service_class.metered:
+                service = MeteredService(provider, service)
+            service = InstrumentedService(provider, service)
+            limiter = RateLimiter.for_provider(provider)
+            if limiter is not None:
+                service = RateLimitedService(provider, service, limiter)
+            if service_class.resilient:
+                service = ResilientService(provider, service)
+            return service
+
+    @classmethod
+    def warm_up(cls, providers: Optional[Iterable[str]] = None,
+                background: bool = True) -> Optional[threading.Thread]:
+        """
+        Crea por adelantado las instancias de los proveedores.
+
+        Args:
+            providers: Proveedores a preparar; por defecto todos
+            background: Si es True se hace en un hilo aparte
+
+        Returns:
+            El hilo de precalentamiento si background es True
+        """
+        names = list(providers) if providers is not None else cls.get_available_providers()
+        names = [name for name in names if name not in cls._instances]
+        if not names:
+            return None
+        if background and cls._warm_up_thread is not None and cls._warm_up_thread.is_alive():
+            return cls._warm_up_thread
+
+        def _warm() -> None:
+            for name in names:
+                try:
+                    cls.get_service(name)
+                except Exception as e:
+                    Logger.warning(f"No se pudo precalentar {name}: {str(e)}")
+
+        if not background:
+            _warm()
+            return None
+        thread = threading.Thread(target=_warm, name="ai-warm-up", daemon=True)
+        thread.start()
+        cls._warm_up_thread = thread
+        return thread
+
+    @classmethod
+    def refresh(cls, provider: Optional[str] = None) -> None:
+        """
+        Descarta y cierra las instancias para que se recreen con la
+        configuración y credenciales actuales.
+
+        Args:
+            provider: Proveedor a refrescar; por defecto todos
+        """
+        with cls._lock:
+            names = [provider] if provider else list(cls._instances)
+            services = [cls._instances.pop(name) for name in names if name in cls._instances]
+            for name in names:
+                cls._config_keys.pop(name, None)
+            RateLimiter.reset(provider)
+        for service in services:
+            try:
+                service.close()
+            except Exception as e:
+                Logger.warning(f"Error cerrando servicio: {str(e)}")
+
     @classmethod
-    def get_available_providers(cls) -> List[str]:
+    def close(cls) -> None:
+        """Cierra todas las instancias compartidas"""
+        cls.refresh()
+
+    @classmethod
+    def get_available_providers(cls, include_meta: bool = True) -> List[str]:
         """
         Retorna la lista de proveedores disponibles.
 
+        Args:
+            include_meta: Si es False se omiten los pseudo-proveedores
+                (router, mock), p. ej. para sumar totales sin contar dos veces
+
         Returns:
             Lista de nombres de proveedores
         """
-        return list(cls._services.keys())
+        return [name for name, service_class in cls._services.items()
+                if include_meta or not service_class.meta_provider]
 
     @classmethod
     def register_service(cls, name: str, service_class: Type[AIServiceInterface]) -> None:
@@ -56,3 +192,4 @@ def register_service(cls, name: str, service_class: Type[AIServiceInterface]) ->
             service_class: Clase que implementa AIServiceInterface
         """
         cls._services[name] = service_class
+        cls.refresh(name)
@@ -0,0 +1,345 @@
+import http.client
+import json
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config.configuration import Configuration
+from app.utils.logger import Logger
+from app.utils.metrics import HTTP_CONNECTIONS
+
+try:  # HTTP/2 opcional: requiere httpx con el extra http2 (h2)
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
+
+# Límites del pool si la configuración del proveedor no los define
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_MAX_KEEPALIVE = 5
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30.0
+
+# Errores que indican que el servidor cerró una conexión reutilizada
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                 BrokenPipeError, http.client.CannotSendRequest)
+
+# Métodos que se pueden reenviar sin riesgo de duplicar efectos
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+
+HostKey = Tuple[str, str, int]
+
+
+class HttpResponse:
+    """Respuesta HTTP ya leída por completo"""
+
+    __slots__ = ('status', 'headers', 'content')
+
+    def __init__(self, status: int, headers: Dict[str, str], content: bytes):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise HttpError(self.status, self.text[:200])
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones keep-alive hacia un único host.
+
+    Las conexiones ociosas se reutilizan en orden LIFO (la más reciente es la
+    que menos probablemente cerró el servidor) y se descartan al superar
+    keepalive_expiry. Un semáforo limita las conexiones abiertas a la vez.
+    """
+
+    def __init__(self, scheme: str, host: str, port: int,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._label = f"{host}:{port}"
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        HTTP_CONNECTIONS.labels(host=self._label, event='opened').inc()
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout,
+                context=self.ssl_context or ssl.create_default_context()
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Retorna una conexión ociosa vigente o una nueva, y si fue reutilizada"""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, idle_since = self._idle.pop()
+                if now - idle_since < self.keepalive_expiry:
+                    HTTP_CONNECTIONS.labels(host=self._label, event='reused').inc()
+                    return conn, True
+                conn.close()
+        return self._new_connection(), False
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_keepalive:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> HttpResponse:
+        """
+        Envía una solicitud por una conexión del pool.
+
+        El timeout indicado vale solo para esta solicitud; la conexión vuelve
+        al pool con el del pool. Si una conexión reutilizada resulta cerrada
+        por el servidor se reintenta una vez con una conexión nueva, siempre
+        que la solicitud no llegara a enviarse o el método sea idempotente:
+        un POST ya enviado no se repite.
+        """
+        if self._closed:
+            raise RuntimeError(f"Pool cerrado: {self._label}")
+        with self._slots:
+            conn, reused = self._checkout()
+            while True:
+                sent = False
+                try:
+                    self._set_timeout(conn, self.timeout if timeout is None else timeout)
+                    conn.request(method, path, body=body, headers=headers or {})
+                    sent = True
+                    response = conn.getresponse()
+                    content = response.read()
+                except _STALE_ERRORS:
+                    conn.close()
+                    if not reused or (sent and method.upper() not in IDEMPOTENT_METHODS):
+                        raise
+                    conn, reused = self._new_connection(), False
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                break
+
+            if response.will_close:
+                conn.close()
+            else:
+                if timeout is not None:
+                    self._set_timeout(conn, self.timeout)
+                self._checkin(conn)
+            return HttpResponse(response.status, dict(response.getheaders()), content)
+
+    @staticmethod
+    def _set_timeout(conn: http.client.HTTPConnection, timeout: float) -> None:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+class HttpClient:
+    """Cliente HTTP/1.1 con un pool keep-alive por host"""
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._pools: Dict[HostKey, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, host: str, port: int) -> ConnectionPool:
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = ConnectionPool(
+                        scheme, host, port,
+                        max_connections=self.max_connections,
+                        max_keepalive=self.max_keepalive,
+                        keepalive_expiry=self.keepalive_expiry,
+                        timeout=self.timeout,
+                        ssl_context=self.ssl_context
+                    )
+                    self._pools[key] = pool
+        return pool
+
+    def request(self, method: str, url: str, json_body: Any = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> HttpResponse:
+        """
+        Envía una solicitud HTTP reutilizando conexiones al mismo host.
+
+        Args:
+            method: Método HTTP
+            url: URL absoluta
+            json_body: Cuerpo a serializar como JSON
+            headers: Encabezados adicionales
+            timeout: Timeout de esta solicitud en segundos
+
+        Returns:
+            La respuesta leída por completo
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Esquema no soportado: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        body = None
+        request_headers = {'Connection': 'keep-alive', **(headers or {})}
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            request_headers.setdefault('Content-Type', 'application/json')
+
+        pool = self._pool(parts.scheme, parts.hostname, port)
+        return pool.request(method, path, body=body, headers=request_headers, timeout=timeout)
+
+    def post_json(self, url: str, payload: Any, headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None) -> Any:
+        """Envía un POST con cuerpo JSON y retorna la respuesta decodificada"""
+        response = self.request('POST', url, json_body=payload, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+class Http2Client(HttpClient):
+    """
+    Cliente con HTTP/2 (vía httpx): las solicitudes concurrentes a un host se
+    multiplexan sobre una misma conexión.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        super().__init__(max_connections, max_keepalive, keepalive_expiry, timeout, ssl_context)
+        self._client = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            verify=ssl_context or True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+    def request(self, method: str, url: str, json_body: Any = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> HttpResponse:
+        response = self._client.request(
+            method, url, json=json_body, headers=headers,
+            timeout=timeout if timeout is not None else self.timeout
+        )
+        return HttpResponse(response.status_code, dict(response.headers), response.content)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class HttpTransport:
+    """
+    Clientes HTTP compartidos por proveedor de IA.
+
+    Cada proveedor obtiene un único cliente por proceso, con los límites de
+    Configuration.settings['ai_providers'][proveedor]: max_connections,
+    max_keepalive, keepalive_expiry y http2. HTTP/2 se usa solo si httpx y h2
+    están instalados; si no, se usa HTTP/1.1 con keep-alive.
+    """
+
+    _clients: Dict[str, HttpClient] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def client(cls, provider: str) -> HttpClient:
+        """Obtiene el cliente compartido del proveedor, creándolo si es necesario"""
+        client = cls._clients.get(provider)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(provider)
+                if client is None:
+                    client = cls._create_client(provider)
+                    cls._clients[provider] = client
+        return client
+
+    @classmethod
+    def _create_client(cls, provider: str) -> HttpClient:
+        config = Configuration()
+        settings = (config.get_setting('ai_providers') or {}).get(provider, {})
+        limits = {
+            'max_connections': int(settings.get('max_connections', DEFAULT_MAX_CONNECTIONS)),
+            'max_keepalive': int(settings.get('max_keepalive', DEFAULT_MAX_KEEPALIVE)),
+            'keepalive_expiry': float(settings.get('keepalive_expiry', DEFAULT_KEEPALIVE_EXPIRY)),
+            'timeout': float(config.get_setting('request_timeout') or DEFAULT_TIMEOUT)
+        }
+        if settings.get('http2', True) and httpx is not None:
+            return Http2Client(**limits)
+        return HttpClient(**limits)
+
+    @classmethod
+    def close(cls, provider: Optional[str] = None) -> None:
+        """
+        Cierra los clientes (o solo el del proveedor indicado); se recrean
+        con la configuración vigente en el próximo uso.
+        """
+        with cls._lock:
+            names = [provider] if provider else list(cls._clients)
+            clients = [cls._clients.pop(name) for name in names if name in cls._clients]
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                Logger.warning(f"Error cerrando cliente HTTP: {str(e)}")
@@ -3,6 +3,8 @@
 
 from app.components.certificados import Certificados
 from app.components.solicitudes import Solicitudes
+from app.services.factory import ServiceFactory
+from app.services.telemetry import TelemetryRegistry
 from app.utils.cache import CacheManager
 
 
@@ -54,10 +56,10 @@ def _get_daily_metrics(self, days: int) -> Dict:
         }
 
     def _get_provider_stats(self) -> Dict:
+        snapshot = TelemetryRegistry.snapshot()
         return {
-            'openai': 40,
-            'vertex': 35,
-            'sambanova': 25
+            provider: snapshot.get(provider, {}).get('calls', 0)
+            for provider in ServiceFactory.get_available_providers(include_meta=False)
         }
 
     def _get_daily_requests(self, start_date: datetime, end_date: datetime) -> Dict:
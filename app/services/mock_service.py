@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from typing import Any, Dict, Iterator, List
+
+from app.config.configuration import Configuration
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.factory import ServiceFactory
+from app.services.http_transport import HttpError
+
+# Valores por defecto si la configuración no los define
+DEFAULTS: Dict[str, Any] = {
+    'latency': 'lognormal',    # fixed, lognormal o pareto
+    'median_latency': 0.4,     # segundos hasta el primer fragmento
+    'sigma': 0.6,              # dispersión de la lognormal
+    'pareto_alpha': 2.0,       # menor alfa, cola más pesada
+    'tail_probability': 0.0,   # fracción de llamadas con latencia multiplicada
+    'tail_multiplier': 10.0,
+    'error_rate': 0.0,         # fracción de llamadas que fallan con HTTP 503
+    'tokens_per_second': 50.0,
+    'response_tokens': 60,
+    'seed': None
+}
+
+WORDS = (
+    "calibración balanza termómetro incertidumbre trazabilidad patrón medición "
+    "tolerancia ajuste certificado norma ISO 17025 laboratorio equipo error lectura "
+    "resolución repetibilidad temperatura masa volumen procedimiento"
+).split()
+
+
+class LatencyModel:
+    """
+    Distribución de la latencia hasta el primer fragmento.
+
+    - fixed: siempre la mediana
+    - lognormal: mediana y sigma dadas
+    - pareto: mínimo tal que la mediana sea la indicada, con cola de índice alfa
+
+    Además, con probabilidad tail_probability la muestra se multiplica por
+    tail_multiplier, para simular pausas del proveedor (colas pesadas).
+    """
+
+    def __init__(self, settings: Dict[str, Any], rng: random.Random):
+        self.kind = settings['latency']
+        self.median = float(settings['median_latency'])
+        self.sigma = float(settings['sigma'])
+        self.alpha = float(settings['pareto_alpha'])
+        self.tail_probability = float(settings['tail_probability'])
+        self.tail_multiplier = float(settings['tail_multiplier'])
+        self.rng = rng
+        if self.kind not in ('fixed', 'lognormal', 'pareto'):
+            raise ValueError(f"Distribución de latencia no soportada: {self.kind}")
+
+    def sample(self) -> float:
+        if self.kind == 'lognormal':
+            value = self.rng.lognormvariate(math.log(self.median), self.sigma)
+        elif self.kind == 'pareto':
+            # La mediana de una Pareto(alfa, x_m) es x_m * 2^(1/alfa)
+            value = self.median / 2 ** (1 / self.alpha) * self.rng.paretovariate(self.alpha)
+        else:
+            value = self.median
+        if self.tail_probability and self.rng.random() < self.tail_probability:
+            value *= self.tail_multiplier
+        return value
+
+
+class MockService(AIServiceInterface):
+    """
+    Proveedor simulado para pruebas de carga sin llamar a proveedores reales.
+
+    Duerme según la distribución de latencia configurada, falla con HTTP 503
+    en la fracción de llamadas indicada (antes del primer fragmento, así los
+    reintentos lo pueden absorber) y emite la respuesta a tokens_per_second.
+    Pasa por la misma cadena de envoltorios que los proveedores reales.
+
+    Config: sección mock_provider (ver DEFAULTS); configure() la reemplaza
+    desde código, p. ej. en el harness de carga.
+    """
+
+    meta_provider = True
+
+    _overrides: Dict[str, Any] = {}
+
+    def __init__(self):
+        settings = dict(DEFAULTS)
+        settings.update(Configuration().get_setting('mock_provider') or {})
+        settings.update(self._overrides)
+        self.model = "mock-1"
+        self.settings = settings
+        self.rng = random.Random(settings['seed'])
+        self.latency = LatencyModel(settings, self.rng)
+        self.error_rate = float(settings['error_rate'])
+        self.tokens_per_second = float(settings['tokens_per_second'])
+        self.response_tokens = int(settings['response_tokens'])
+
+    @classmethod
+    def configure(cls, **settings: Any) -> None:
+        """Fija parámetros para las instancias que se creen a continuación"""
+        unknown = set(settings) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        cls._overrides = settings
+
+    def _response(self, prompt: str) -> List[str]:
+        """Respuesta determinística para el prompt, un token por palabra"""
+        digest = int(hashlib.sha1(prompt.encode('utf-8')).hexdigest(), 16)
+        words = random.Random(digest)
+        return ["Respuesta"] + [words.choice(WORDS) for _ in range(self.response_tokens - 1)]
+
+    def _first_token_delay(self) -> float:
+        """Latencia del próximo intento; lanza HttpError si el intento falla"""
+        delay = self.latency.sample()
+        if self.error_rate and self.rng.random() < self.error_rate:
+            # El error llega tras una fracción de la latencia, como un 503 real
+            time.sleep(delay * self.rng.random())
+            raise HttpError(503, "Error simulado del proveedor")
+        return delay
+
+    async def _afirst_token_delay(self) -> float:
+        delay = self.latency.sample()
+        if self.error_rate and self.rng.random() < self.error_rate:
+            await asyncio.sleep(delay * self.rng.random())
+            raise HttpError(503, "Error simulado del proveedor")
+        return delay
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def get_completion(self, prompt: str) -> str:
+        words = self._response(prompt)
+        time.sleep(self._first_token_delay() + self._generation_time(len(words)))
+        return ' '.join(words)
+
+    def process_request(self, request_data: dict) -> dict:
+        time.sleep(self._first_token_delay() + self._generation_time(self.response_tokens // 4))
+        return self._process_response(request_data)
+
+    def _process_response(self, request_data: dict) -> dict:
+        equipment = request_data.get('equipment') or {}
+        return {
+            "response": json.dumps({
+                "service_type": request_data.get('service_type'),
+                "equipment_model": equipment.get('model') or None,
+                "equipment_serial": equipment.get('serial') or None,
+                "urgency": request_data.get('urgency') or "Normal"
+            }, ensure_ascii=False),
+            "provider": "mock"
+        }
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        words = self._response(prompt)
+        time.sleep(self._first_token_delay())
+        interval = self._generation_time(1)
+        for i, word in enumerate(words):
+            if i and interval:
+                time.sleep(interval)
+            yield word + " "
+
+    async def aget_completion(self, prompt: str) -> str:
+        words = self._response(prompt)
+        await asyncio.sleep(await self._afirst_token_delay() + self._generation_time(len(words)))
+        return ' '.join(words)
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        await asyncio.sleep(await self._afirst_token_delay()
+                            + self._generation_time(self.response_tokens // 4))
+        return self._process_response(request_data)
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        await asyncio.sleep(await self._afirst_token_delay()
+                            + self._generation_time(len(chunk) * self.response_tokens // 4))
+        return [self._process_response(request) for request in chunk]
+
+
+# Registro en la fábrica; solo queda disponible donde se importa este módulo
+ServiceFactory.register_service("mock", MockService)
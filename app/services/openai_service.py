@@ -1,7 +1,8 @@
-from typing import Dict
+from typing import Any, Dict, Iterator, List
 
 from app.config.secrets_manager import SecretsManager
 from app.services.ai_service_interface import AIServiceInterface
+from app.services.http_transport import HttpTransport
 from app.utils.logger import Logger
 
 
@@ -9,6 +10,11 @@ class OpenAIService(AIServiceInterface):
     def __init__(self):
         self.api_key = SecretsManager.get_secret("OPENAI_API_KEY")
         self.model = "gpt-3.5-turbo"  # modelo por defecto
+        self.http = HttpTransport.client("openai")
+
+    def close(self) -> None:
+        """Cierra el pool de conexiones compartido del proveedor"""
+        HttpTransport.close("openai")
 
     def get_completion(self, prompt: str) -> str:
         """
@@ -21,7 +27,8 @@ def get_completion(self, prompt: str) -> str:
             La respuesta generada por el modelo
         """
         try:
-            # Aquí iría la llamada real a la API de OpenAI
+            # Aquí iría la llamada real a la API de OpenAI vía self.http.post_json(...),
+            # con model=self.current_model()
             return f"OpenAI respuesta simulada para: {prompt}"
         except Exception as e:
             Logger.error(f"Error en OpenAI completion: {str(e)}")
@@ -45,3 +52,77 @@ def process_request(self, request_data: Dict) -> Dict:
         except Exception as e:
             Logger.error(f"Error procesando solicitud OpenAI: {str(e)}")
             raise
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """
+        Obtiene la respuesta del modelo OpenAI en fragmentos.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Yields:
+            Fragmentos consecutivos de la respuesta
+        """
+        try:
+            # Aquí iría la llamada real con streaming a OpenAI
+            for word in f"OpenAI respuesta simulada para: {prompt}".split(" "):
+                yield word + " "
+        except Exception as e:
+            Logger.error(f"Error en OpenAI streaming: {str(e)}")
+            raise
+
+    async def aget_completion(self, prompt: str) -> str:
+        """
+        Obtiene una respuesta del modelo OpenAI sin bloquear el loop.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Returns:
+            La respuesta generada por el modelo
+        """
+        try:
+            # Aquí iría la llamada asíncrona real a OpenAI
+            return f"OpenAI respuesta simulada para: {prompt}"
+        except Exception as e:
+            Logger.error(f"Error en OpenAI completion asíncrona: {str(e)}")
+            raise
+
+    async def aprocess_request(self, request_data: Dict) -> Dict:
+        """
+        Procesa una solicitud usando OpenAI sin bloquear el loop.
+
+        Args:
+            request_data: Datos de la solicitud
+
+        Returns:
+            Respuesta procesada
+        """
+        try:
+            return {
+                "response": f"OpenAI procesó: {request_data}",
+                "provider": "openai"
+            }
+        except Exception as e:
+            Logger.error(f"Error procesando solicitud OpenAI asíncrona: {str(e)}")
+            raise
+
+    async def _acall_native_batch(self, chunk: List[Dict]) -> List[Any]:
+        """
+        Procesa un bloque de solicitudes en una sola llamada a OpenAI.
+
+        Args:
+            chunk: Datos de las solicitudes del bloque
+
+        Returns:
+            Una respuesta por solicitud, en el mismo orden
+        """
+        try:
+            # Aquí iría una única llamada real con todos los prompts del bloque
+            return [
+                {"response": f"OpenAI procesó: {request_data}", "provider": "openai"}
+                for request_data in chunk
+            ]
+        except Exception as e:
+            Logger.error(f"Error en lote OpenAI: {str(e)}")
+            raise
@@ -0,0 +1,344 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import redis
+
+from app.config.configuration import Configuration
+from app.services.ai_service_interface import AIServiceInterface
+from app.utils.logger import Logger
+from app.utils.metrics import AI_RATE_LIMIT_WAIT_SECONDS, AI_RATE_LIMITED
+from app.utils.tokens import estimate_tokens, tokens_for_chars
+
+# Comportamiento al alcanzar la cuota
+QUEUE = 'queue'  # esperar turno hasta max_wait segundos
+FAIL = 'fail'    # rechazar de inmediato
+
+DEFAULT_MAX_WAIT = 10.0
+# Tras un error de Redis se usan los baldes locales durante este lapso
+REDIS_RETRY_INTERVAL = 30.0
+# Capacidad de un balde sin cuota configurada; en la práctica, ilimitado
+UNLIMITED = 1e12
+REDIS_KEY_PREFIX = 'acma:ratelimit'
+
+# (capacidad, tasa de recarga por segundo)
+BucketSpec = Tuple[float, float]
+
+# Toma n fichas de cada balde solo si todos las tienen; si no, retorna la espera.
+# Con force=1 las descuenta igual (pueden quedar en negativo), para cargar
+# consumos que se conocen recién al terminar la llamada.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local force = tonumber(ARGV[#ARGV])
+local wait = 0
+local levels = {}
+for i = 1, #KEYS do
+    local cap = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local n = tonumber(ARGV[(i - 1) * 3 + 3])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or cap
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if force == 0 and tokens < n then
+        wait = math.max(wait, (n - tokens) / rate)
+    end
+end
+if wait == 0 then
+    for i = 1, #KEYS do
+        local cap = tonumber(ARGV[(i - 1) * 3 + 1])
+        local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+        local n = tonumber(ARGV[(i - 1) * 3 + 3])
+        redis.call('HSET', KEYS[i], 'tokens', levels[i] - n, 'ts', now)
+        redis.call('EXPIRE', KEYS[i], math.ceil(cap / rate) * 2 + 1)
+    end
+end
+return tostring(wait)
+"""
+
+
+class RateLimitExceeded(Exception):
+    """La cuota del proveedor no alcanza dentro del plazo permitido"""
+
+
+class LocalBuckets:
+    """Baldes de fichas del proceso actual"""
+
+    def __init__(self, specs: Sequence[BucketSpec]):
+        self.specs = list(specs)
+        self.levels = [capacity for capacity, _ in self.specs]
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, amounts: Sequence[float], force: bool = False) -> float:
+        """Retorna 0 si tomó las fichas o los segundos a esperar para tenerlas"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.updated = now
+            wait = 0.0
+            for i, ((capacity, rate), amount) in enumerate(zip(self.specs, amounts)):
+                self.levels[i] = min(capacity, self.levels[i] + elapsed * rate)
+                if not force and self.levels[i] < amount:
+                    wait = max(wait, (amount - self.levels[i]) / rate)
+            if wait == 0:
+                for i, amount in enumerate(amounts):
+                    self.levels[i] -= amount
+            return wait
+
+
+class RedisBuckets:
+    """Baldes de fichas en Redis, compartidos por todos los procesos"""
+
+    def __init__(self, client: redis.Redis, keys: Sequence[str], specs: Sequence[BucketSpec]):
+        self.client = client
+        self.keys = list(keys)
+        self.specs = list(specs)
+        self._script = client.register_script(_ACQUIRE_SCRIPT)
+
+    def try_acquire(self, amounts: Sequence[float], force: bool = False) -> float:
+        args: List[Any] = []
+        for (capacity, rate), amount in zip(self.specs, amounts):
+            args.extend([capacity, rate, amount])
+        args.append(1 if force else 0)
+        return float(self._script(keys=self.keys, args=args))
+
+
+class RateLimiter:
+    """
+    Límite de solicitudes y tokens por minuto de un proveedor.
+
+    Cada llamada toma una ficha del balde de solicitudes y las fichas de los
+    tokens estimados del prompt; los tokens de la respuesta se descuentan al
+    terminar. Si la cuota no alcanza, se espera turno hasta max_wait segundos
+    (on_limit = 'queue') o se rechaza de inmediato ('fail'). Nunca se espera
+    si ya se sabe que el turno llegaría después del plazo.
+
+    Config: requests_per_minute y tokens_per_minute en ai_providers.<proveedor>;
+    sección rate_limiting con backend ('memory' o 'redis'), redis_url,
+    on_limit y max_wait.
+    """
+
+    _limiters: Dict[str, Optional['RateLimiter']] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, provider: str, requests_per_minute: float, tokens_per_minute: float,
+                 on_limit: str = QUEUE, max_wait: float = DEFAULT_MAX_WAIT,
+                 redis_client: Optional[redis.Redis] = None):
+        self.provider = provider
+        self.on_limit = on_limit
+        self.max_wait = max_wait
+        # Cuotas en 0 se tratan como ilimitadas
+        self._request_cap = requests_per_minute or UNLIMITED
+        self._token_cap = tokens_per_minute or UNLIMITED
+        specs = [
+            (self._request_cap, self._request_cap / 60.0),
+            (self._token_cap, self._token_cap / 60.0)
+        ]
+        # Los baldes locales son también el respaldo si Redis deja de responder
+        self.local = LocalBuckets(specs)
+        self.buckets: Any = self.local
+        if redis_client is not None:
+            self.buckets = RedisBuckets(
+                redis_client,
+                [f"{REDIS_KEY_PREFIX}:{provider}:rpm", f"{REDIS_KEY_PREFIX}:{provider}:tpm"],
+                specs
+            )
+        self._redis_retry_at = 0.0
+
+    @classmethod
+    def for_provider(cls, provider: str) -> Optional['RateLimiter']:
+        """Limitador compartido del proveedor, o None si no tiene cuotas configuradas"""
+        if provider not in cls._limiters:
+            with cls._lock:
+                if provider not in cls._limiters:
+                    cls._limiters[provider] = cls._create(provider)
+        return cls._limiters[provider]
+
+    @classmethod
+    def _create(cls, provider: str) -> Optional['RateLimiter']:
+        config = Configuration()
+        limits = (config.get_setting('ai_providers') or {}).get(provider, {})
+        rpm = float(limits.get('requests_per_minute') or 0)
+        tpm = float(limits.get('tokens_per_minute') or 0)
+        if not rpm and not tpm:
+            return None
+
+        settings = config.get_setting('rate_limiting') or {}
+        redis_client = None
+        if settings.get('backend') == 'redis':
+            try:
+                redis_client = redis.Redis.from_url(
+                    settings.get('redis_url', 'redis://localhost:6379/0'), socket_timeout=2
+                )
+                redis_client.ping()
+            except Exception as e:
+                Logger.warning(f"Redis no disponible para límites de {provider}, "
+                               f"se usan límites locales: {e}")
+                redis_client = None
+        return cls(
+            provider, rpm, tpm,
+            on_limit=settings.get('on_limit', QUEUE),
+            max_wait=float(settings.get('max_wait', DEFAULT_MAX_WAIT)),
+            redis_client=redis_client
+        )
+
+    @classmethod
+    def reset(cls, provider: Optional[str] = None) -> None:
+        """Descarta los limitadores para que se recreen con la configuración vigente"""
+        with cls._lock:
+            if provider is None:
+                cls._limiters.clear()
+            else:
+                cls._limiters.pop(provider, None)
+
+    def _try_acquire(self, amounts: Sequence[float], force: bool = False) -> float:
+        """
+        Toma fichas de los baldes compartidos. Si Redis falla, usa los locales
+        por REDIS_RETRY_INTERVAL segundos antes de volver a intentarlo: una
+        caída de Redis no debe cortar las llamadas a IA.
+        """
+        if self._use_redis():
+            try:
+                return self.buckets.try_acquire(amounts, force)
+            except redis.RedisError as e:
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+                Logger.warning(f"Redis no disponible para límites de {self.provider}, "
+                               f"se usan límites locales: {str(e)}")
+        return self.local.try_acquire(amounts, force)
+
+    def _use_redis(self) -> bool:
+        return self.buckets is not self.local and time.monotonic() >= self._redis_retry_at
+
+    async def _atry_acquire(self, amounts: Sequence[float], force: bool = False) -> float:
+        """
+        Versión asíncrona de _try_acquire. La llamada a Redis es bloqueante
+        (hasta el socket_timeout) y el loop es compartido por todos los
+        proveedores, así que se hace en un hilo; los baldes locales se usan
+        directamente.
+        """
+        if not self._use_redis():
+            return self.local.try_acquire(amounts, force)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._try_acquire, amounts, force)
+
+    def _amounts(self, tokens: int) -> List[float]:
+        # Un pedido mayor que el balde completo se limita a su capacidad
+        return [1.0, float(min(tokens, self._token_cap))]
+
+    def _reject(self, wait: float) -> RateLimitExceeded:
+        AI_RATE_LIMITED.labels(self.provider).inc()
+        return RateLimitExceeded(
+            f"Cuota de {self.provider} agotada; turno disponible en {wait:.1f}s"
+        )
+
+    def acquire(self, tokens: int) -> None:
+        """Espera (según on_limit) hasta poder enviar una solicitud de `tokens` tokens"""
+        start = time.monotonic()
+        deadline = start + (self.max_wait if self.on_limit == QUEUE else 0.0)
+        amounts = self._amounts(tokens)
+        while True:
+            wait = self._try_acquire(amounts)
+            if wait == 0:
+                AI_RATE_LIMIT_WAIT_SECONDS.labels(self.provider).observe(time.monotonic() - start)
+                return
+            if time.monotonic() + wait > deadline:
+                raise self._reject(wait)
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Versión asíncrona de acquire"""
+        start = time.monotonic()
+        deadline = start + (self.max_wait if self.on_limit == QUEUE else 0.0)
+        amounts = self._amounts(tokens)
+        while True:
+            wait = await self._atry_acquire(amounts)
+            if wait == 0:
+                AI_RATE_LIMIT_WAIT_SECONDS.labels(self.provider).observe(time.monotonic() - start)
+                return
+            if time.monotonic() + wait > deadline:
+                raise self._reject(wait)
+            await asyncio.sleep(wait)
+
+    def charge(self, tokens: int) -> None:
+        """Descuenta tokens ya consumidos (p. ej. los de la respuesta)"""
+        if tokens > 0:
+            try:
+                self._try_acquire([0.0, float(tokens)], force=True)
+            except Exception as e:
+                Logger.warning(f"No se pudo descontar cuota de {self.provider}: {str(e)}")
+
+    async def acharge(self, tokens: int) -> None:
+        """Versión asíncrona de charge"""
+        if tokens > 0:
+            try:
+                await self._atry_acquire([0.0, float(tokens)], force=True)
+            except Exception as e:
+                Logger.warning(f"No se pudo descontar cuota de {self.provider}: {str(e)}")
+
+
+class RateLimitedService(AIServiceInterface):
+    """Envoltorio que respeta la cuota del proveedor antes de cada llamada"""
+
+    def __init__(self, provider: str, service: AIServiceInterface, limiter: RateLimiter):
+        self.provider = provider
+        self.service = service
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def close(self) -> None:
+        self.service.close()
+
+    @property
+    def supports_native_batch(self) -> bool:
+        return self.service.supports_native_batch
+
+    @property
+    def batch_chunk_size(self) -> int:
+        return self.service.batch_chunk_size
+
+    def get_completion(self, prompt: str) -> str:
+        self.limiter.acquire(estimate_tokens(prompt))
+        response = self.service.get_completion(prompt)
+        self.limiter.charge(estimate_tokens(response or ''))
+        return response
+
+    def process_request(self, request_data: dict) -> dict:
+        self.limiter.acquire(estimate_tokens(str(request_data)))
+        response = self.service.process_request(request_data)
+        self.limiter.charge(estimate_tokens(str(response)))
+        return response
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        self.limiter.acquire(estimate_tokens(prompt))
+        size = 0
+        try:
+            for chunk in self.service.stream_completion(prompt):
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.limiter.charge(tokens_for_chars(size))
+
+    async def aget_completion(self, prompt: str) -> str:
+        await self.limiter.aacquire(estimate_tokens(prompt))
+        response = await self.service.aget_completion(prompt)
+        await self.limiter.acharge(estimate_tokens(response or ''))
+        return response
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        await self.limiter.aacquire(estimate_tokens(str(request_data)))
+        response = await self.service.aprocess_request(request_data)
+        await self.limiter.acharge(estimate_tokens(str(response)))
+        return response
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        # Un lote nativo es una sola solicitud con los tokens de todos sus ítems
+        await self.limiter.aacquire(sum(estimate_tokens(str(r)) for r in chunk))
+        outcomes = await self.service._acall_native_batch(chunk)
+        await self.limiter.acharge(sum(estimate_tokens(str(o)) for o in outcomes))
+        return outcomes
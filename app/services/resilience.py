@@ -0,0 +1,432 @@
+import asyncio
+import contextvars
+import queue
+import random
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.config.configuration import Configuration
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.http_transport import HttpError
+from app.services.telemetry import TelemetryRegistry
+from app.utils.logger import Logger
+from app.utils.metrics import AI_HEDGED_REQUESTS, AI_RETRIES
+
+# Valores por defecto si la configuración no los define
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_MAX_BACKOFF = 10.0
+DEFAULT_RETRY_BUDGET = 0.2
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_ATTEMPT_THREADS = 32
+DEFAULT_MAX_ABANDONED = 8
+
+# Errores de red o de plazo que pueden no repetirse; socket.timeout no es
+# TimeoutError antes de 3.10
+RETRYABLE_ERRORS = (TimeoutError, ConnectionError, socket.timeout)
+
+class AttemptPool:
+    """
+    Pool de hilos daemon para los intentos síncronos.
+
+    Un intento vencido se abandona pero sigue ocupando su hilo hasta que la
+    llamada al proveedor retorne. A diferencia de ThreadPoolExecutor, cuyos
+    hilos se esperan al salir, una llamada colgada no bloquea el cierre del
+    proceso. Los hilos se crean a medida que hacen falta, hasta max_workers.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._queue: 'queue.Queue[Tuple[Future, Callable[[], Any]]]' = queue.Queue()
+        self._idle = threading.Semaphore(0)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[[], Any]) -> Future:
+        future: Future = Future()
+        self._queue.put((future, func))
+        if not self._idle.acquire(blocking=False):
+            with self._lock:
+                if len(self._threads) < self.max_workers:
+                    thread = threading.Thread(
+                        target=self._work, name=f"ai-attempt-{len(self._threads)}", daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+        return future
+
+    def _work(self) -> None:
+        while True:
+            future, func = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func()
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del future, func
+            self._idle.release()
+
+
+# Hilos para los intentos síncronos; permiten abandonar un intento vencido.
+# Se crea al primer uso con resilience.attempt_threads hilos, compartidos
+# por todos los proveedores
+_executor: Optional[AttemptPool] = None
+_executor_lock = threading.Lock()
+
+
+def _attempt_executor() -> AttemptPool:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = Configuration().get_setting('resilience') or {}
+                _executor = AttemptPool(int(settings.get('attempt_threads',
+                                                         DEFAULT_ATTEMPT_THREADS)))
+    return _executor
+
+
+class AttemptTimeout(TimeoutError):
+    """Un intento superó su plazo"""
+
+
+class ProviderSaturated(RuntimeError):
+    """
+    El proveedor ya tiene demasiados intentos vencidos que siguen ocupando
+    hilos; no se reintenta, para no acaparar el pool compartido
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Indica si vale la pena reintentar tras el error"""
+    if isinstance(error, HttpError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+class RetryBudget:
+    """
+    Presupuesto de reintentos: cada llamada deposita `ratio` fichas y cada
+    reintento consume una. Acota los reintentos a una fracción del tráfico
+    para no multiplicar la carga sobre un proveedor que ya está degradado.
+    """
+
+    def __init__(self, ratio: float = DEFAULT_RETRY_BUDGET, min_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class ResilientService(AIServiceInterface):
+    """
+    Envoltorio que aplica plazos por intento, reintentos con backoff
+    exponencial y jitter, presupuesto de reintentos y, opcionalmente,
+    solicitudes de cobertura (hedging).
+
+    Con hedging, si el intento no respondió tras el percentil configurado de
+    la latencia reciente del proveedor, se envía un duplicado y se usa la
+    primera respuesta exitosa.
+
+    Config: request_timeout, max_retries, retry_delay y la sección resilience
+    (max_backoff, retry_budget, hedging, hedge_percentile, hedge_min_samples,
+    attempt_threads, max_abandoned_attempts).
+
+    Los intentos síncronos corren en un pool compartido. La espera por un
+    hilo libre se acota con el mismo plazo del intento, y los intentos
+    vencidos que siguen en curso se cuentan por proveedor: pasado
+    max_abandoned_attempts se falla de inmediato con ProviderSaturated.
+    """
+
+    def __init__(self, provider: str, service: AIServiceInterface):
+        self.provider = provider
+        self.service = service
+        self.telemetry = TelemetryRegistry.get(provider)
+        config = Configuration()
+        settings = config.get_setting('resilience') or {}
+        self.timeout = float(config.get_setting('request_timeout') or DEFAULT_TIMEOUT)
+        max_retries = config.get_setting('max_retries')
+        self.max_retries = int(DEFAULT_MAX_RETRIES if max_retries is None else max_retries)
+        retry_delay = config.get_setting('retry_delay')
+        self.retry_delay = float(DEFAULT_RETRY_DELAY if retry_delay is None else retry_delay)
+        self.max_backoff = float(settings.get('max_backoff', DEFAULT_MAX_BACKOFF))
+        self.hedging = bool(settings.get('hedging', False))
+        self.hedge_percentile = float(settings.get('hedge_percentile', DEFAULT_HEDGE_PERCENTILE))
+        self.hedge_min_samples = int(settings.get('hedge_min_samples', DEFAULT_HEDGE_MIN_SAMPLES))
+        self.budget = RetryBudget(float(settings.get('retry_budget', DEFAULT_RETRY_BUDGET)))
+        self.max_abandoned = int(settings.get('max_abandoned_attempts', DEFAULT_MAX_ABANDONED))
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def close(self) -> None:
+        self.service.close()
+
+    @property
+    def supports_native_batch(self) -> bool:
+        return self.service.supports_native_batch
+
+    @property
+    def batch_chunk_size(self) -> int:
+        return self.service.batch_chunk_size
+
+    # --- Política -----------------------------------------------------------
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera antes del reintento `attempt` (desde 0), con jitter completo"""
+        return random.uniform(0, min(self.max_backoff, self.retry_delay * (2 ** attempt)))
+
+    def _should_retry(self, operation: str, attempt: int, error: BaseException) -> bool:
+        if attempt >= self.max_retries or not is_retryable(error):
+            return False
+        if not self.budget.withdraw():
+            Logger.warning(f"Presupuesto de reintentos agotado para {self.provider}")
+            return False
+        AI_RETRIES.labels(self.provider, operation).inc()
+        Logger.warning(f"Reintentando {operation} en {self.provider} "
+                       f"(intento {attempt + 2}): {str(error)}")
+        return True
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Percentil de la latencia reciente del proveedor, o None sin datos suficientes"""
+        if not self.hedging:
+            return None
+        latencies = sorted(
+            latency for _, latency, ok in self.telemetry.recent() if ok
+        )
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))
+        return min(latencies[index], self.timeout)
+
+    # --- Llamadas síncronas -------------------------------------------------
+
+    def _call(self, operation: str, func: Callable[[], Any], hedge: bool = True) -> Any:
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(operation, func, hedge)
+            except Exception as e:
+                if not self._should_retry(operation, attempt, e):
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def _submit(self, operation: str, func: Callable[[], Any]) -> Tuple[Future, threading.Event]:
+        """Encola el intento; el evento se marca cuando un hilo lo empieza"""
+        if self._abandoned >= self.max_abandoned:
+            raise ProviderSaturated(
+                f"{self.provider}.{operation}: {self._abandoned} intentos vencidos siguen en curso"
+            )
+        context = contextvars.copy_context()
+        started = threading.Event()
+
+        def _run() -> Any:
+            started.set()
+            return context.run(func)
+
+        return _attempt_executor().submit(_run), started
+
+    def _release_abandoned(self, _: Future) -> None:
+        with self._abandoned_lock:
+            self._abandoned -= 1
+
+    def _abandon(self, futures: Iterable[Future]) -> None:
+        """Cancela los intentos en cola y cuenta los que siguen en curso"""
+        for future in futures:
+            if future.cancel() or future.done():
+                continue
+            with self._abandoned_lock:
+                self._abandoned += 1
+            # Si terminó entre medio, el callback corre ya mismo
+            future.add_done_callback(self._release_abandoned)
+
+    def _attempt(self, operation: str, func: Callable[[], Any], hedge: bool) -> Any:
+        primary, started = self._submit(operation, func)
+        # El plazo corre desde que el intento empieza; la espera por un hilo
+        # libre se acota aparte con el mismo plazo
+        if not started.wait(self.timeout) and primary.cancel():
+            raise AttemptTimeout(f"{self.provider}.{operation}: sin hilo libre en {self.timeout}s")
+        delay = self._hedge_delay() if hedge else None
+        if delay is None:
+            try:
+                return primary.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self._abandon([primary])
+                raise AttemptTimeout(f"{self.provider}.{operation} superó {self.timeout}s")
+
+        deadline = time.monotonic() + self.timeout
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        pending = {primary}
+        hedge_future: Optional[Future] = None
+        try:
+            hedge_future, _ = self._submit(operation, func)
+            pending.add(hedge_future)
+            AI_HEDGED_REQUESTS.labels(self.provider, 'sent').inc()
+        except ProviderSaturated:
+            pass
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge_future:
+                            AI_HEDGED_REQUESTS.labels(self.provider, 'won').inc()
+                        return future.result()
+                    error = future.exception()
+        finally:
+            self._abandon(pending)
+        if error is not None and not pending:
+            raise error
+        raise AttemptTimeout(f"{self.provider}.{operation} superó {self.timeout}s")
+
+    def get_completion(self, prompt: str) -> str:
+        return self._call('get_completion', lambda: self.service.get_completion(prompt))
+
+    def process_request(self, request_data: dict) -> dict:
+        return self._call('process_request', lambda: self.service.process_request(request_data))
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """
+        Reintenta solo mientras no se haya entregado ningún fragmento; el
+        plazo se aplica a la espera de cada fragmento.
+        """
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            started = False
+            try:
+                for chunk in self._stream_attempt(prompt):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._should_retry('stream_completion', attempt, e):
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def _stream_attempt(self, prompt: str) -> Iterator[str]:
+        chunks: 'queue.Queue[tuple]' = queue.Queue()
+        stop = threading.Event()
+
+        def _produce() -> None:
+            try:
+                for chunk in self.service.stream_completion(prompt):
+                    if stop.is_set():
+                        return
+                    chunks.put(('chunk', chunk))
+                chunks.put(('end', None))
+            except Exception as e:
+                chunks.put(('error', e))
+
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(_produce,),
+                         name="ai-stream", daemon=True).start()
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise AttemptTimeout(
+                        f"{self.provider}.stream_completion sin datos en {self.timeout}s"
+                    )
+                if kind == 'end':
+                    return
+                if kind == 'error':
+                    raise value
+                yield value
+        finally:
+            stop.set()
+
+    # --- Llamadas asíncronas ------------------------------------------------
+
+    async def _acall(self, operation: str, factory: Callable[[], Awaitable],
+                     hedge: bool = True) -> Any:
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self._aattempt(operation, factory, hedge)
+            except Exception as e:
+                if not self._should_retry(operation, attempt, e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+
+    async def _aattempt(self, operation: str, factory: Callable[[], Awaitable],
+                        hedge: bool) -> Any:
+        delay = self._hedge_delay() if hedge else None
+        primary = asyncio.ensure_future(factory())
+        tasks: List[asyncio.Future] = [primary]
+        try:
+            if delay is None:
+                done, _ = await asyncio.wait(tasks, timeout=self.timeout)
+            else:
+                deadline = time.monotonic() + self.timeout
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    AI_HEDGED_REQUESTS.labels(self.provider, 'sent').inc()
+                    tasks.append(asyncio.ensure_future(factory()))
+                    pending = set(tasks)
+                    while pending:
+                        done, pending = await asyncio.wait(
+                            pending, timeout=max(0.0, deadline - time.monotonic()),
+                            return_when=asyncio.FIRST_COMPLETED
+                        )
+                        if not done:
+                            break
+                        winners = [t for t in done if t.exception() is None]
+                        if winners:
+                            if winners[0] is not primary:
+                                AI_HEDGED_REQUESTS.labels(self.provider, 'won').inc()
+                            return winners[0].result()
+                        if not pending:
+                            return next(iter(done)).result()  # propaga el error
+            if not done:
+                raise AttemptTimeout(f"{self.provider}.{operation} superó {self.timeout}s")
+            return next(iter(done)).result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def aget_completion(self, prompt: str) -> str:
+        return await self._acall('aget_completion', lambda: self.service.aget_completion(prompt))
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        return await self._acall('aprocess_request',
+                                 lambda: self.service.aprocess_request(request_data))
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        # Sin hedging: duplicar un lote completo duplica su costo
+        return await self._acall('process_batch',
+                                 lambda: self.service._acall_native_batch(chunk), hedge=False)
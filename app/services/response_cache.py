@@ -0,0 +1,219 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config.configuration import Configuration
+from app.utils.logger import Logger
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.sketches import MinHash
+
+_HITS = CACHE_REQUESTS.labels('ai_response', 'hit')
+_NEAR_HITS = CACHE_REQUESTS.labels('ai_response', 'near_hit')
+_MISSES = CACHE_REQUESTS.labels('ai_response', 'miss')
+
+# Palabras sin contenido que no cambian el sentido de una consulta
+STOPWORDS: Set[str] = {
+    'a', 'al', 'como', 'con', 'cual', 'cuales', 'de', 'del', 'el', 'en', 'es', 'esta',
+    'este', 'hay', 'la', 'las', 'lo', 'los', 'me', 'mi', 'para', 'por', 'que', 'se',
+    'segun', 'son', 'su', 'sus', 'un', 'una', 'unos', 'unas', 'y', 'o', 'favor',
+    'puedes', 'podrias', 'dime', 'hola', 'the', 'of', 'is', 'are', 'what', 'and', 'to'
+}
+SHINGLE_SIZE = 4
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_SIMILARITY = 0.9
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Forma canónica de una consulta: minúsculas, sin acentos ni puntuación,
+    espacios colapsados y sin stopwords.
+    """
+    text = unicodedata.normalize('NFKD', prompt.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    words = re.findall(r'[a-z0-9]+', text)
+    return ' '.join(w for w in words if w not in STOPWORDS)
+
+
+def _shingles(normalized: str) -> Set[str]:
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+class _Entry:
+    __slots__ = ('scope', 'response', 'expires_at', 'signature')
+
+    def __init__(self, scope: str, response: str, expires_at: float,
+                 signature: Optional[np.ndarray]):
+        self.scope = scope
+        self.response = response
+        self.expires_at = expires_at
+        self.signature = signature
+
+
+class ResponseCache:
+    """
+    Caché de respuestas del asistente compartido por todas las sesiones.
+
+    La clave es la consulta normalizada junto con el proveedor y el modelo.
+    Opcionalmente, una consulta sin coincidencia exacta puede reutilizar la
+    respuesta de otra casi idéntica: cada entrada guarda su firma MinHash,
+    indexada por bandas (LSH), y se acepta el candidato más parecido si
+    supera el umbral de similitud.
+
+    Config (sección response_cache): enabled, ttl, max_entries,
+    near_duplicates, similarity, num_perm y bands.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Se publica recién inicializada: otro hilo no debe verla a medias
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self) -> None:
+        settings = Configuration().get_setting('response_cache') or {}
+        self.enabled = bool(settings.get('enabled', True))
+        self.ttl = float(settings.get('ttl', DEFAULT_TTL))
+        self.max_entries = int(settings.get('max_entries', DEFAULT_MAX_ENTRIES))
+        self.near_duplicates = bool(settings.get('near_duplicates', False))
+        self.similarity = float(settings.get('similarity', DEFAULT_SIMILARITY))
+        self.bands = int(settings.get('bands', DEFAULT_BANDS))
+        self.minhash = MinHash(int(settings.get('num_perm', DEFAULT_NUM_PERM)))
+        # Orden LRU: la entrada menos usada recientemente queda al principio
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scope(provider: str, model: str) -> str:
+        return f"{provider}|{model}"
+
+    @staticmethod
+    def _key(scope: str, normalized: str) -> str:
+        return hashlib.sha1(f"{scope}|{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, prompt: str, provider: str, model: str = '') -> Optional[str]:
+        """
+        Busca una respuesta para la consulta.
+
+        Args:
+            prompt: Consulta del usuario
+            provider: Proveedor que respondería
+            model: Modelo del proveedor
+
+        Returns:
+            La respuesta guardada o None
+        """
+        if not self.enabled:
+            return None
+        try:
+            scope = self._scope(provider, model)
+            normalized = normalize_prompt(prompt)
+            key = self._key(scope, normalized)
+            now = time.time()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    _HITS.inc()
+                    return entry.response
+                if entry is not None:
+                    self._remove(key)
+
+                if self.near_duplicates:
+                    response = self._find_similar(scope, normalized, now)
+                    if response is not None:
+                        _NEAR_HITS.inc()
+                        return response
+            _MISSES.inc()
+            return None
+        except Exception as e:
+            Logger.error(f"Error consultando caché de respuestas: {str(e)}")
+            return None
+
+    def put(self, prompt: str, provider: str, model: str, response: str) -> None:
+        """Guarda la respuesta de una consulta"""
+        if not self.enabled or not response:
+            return
+        try:
+            scope = self._scope(provider, model)
+            normalized = normalize_prompt(prompt)
+            key = self._key(scope, normalized)
+            signature = None
+            if self.near_duplicates:
+                signature = self.minhash.signature(_shingles(normalized))
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = _Entry(scope, response, time.time() + self.ttl, signature)
+                if signature is not None:
+                    for band in MinHash.bands(signature, self.bands):
+                        self._buckets.setdefault((scope, *band), set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    self._remove(next(iter(self._entries)))
+        except Exception as e:
+            Logger.error(f"Error guardando en caché de respuestas: {str(e)}")
+
+    def _find_similar(self, scope: str, normalized: str, now: float) -> Optional[str]:
+        signature = self.minhash.signature(_shingles(normalized))
+        candidates: Set[str] = set()
+        for band in MinHash.bands(signature, self.bands):
+            candidates |= self._buckets.get((scope, *band), set())
+
+        best_key, best_score = None, self.similarity
+        expired: List[str] = []
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                expired.append(key)
+                continue
+            score = MinHash.similarity(signature, entry.signature)
+            if score >= best_score:
+                best_key, best_score = key, score
+        for key in expired:
+            self._remove(key)
+
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key].response
+
+    def _remove(self, key: str) -> None:
+        """Elimina una entrada y su índice; requiere el lock tomado"""
+        entry = self._entries.pop(key)
+        if entry.signature is None:
+            return
+        for band in MinHash.bands(entry.signature, self.bands):
+            bucket_key = (entry.scope, *band)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def clear(self) -> None:
+        """Descarta todas las respuestas guardadas"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
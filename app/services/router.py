@@ -0,0 +1,313 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config.configuration import Configuration
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.factory import ServiceFactory
+from app.utils.logger import Logger
+from app.utils.metrics import AI_ROUTER_DECISIONS
+
+DEFAULT_BACKENDS = ["openai", "vertex", "sambanova"]
+DEFAULT_EWMA_ALPHA = 0.2
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 30.0
+DEFAULT_STICKY_TTL = 1800.0
+MAX_STICKY_SESSIONS = 10000
+
+# Estados del circuito de un backend
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_session_key: ContextVar[Optional[str]] = ContextVar('router_session', default=None)
+
+
+class BackendHealth:
+    """
+    Latencia y tasa de error (EWMA) de un backend, con su circuit breaker.
+
+    El circuito se abre tras failure_threshold fallos consecutivos y permanece
+    abierto open_seconds; luego deja pasar una única llamada de prueba.
+    """
+
+    def __init__(self, name: str, alpha: float, failure_threshold: int, open_seconds: float):
+        self.name = name
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Indica si el backend puede recibir una llamada ahora"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+            return self.state == HALF_OPEN and not self._probing
+
+    def acquire(self) -> bool:
+        """Reserva la llamada de prueba si el circuito está semiabierto"""
+        with self._lock:
+            if self.state != HALF_OPEN:
+                return self.state == CLOSED
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def release(self) -> None:
+        """Libera la llamada de prueba sin registrar resultado (llamada cancelada)"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                self.latency = latency if self.latency is None else \
+                    self.latency + self.alpha * (latency - self.latency)
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                return
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    Logger.warning(f"Circuito abierto para {self.name}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def weight(self, default_latency: float) -> float:
+        """Peso de selección: mayor cuanto más rápido y confiable"""
+        latency = self.latency if self.latency is not None else default_latency
+        return (1.0 - self.error_rate) ** 2 / max(latency, 1e-3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'latency': self.latency,
+            'error_rate': self.error_rate,
+            'consecutive_failures': self.consecutive_failures
+        }
+
+
+class RouterService(AIServiceInterface):
+    """
+    Pseudo-proveedor que reparte las llamadas entre los proveedores reales.
+
+    Elige al azar ponderando por latencia y tasa de error recientes, mantiene
+    cada sesión en el mismo backend mientras siga sano (ver session()) y, si
+    una llamada falla o el circuito del backend está abierto, pasa al
+    siguiente. Los backends ya aplican sus propios reintentos y plazos.
+
+    Config (sección router): backends, ewma_alpha, failure_threshold,
+    open_seconds y sticky_ttl.
+    """
+
+    # Los reintentos y plazos los aplica cada backend
+    resilient = False
+    metered = False
+    # Sus llamadas ya se cuentan en cada backend
+    meta_provider = True
+
+    def __init__(self):
+        settings = Configuration().get_setting('router') or {}
+        self.backends: List[str] = list(settings.get('backends', DEFAULT_BACKENDS))
+        alpha = float(settings.get('ewma_alpha', DEFAULT_EWMA_ALPHA))
+        threshold = int(settings.get('failure_threshold', DEFAULT_FAILURE_THRESHOLD))
+        open_seconds = float(settings.get('open_seconds', DEFAULT_OPEN_SECONDS))
+        self.sticky_ttl = float(settings.get('sticky_ttl', DEFAULT_STICKY_TTL))
+        self.health: Dict[str, BackendHealth] = {
+            name: BackendHealth(name, alpha, threshold, open_seconds) for name in self.backends
+        }
+        # sesión -> (backend, último uso); OrderedDict para descartar las más viejas
+        self._sticky: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def session(key: Optional[str]) -> Iterator[None]:
+        """
+        Asocia las llamadas del bloque a una sesión para que usen siempre el
+        mismo backend (continuidad de la conversación).
+        """
+        token = _session_key.set(key)
+        try:
+            yield
+        finally:
+            _session_key.reset(token)
+
+    def backend_for(self, key: Optional[str]) -> Optional[str]:
+        """Backend asignado a la sesión, si tiene uno"""
+        entry = self._sticky.get(key) if key else None
+        return entry[0] if entry else None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de salud de cada backend"""
+        return {name: health.snapshot() for name, health in self.health.items()}
+
+    # --- Selección ----------------------------------------------------------
+
+    def _candidates(self) -> List[str]:
+        """Backends disponibles, en orden de preferencia para esta llamada"""
+        available = [n for n in self.backends if self.health[n].available()]
+        if not available:
+            return []
+
+        key = _session_key.get()
+        sticky = self.backend_for(key)
+        if sticky in available:
+            available.remove(sticky)
+            return [sticky] + self._weighted_order(available)
+        return self._weighted_order(available)
+
+    def _weighted_order(self, names: List[str]) -> List[str]:
+        """Ordena por muestreo ponderado sin reemplazo"""
+        known = [self.health[n].latency for n in names if self.health[n].latency is not None]
+        # Sin muestras se asume la mejor latencia conocida, para explorarlo
+        default_latency = min(known) if known else 1.0
+        remaining = list(names)
+        order: List[str] = []
+        while remaining:
+            weights = [self.health[n].weight(default_latency) for n in remaining]
+            if sum(weights) <= 0:
+                order.extend(remaining)
+                break
+            choice = random.choices(remaining, weights=weights)[0]
+            order.append(choice)
+            remaining.remove(choice)
+        return order
+
+    def _stick(self, backend: str) -> None:
+        key = _session_key.get()
+        if not key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sticky[key] = (backend, now)
+            self._sticky.move_to_end(key)
+            while self._sticky and (
+                len(self._sticky) > MAX_STICKY_SESSIONS
+                or now - next(iter(self._sticky.values()))[1] > self.sticky_ttl
+            ):
+                self._sticky.popitem(last=False)
+
+    def _no_backend_error(self, error: Optional[BaseException]) -> BaseException:
+        return error or RuntimeError("No hay proveedores de IA disponibles")
+
+    # --- Llamadas -----------------------------------------------------------
+
+    def _route(self, operation: str, call: Callable[[AIServiceInterface], Any]) -> Any:
+        error: Optional[BaseException] = None
+        for name in self._candidates():
+            health = self.health[name]
+            if not health.acquire():
+                continue
+            start = time.perf_counter()
+            try:
+                result = call(ServiceFactory.get_service(name))
+            except Exception as e:
+                health.record(time.perf_counter() - start, False)
+                AI_ROUTER_DECISIONS.labels(name, 'failover').inc()
+                Logger.warning(f"Router: {operation} falló en {name}: {str(e)}")
+                error = e
+                continue
+            except BaseException:
+                # Cancelada o interrumpida: no cuenta como fallo, pero libera la prueba
+                health.release()
+                raise
+            health.record(time.perf_counter() - start, True)
+            AI_ROUTER_DECISIONS.labels(name, 'selected').inc()
+            self._stick(name)
+            return result
+        raise self._no_backend_error(error)
+
+    async def _aroute(self, operation: str, call: Callable[[AIServiceInterface], Any]) -> Any:
+        error: Optional[BaseException] = None
+        for name in self._candidates():
+            health = self.health[name]
+            if not health.acquire():
+                continue
+            start = time.perf_counter()
+            try:
+                result = await call(ServiceFactory.get_service(name))
+            except Exception as e:
+                health.record(time.perf_counter() - start, False)
+                AI_ROUTER_DECISIONS.labels(name, 'failover').inc()
+                Logger.warning(f"Router: {operation} falló en {name}: {str(e)}")
+                error = e
+                continue
+            except BaseException:
+                # Cancelada o interrumpida: no cuenta como fallo, pero libera la prueba
+                health.release()
+                raise
+            health.record(time.perf_counter() - start, True)
+            AI_ROUTER_DECISIONS.labels(name, 'selected').inc()
+            self._stick(name)
+            return result
+        raise self._no_backend_error(error)
+
+    def get_completion(self, prompt: str) -> str:
+        return self._route('get_completion', lambda s: s.get_completion(prompt))
+
+    def process_request(self, request_data: dict) -> dict:
+        return self._route('process_request', lambda s: s.process_request(request_data))
+
+    async def aget_completion(self, prompt: str) -> str:
+        return await self._aroute('aget_completion', lambda s: s.aget_completion(prompt))
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        return await self._aroute('aprocess_request', lambda s: s.aprocess_request(request_data))
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """Pasa a otro backend solo si el actual falla antes del primer fragmento"""
+        error: Optional[BaseException] = None
+        for name in self._candidates():
+            health = self.health[name]
+            if not health.acquire():
+                continue
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in ServiceFactory.get_service(name).stream_completion(prompt):
+                    if not started:
+                        # Para streams se mide el tiempo hasta el primer fragmento
+                        health.record(time.perf_counter() - start, True)
+                        AI_ROUTER_DECISIONS.labels(name, 'selected').inc()
+                        self._stick(name)
+                        started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                health.record(time.perf_counter() - start, False)
+                AI_ROUTER_DECISIONS.labels(name, 'failover').inc()
+                Logger.warning(f"Router: stream_completion falló en {name}: {str(e)}")
+                error = e
+                continue
+            except BaseException:
+                # Abandonado antes del primer fragmento (GeneratorExit, rerun o
+                # stop de Streamlit): se libera la prueba para no bloquear el backend
+                if not started:
+                    health.release()
+                raise
+            if not started:
+                health.record(time.perf_counter() - start, True)
+                self._stick(name)
+            return
+        raise self._no_backend_error(error)
+
+
+ServiceFactory.register_service("router", RouterService)
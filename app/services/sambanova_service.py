@@ -1,7 +1,8 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 from app.config.secrets_manager import SecretsManager
 from app.services.ai_service_interface import AIServiceInterface
+from app.services.http_transport import HttpTransport
 from app.utils.logger import Logger
 
 
@@ -9,6 +10,11 @@ class SambaNovaService(AIServiceInterface):
     def __init__(self):
         self.api_key = SecretsManager.get_secret("SAMBANOVA_API_KEY")
         self.endpoint = SecretsManager.get_secret("SAMBANOVA_ENDPOINT")
+        self.http = HttpTransport.client("sambanova")
+
+    def close(self) -> None:
+        """Cierra el pool de conexiones compartido del proveedor"""
+        HttpTransport.close("sambanova")
 
     def get_completion(self, prompt: str) -> str:
         """
@@ -21,7 +27,7 @@ def get_completion(self, prompt: str) -> str:
             La respuesta generada por el modelo
         """
         try:
-            # Aquí iría la llamada real a SambaNova
+            # Aquí iría la llamada real a SambaNova vía self.http.post_json(...)
             return f"SambaNova respuesta simulada para: {prompt}"
         except Exception as e:
             Logger.error(f"Error en SambaNova completion: {str(e)}")
@@ -45,3 +51,57 @@ def process_request(self, request_data: Dict) -> Dict:
         except Exception as e:
             Logger.error(f"Error procesando solicitud SambaNova: {str(e)}")
             raise
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """
+        Obtiene la respuesta del modelo SambaNova en fragmentos.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Yields:
+            Fragmentos consecutivos de la respuesta
+        """
+        try:
+            # Aquí iría la llamada real con streaming a SambaNova
+            for word in f"SambaNova respuesta simulada para: {prompt}".split(" "):
+                yield word + " "
+        except Exception as e:
+            Logger.error(f"Error en SambaNova streaming: {str(e)}")
+            raise
+
+    async def aget_completion(self, prompt: str) -> str:
+        """
+        Obtiene una respuesta del modelo SambaNova sin bloquear el loop.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Returns:
+            La respuesta generada por el modelo
+        """
+        try:
+            # Aquí iría la llamada asíncrona real a SambaNova
+            return f"SambaNova respuesta simulada para: {prompt}"
+        except Exception as e:
+            Logger.error(f"Error en SambaNova completion asíncrona: {str(e)}")
+            raise
+
+    async def aprocess_request(self, request_data: Dict) -> Dict:
+        """
+        Procesa una solicitud usando SambaNova sin bloquear el loop.
+
+        Args:
+            request_data: Datos de la solicitud
+
+        Returns:
+            Respuesta procesada
+        """
+        try:
+            return {
+                "response": f"SambaNova procesó: {request_data}",
+                "provider": "sambanova"
+            }
+        except Exception as e:
+            Logger.error(f"Error procesando solicitud SambaNova asíncrona: {str(e)}")
+            raise
@@ -0,0 +1,212 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.async_runtime import AsyncRuntime
+from app.utils.metrics import (AI_CALL_ERRORS, AI_CALL_SECONDS,
+                               AI_TIME_TO_FIRST_TOKEN_SECONDS)
+from app.utils.tracing import Tracer
+
+# Límites superiores (segundos) de los intervalos del histograma de latencia
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Cantidad de llamadas recientes conservadas por proveedor
+SERIES_CAPACITY = 1024
+
+
+class ProviderTelemetry:
+    """Contadores y serie temporal acotada de las llamadas a un proveedor"""
+
+    def __init__(self, provider: str, capacity: int = SERIES_CAPACITY):
+        self.provider = provider
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.prompt_chars = 0
+        self.response_chars = 0
+        # (timestamp, latencia, éxito); deque con maxlen descarta lo más antiguo
+        self.series: Deque[Tuple[float, float, bool]] = deque(maxlen=capacity)
+
+    def record(self, latency: float, ok: bool, prompt_size: int, response_size: int) -> None:
+        """
+        Registra una llamada.
+
+        Args:
+            latency: Duración de la llamada en segundos
+            ok: False si la llamada lanzó una excepción
+            prompt_size: Tamaño de la entrada en caracteres
+            response_size: Tamaño de la respuesta en caracteres
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self.latency_sum += latency
+            self.latency_buckets[bucket] += 1
+            self.prompt_chars += prompt_size
+            self.response_chars += response_size
+        self.series.append((time.time(), latency, ok))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna una copia consistente de los contadores"""
+        with self._lock:
+            calls = self.calls
+            return {
+                'calls': calls,
+                'errors': self.errors,
+                'success': calls - self.errors,
+                'error_rate': self.errors / calls if calls else 0.0,
+                'avg_latency': self.latency_sum / calls if calls else 0.0,
+                'latency_buckets': dict(zip(
+                    [*map(str, LATENCY_BUCKETS), '+Inf'], self.latency_buckets
+                )),
+                'prompt_chars': self.prompt_chars,
+                'response_chars': self.response_chars
+            }
+
+    def recent(self, since: Optional[float] = None) -> List[Tuple[float, float, bool]]:
+        """Retorna las llamadas recientes, opcionalmente desde un timestamp"""
+        series = list(self.series)
+        if since is None:
+            return series
+        return [point for point in series if point[0] >= since]
+
+
+class TelemetryRegistry:
+    _providers: Dict[str, ProviderTelemetry] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, provider: str) -> ProviderTelemetry:
+        """Obtiene (o crea) la telemetría de un proveedor"""
+        telemetry = cls._providers.get(provider)
+        if telemetry is None:
+            with cls._lock:
+                telemetry = cls._providers.setdefault(provider, ProviderTelemetry(provider))
+        return telemetry
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, Any]]:
+        """Retorna los contadores de todos los proveedores"""
+        return {name: t.snapshot() for name, t in list(cls._providers.items())}
+
+    @classmethod
+    def reset(cls) -> None:
+        """Descarta toda la telemetría acumulada"""
+        with cls._lock:
+            cls._providers.clear()
+
+
+class InstrumentedService(AIServiceInterface):
+    """Envoltorio que mide cada llamada al servicio subyacente"""
+
+    def __init__(self, provider: str, service: AIServiceInterface):
+        self.provider = provider
+        self.service = service
+        self.telemetry = TelemetryRegistry.get(provider)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def close(self) -> None:
+        self.service.close()
+
+    @property
+    def supports_native_batch(self) -> bool:
+        return self.service.supports_native_batch
+
+    @property
+    def batch_chunk_size(self) -> int:
+        return self.service.batch_chunk_size
+
+    def get_completion(self, prompt: str) -> str:
+        start = time.perf_counter()
+        ok, response = False, ''
+        try:
+            with Tracer.start_span("ai.get_completion", provider=self.provider,
+                                   prompt_chars=len(prompt)):
+                response = self.service.get_completion(prompt)
+            ok = True
+            return response
+        finally:
+            self._observe('get_completion', time.perf_counter() - start, ok,
+                          len(prompt), len(response or ''))
+
+    def process_request(self, request_data: dict) -> dict:
+        start = time.perf_counter()
+        ok, response = False, None
+        try:
+            with Tracer.start_span("ai.process_request", provider=self.provider):
+                response = self.service.process_request(request_data)
+            ok = True
+            return response
+        finally:
+            self._observe('process_request', time.perf_counter() - start, ok,
+                          len(str(request_data)), len(str(response)) if ok else 0)
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        start = time.perf_counter()
+        ok, size, first = False, 0, True
+        try:
+            for chunk in self.service.stream_completion(prompt):
+                if first:
+                    AI_TIME_TO_FIRST_TOKEN_SECONDS.labels(self.provider).observe(
+                        time.perf_counter() - start
+                    )
+                    first = False
+                size += len(chunk)
+                yield chunk
+            ok = True
+        finally:
+            self._observe('stream_completion', time.perf_counter() - start, ok,
+                          len(prompt), size)
+
+    async def aget_completion(self, prompt: str) -> str:
+        async with AsyncRuntime.semaphore(self.provider):
+            start = time.perf_counter()
+            ok, response = False, ''
+            try:
+                response = await self.service.aget_completion(prompt)
+                ok = True
+                return response
+            finally:
+                self._observe('aget_completion', time.perf_counter() - start, ok,
+                              len(prompt), len(response or ''))
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        async with AsyncRuntime.semaphore(self.provider):
+            start = time.perf_counter()
+            ok, response = False, None
+            try:
+                response = await self.service.aprocess_request(request_data)
+                ok = True
+                return response
+            finally:
+                self._observe('aprocess_request', time.perf_counter() - start, ok,
+                              len(str(request_data)), len(str(response)) if ok else 0)
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        async with AsyncRuntime.semaphore(self.provider):
+            start = time.perf_counter()
+            ok, outcomes = False, []
+            try:
+                outcomes = await self.service._acall_native_batch(chunk)
+                ok = True
+                return outcomes
+            finally:
+                self._observe('process_batch', time.perf_counter() - start, ok,
+                              len(str(chunk)), len(str(outcomes)) if ok else 0)
+
+    def _observe(self, operation: str, latency: float, ok: bool,
+                 prompt_size: int, response_size: int) -> None:
+        """Registra la llamada en la telemetría y en el registro de métricas"""
+        self.telemetry.record(latency, ok, prompt_size, response_size)
+        AI_CALL_SECONDS.labels(self.provider, operation).observe(latency)
+        if not ok:
+            AI_CALL_ERRORS.labels(self.provider, operation).inc()
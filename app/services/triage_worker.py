@@ -0,0 +1,274 @@
+import contextvars
+import json
+import queue
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.config.configuration import Configuration
+from app.services.factory import ServiceFactory
+from app.utils.logger import Logger
+from app.utils.metrics import TRIAGE_JOBS, TRIAGE_QUEUE_DEPTH
+from app.utils.tracing import Tracer
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 100
+
+SERVICE_TYPES = [
+    "Calibración de Balanzas",
+    "Calibración de Termómetros",
+    "Calibración de Material Volumétrico",
+    "Calibración de Higrómetros",
+    "Verificación de Balanzas",
+    "Mantenimiento Preventivo"
+]
+URGENCIES = ["Normal", "Urgente", "Muy Urgente"]
+
+# Palabras clave de las observaciones que orientan la clasificación
+SERVICE_KEYWORDS = [
+    ("Mantenimiento Preventivo", ('mantenimiento', 'limpieza', 'reparacion', 'reparación')),
+    ("Verificación de Balanzas", ('verificacion', 'verificación')),
+    ("Calibración de Termómetros", ('termometro', 'termómetro', 'temperatura', 'termocupla')),
+    ("Calibración de Higrómetros", ('higrometro', 'higrómetro', 'humedad')),
+    ("Calibración de Material Volumétrico", ('pipeta', 'bureta', 'matraz', 'probeta',
+                                             'volumetrico', 'volumétrico')),
+    ("Calibración de Balanzas", ('balanza', 'bascula', 'báscula', 'pesa', 'masa'))
+]
+URGENCY_KEYWORDS = [
+    ("Muy Urgente", ('inmediato', 'inmediata', 'detenida', 'parada', 'auditoria', 'auditoría',
+                     'hoy', 'muy urgente')),
+    ("Urgente", ('urgente', 'pronto', 'vencida', 'vencido', 'falla', 'prioridad'))
+]
+MODEL_PATTERN = re.compile(r'\bmodelo\s*[:#]?\s*([A-Za-z0-9][\w\-./]*)', re.IGNORECASE)
+SERIAL_PATTERN = re.compile(
+    r'\b(?:n(?:[uú]mero)?\.?\s*(?:de\s+)?serie|serie|serial|s/?n)\s*[:#]?\s*([A-Za-z0-9][\w\-/]*)',
+    re.IGNORECASE
+)
+JSON_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+TRIAGE_INSTRUCTIONS = (
+    "Clasifica la solicitud de calibración. Responde solo con JSON con las claves "
+    "service_type (una de: " + ", ".join(SERVICE_TYPES) + "), equipment_model, "
+    "equipment_serial y urgency (una de: " + ", ".join(URGENCIES) + ")."
+)
+
+
+def heuristic_triage(request: Dict) -> Dict[str, Any]:
+    """
+    Pre-análisis local a partir de las observaciones y los datos del formulario.
+
+    Se usa como base del resultado: lo que el proveedor de IA no responda o
+    responda fuera de los valores válidos se completa con esto.
+    """
+    observations = request.get('observations') or ''
+    text = observations.lower()
+    equipment = request.get('equipment') or {}
+
+    service_type = request.get('service_type')
+    for candidate, keywords in SERVICE_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            service_type = candidate
+            break
+
+    urgency = 'Normal'
+    for candidate, keywords in URGENCY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            urgency = candidate
+            break
+    if (request.get('requirements') or {}).get('express_service') and urgency == 'Normal':
+        urgency = 'Urgente'
+
+    model = MODEL_PATTERN.search(observations)
+    serial = SERIAL_PATTERN.search(observations)
+    return {
+        'service_type': service_type,
+        'equipment_model': model.group(1) if model else (equipment.get('model') or None),
+        'equipment_serial': serial.group(1) if serial else (equipment.get('serial') or None),
+        'urgency': urgency
+    }
+
+
+def _parse_response(response: Dict) -> Dict[str, Any]:
+    """Extrae los campos del pre-análisis de la respuesta del proveedor"""
+    content = response.get('response') if isinstance(response, dict) else response
+    if isinstance(content, dict):
+        data = content
+    else:
+        match = JSON_PATTERN.search(str(content or ''))
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+    result: Dict[str, Any] = {}
+    if data.get('service_type') in SERVICE_TYPES:
+        result['service_type'] = data['service_type']
+    if data.get('urgency') in URGENCIES:
+        result['urgency'] = data['urgency']
+    for key in ('equipment_model', 'equipment_serial'):
+        if isinstance(data.get(key), str) and data[key].strip():
+            result[key] = data[key].strip()
+    return result
+
+
+class _Job:
+    __slots__ = ('store', 'request_id', 'payload', 'context')
+
+    def __init__(self, store: Any, request_id: str, payload: Dict):
+        self.store = store
+        self.request_id = request_id
+        self.payload = payload
+        # Contexto de quien encoló (p. ej. atribución de consumo)
+        self.context = contextvars.copy_context()
+
+
+class TriageQueue:
+    """
+    Cola de pre-análisis de solicitudes nuevas con un pool de hilos.
+
+    El formulario solo encola el trabajo; los hilos llaman a
+    process_request del proveedor, combinan la respuesta con un análisis
+    local de las observaciones y escriben el resultado en la solicitud
+    (campo ai_triage). La cola es acotada: si está llena, la solicitud se
+    marca como omitida en lugar de bloquear el envío. Cada trabajo hace una
+    sola llamada: los reintentos de errores transitorios ya los hace el
+    servicio (ResilientService); si igual falla, queda el análisis local.
+
+    El almacén debe sobrevivir a los reruns de Streamlit (RequestsPage lo
+    guarda en st.session_state); si no, el resultado se escribe en una
+    instancia que ya nadie lee.
+
+    Config: performance.max_threads (hilos) y sección triage con enabled,
+    provider y queue_size.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Se publica recién inicializada: otro hilo no debe verla a medias
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self) -> None:
+        config = Configuration()
+        settings = config.get_setting('triage') or {}
+        performance = config.get_setting('performance') or {}
+        self.enabled = bool(settings.get('enabled', True))
+        self.provider = settings.get('provider') or config.get_setting('default_provider')
+        self.num_workers = max(1, int(performance.get('max_threads', DEFAULT_WORKERS)))
+        self._queue: 'queue.Queue[_Job]' = queue.Queue(
+            maxsize=int(settings.get('queue_size', DEFAULT_QUEUE_SIZE))
+        )
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._run, name=f"triage-worker-{i}",
+                                          daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, store: Any, request: Dict) -> bool:
+        """
+        Encola el pre-análisis de una solicitud sin esperar el resultado.
+
+        Args:
+            store: Almacén compartido de la solicitud (Solicitudes), donde se escribe el resultado
+            request: Solicitud recién creada
+
+        Returns:
+            True si quedó encolada, False si está deshabilitado o la cola está llena
+        """
+        if not self.enabled:
+            return False
+        request_id = request['id']
+        payload = {
+            'task': 'triage',
+            'instructions': TRIAGE_INSTRUCTIONS,
+            'request_id': request_id,
+            'service_type': request.get('service_type'),
+            'urgency': request.get('urgency'),
+            'equipment': {k: v for k, v in (request.get('equipment') or {}).items()
+                          if k != 'last_calibration'},
+            'observations': request.get('observations') or ''
+        }
+        self._ensure_workers()
+        # Se marca antes de encolar para no pisar un resultado ya escrito
+        self._write(store, request_id, {'status': 'queued'})
+        try:
+            self._queue.put_nowait(_Job(store, request_id, payload))
+        except queue.Full:
+            TRIAGE_JOBS.labels('rejected').inc()
+            Logger.warning(f"Cola de pre-análisis llena; se omite {request_id}")
+            self._write(store, request_id, {'status': 'skipped'})
+            return False
+        TRIAGE_JOBS.labels('queued').inc()
+        TRIAGE_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def pending(self) -> int:
+        """Trabajos en espera"""
+        return self._queue.qsize()
+
+    def join(self) -> None:
+        """Espera a que se procesen todos los trabajos encolados"""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                TRIAGE_QUEUE_DEPTH.set(self._queue.qsize())
+                job.context.run(self._process, job)
+            except Exception as e:
+                Logger.error(f"Error en pre-análisis de {job.request_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job: _Job) -> None:
+        with Tracer.start_span("triage.process", request_id=job.request_id) as span:
+            result = heuristic_triage(job.payload)
+            source = 'heuristic'
+            try:
+                service = ServiceFactory.get_service(self.provider)
+                ai_result = _parse_response(service.process_request(job.payload))
+                if ai_result:
+                    result.update(ai_result)
+                    source = 'ai'
+            except Exception as e:
+                TRIAGE_JOBS.labels('failed').inc()
+                Logger.warning(f"Pre-análisis IA de {job.request_id} falló; "
+                               f"se usa el análisis local: {str(e)}")
+
+            span.set_attribute("source", source)
+            TRIAGE_JOBS.labels('done').inc()
+            self._write(job.store, job.request_id, {
+                'status': 'done',
+                'source': source,
+                'completed_at': datetime.now(),
+                **result
+            })
+
+    @staticmethod
+    def _write(store: Any, request_id: str, triage: Dict) -> None:
+        try:
+            store.update_request(request_id, {'ai_triage': triage})
+        except Exception as e:
+            Logger.error(f"Error guardando pre-análisis de {request_id}: {str(e)}")
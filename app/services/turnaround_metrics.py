@@ -0,0 +1,283 @@
+import atexit
+import json
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config.configuration import Configuration
+from app.utils.logger import Logger
+from app.utils.sketches import DDSketch
+
+# Intervalos medidos sobre el ciclo de vida de una solicitud
+WAIT = 'espera'          # created_at -> started_at
+SERVICE = 'servicio'     # started_at -> completed_at
+TURNAROUND = 'total'     # created_at -> completed_at
+
+DIMENSIONS = ('service_type', 'urgency')
+QUANTILES = (0.5, 0.9, 0.99)
+
+SketchKey = Tuple[str, str, str]  # (intervalo, dimensión, valor)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_RETENTION_DAYS = 30
+COMPACT_LOCK_TIMEOUT = 600  # segundos tras los que un bloqueo de compactación se da por abandonado
+ARCHIVE_NAME = "turnaround.archive.json"
+
+
+def _instance_id(configured: Optional[str] = None) -> str:
+    """
+    Identificador de la instancia, apto para nombre de archivo. Por defecto
+    host y pid: cada proceso reescribe su archivo completo, así que dos
+    procesos con el mismo identificador se pisarían los datos.
+    """
+    value = (configured or os.getenv('ACMA_INSTANCE_ID')
+             or f"{socket.gethostname() or 'local'}-{os.getpid()}")
+    return re.sub(r'[^A-Za-z0-9_-]', '-', value)
+
+
+class TurnaroundMetrics:
+    """
+    Cuantiles de tiempos de atención de solicitudes.
+
+    Cada instancia de la aplicación mantiene sus propios sketches y los
+    persiste en `data/sketches/turnaround_<instancia>.json`; al consultar se
+    combinan los archivos de todas las instancias, sin coordinación entre
+    ellas. El identificador de instancia es por defecto host y pid, distinto
+    en cada proceso; los archivos de procesos anteriores se siguen sumando
+    hasta pasar al histórico. Un instance_id o ACMA_INSTANCE_ID fijo permite
+    retomar el propio archivo tras un reinicio, pero debe ser único por
+    proceso.
+
+    Las escrituras se hacen desde un hilo en segundo plano cada
+    flush_interval segundos, no en el hilo del script. Los archivos de
+    instancias sin actividad durante retention_days se combinan en
+    turnaround.archive.json y se eliminan.
+
+    Config: sección turnaround con instance_id, flush_interval y retention_days.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Se publica recién inicializada: otro hilo no debe verla a medias
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self) -> None:
+        """Inicializa los sketches de la instancia, retomando los persistidos"""
+        settings = Configuration().get_setting('turnaround') or {}
+        self.flush_interval = float(settings.get('flush_interval', DEFAULT_FLUSH_INTERVAL))
+        self.retention_days = float(settings.get('retention_days', DEFAULT_RETENTION_DAYS))
+        self.directory = Path("data") / "sketches"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.instance_id = _instance_id(settings.get('instance_id'))
+        self.path = self.directory / f"turnaround_{self.instance_id}.json"
+        self.archive_path = self.directory / ARCHIVE_NAME
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._sketches: Dict[SketchKey, DDSketch] = {}
+        self._pending: Dict[SketchKey, DDSketch] = {}
+        self._persisted = False
+        if self.path.exists():
+            try:
+                self._sketches = self._read(self.path)
+                self._persisted = True
+            except Exception as e:
+                Logger.warning(f"Sketch ilegible {self.path.name}: {str(e)}")
+        self._compact()
+        atexit.register(self.flush)
+
+    def record_started(self, request: Dict) -> None:
+        """Registra el tiempo de espera de una solicitud que se inicia"""
+        self._record(request, WAIT, request.get('created_at'), request.get('started_at'))
+
+    def record_completed(self, request: Dict) -> None:
+        """Registra los tiempos de servicio y total de una solicitud completada"""
+        completed_at = request.get('completed_at')
+        self._record(request, SERVICE, request.get('started_at'), completed_at)
+        self._record(request, TURNAROUND, request.get('created_at'), completed_at)
+
+    def _record(self, request: Dict, interval: str,
+                start: Optional[datetime], end: Optional[datetime]) -> None:
+        if start is None or end is None:
+            return
+        try:
+            seconds = max((end - start).total_seconds(), 0.0)
+            keys = [(interval, 'all', '*')] + [
+                (interval, dimension, str(request.get(dimension, 'N/A')))
+                for dimension in DIMENSIONS
+            ]
+            with self._lock:
+                for key in keys:
+                    if key not in self._pending:
+                        self._pending[key] = DDSketch()
+                    self._pending[key].add(seconds)
+            self._ensure_writer()
+        except Exception as e:
+            Logger.error(f"Error registrando tiempos de solicitud: {str(e)}")
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="turnaround-writer",
+                                                daemon=True)
+                self._writer.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Combina los valores pendientes y escribe el archivo de la instancia"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                if self._persisted and not self.path.exists():
+                    # Otra instancia lo pasó al histórico: lo escrito ya está allí
+                    self._sketches = {}
+                self._merge_into(self._sketches, pending)
+                data = self._serialize(self._sketches)
+            try:
+                self._write(self.path, data)
+                self._persisted = True
+            except Exception as e:
+                # Los valores ya están en self._sketches; se escriben en el próximo ciclo
+                Logger.error(f"Error guardando tiempos de solicitud: {str(e)}")
+
+    @staticmethod
+    def _serialize(sketches: Dict[SketchKey, DDSketch]) -> str:
+        return json.dumps([
+            {'key': list(key), 'sketch': sketch.to_dict()}
+            for key, sketch in sketches.items()
+        ])
+
+    @staticmethod
+    def _write(path: Path, data: str) -> None:
+        """Escribe el archivo de forma atómica"""
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read(path: Path) -> Dict[SketchKey, DDSketch]:
+        sketches: Dict[SketchKey, DDSketch] = {}
+        for entry in json.loads(path.read_text()):
+            TurnaroundMetrics._merge_into(
+                sketches, {tuple(entry['key']): DDSketch.from_dict(entry['sketch'])}
+            )
+        return sketches
+
+    @staticmethod
+    def _merge_into(target: Dict[SketchKey, DDSketch],
+                    sketches: Dict[SketchKey, DDSketch]) -> None:
+        for key, sketch in sketches.items():
+            if key in target:
+                target[key].merge(sketch)
+            else:
+                target[key] = sketch
+
+    def _compact(self) -> None:
+        """Pasa al histórico los archivos de instancias inactivas y los elimina"""
+        cutoff = time.time() - self.retention_days * 86400
+        stale = []
+        for path in self.directory.glob("turnaround_*.json"):
+            try:
+                if path != self.path and path.stat().st_mtime < cutoff:
+                    stale.append(path)
+            except OSError:
+                continue
+        if not stale:
+            return
+
+        lock_path = self.directory / "turnaround.compact.lock"
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Otro proceso está compactando; si el bloqueo quedó abandonado se libera
+            try:
+                if lock_path.stat().st_mtime < time.time() - COMPACT_LOCK_TIMEOUT:
+                    lock_path.unlink()
+            except OSError:
+                pass
+            return
+        except OSError as e:
+            Logger.warning(f"No se pudo compactar sketches: {str(e)}")
+            return
+
+        try:
+            archive = self._read(self.archive_path) if self.archive_path.exists() else {}
+            compacted = []
+            for path in stale:
+                try:
+                    self._merge_into(archive, self._read(path))
+                    compacted.append(path)
+                except Exception as e:
+                    Logger.warning(f"Sketch ilegible {path.name}: {str(e)}")
+            if compacted:
+                self._write(self.archive_path, self._serialize(archive))
+                for path in compacted:
+                    path.unlink(missing_ok=True)
+                Logger.info(f"{len(compacted)} archivos de tiempos pasados al histórico")
+        except Exception as e:
+            Logger.warning(f"No se pudo compactar sketches: {str(e)}")
+        finally:
+            os.close(fd)
+            lock_path.unlink(missing_ok=True)
+
+    def get_merged(self) -> Dict[SketchKey, DDSketch]:
+        """Combina los sketches de todas las instancias y el histórico"""
+        merged: Dict[SketchKey, DDSketch] = {}
+        # Los de esta instancia se toman de memoria: el archivo puede estar atrasado
+        with self._lock:
+            for sketches in (self._sketches, self._pending):
+                self._merge_into(merged, {
+                    key: DDSketch.from_dict(sketch.to_dict()) for key, sketch in sketches.items()
+                })
+        paths = [path for path in self.directory.glob("turnaround_*.json") if path != self.path]
+        if self.archive_path.exists():
+            paths.append(self.archive_path)
+        for path in paths:
+            try:
+                self._merge_into(merged, self._read(path))
+            except Exception as e:
+                Logger.warning(f"Sketch ilegible {path.name}: {str(e)}")
+        return merged
+
+    def get_summary(self) -> List[Dict]:
+        """
+        Obtiene p50/p90/p99 en horas por intervalo y dimensión.
+
+        Returns:
+            Lista de filas listas para mostrar en una tabla
+        """
+        rows = []
+        for (interval, dimension, value), sketch in sorted(self.get_merged().items()):
+            row = {
+                'intervalo': interval,
+                'dimensión': dimension,
+                'valor': value,
+                'n': sketch.count
+            }
+            for q in QUANTILES:
+                row[f"p{int(q * 100)} (h)"] = round(sketch.quantile(q) / 3600, 2)
+            rows.append(row)
+        return rows
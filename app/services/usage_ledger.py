@@ -0,0 +1,421 @@
+import atexit
+import contextvars
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from app.config.configuration import Configuration
+from app.models.rollups import upsert_add
+from app.models.usage import AIUsageDailyRollup, AIUsageEntry
+from app.services.ai_service_interface import AIServiceInterface, call_model
+from app.utils.db import DatabaseManager
+from app.utils.logger import Logger
+from app.utils.metrics import AI_MODEL_DOWNGRADES, AI_TOKENS
+from app.utils.tokens import estimate_tokens, tokens_for_chars
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_DOWNGRADE_RATIO = 0.8
+
+# Página y usuario que originan las llamadas del contexto actual
+_attribution: contextvars.ContextVar[Tuple[Optional[str], Optional[str]]] = \
+    contextvars.ContextVar('ai_usage_attribution', default=(None, None))
+
+RollupKey = Tuple[str, str, str]  # (día, proveedor, modelo)
+
+
+@contextmanager
+def usage_context(page: Optional[str] = None, user: Optional[str] = None) -> Iterator[None]:
+    """
+    Atribuye a `page` y `user` las llamadas a IA hechas dentro del bloque.
+
+    Se propaga a los hilos y tareas que copian el contexto (reintentos,
+    streaming, cola de pre-análisis).
+    """
+    token = _attribution.set((page, user))
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+class UsageLedger:
+    """
+    Libro de consumo de tokens y costo de las llamadas a proveedores de IA.
+
+    Cada llamada agrega una fila de solo inserción (ai_usage_ledger) con
+    proveedor, modelo, operación, página, usuario, tokens estimados y costo.
+    Las filas se acumulan en memoria y se escriben por lotes desde un hilo
+    en segundo plano; en la misma transacción se suman al rollup diario por
+    proveedor y modelo, de modo que los totales se leen sin recorrer el libro.
+    El gasto del día por proveedor se mantiene también en memoria para el
+    control de presupuesto.
+
+    Config: sección usage con flush_interval, batch_size, prices (USD por
+    1000 tokens de entrada y de salida, por modelo) y downgrade_ratio;
+    daily_budget (USD, 0 = sin límite) en ai_providers.<proveedor>.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Se publica recién inicializada: otro hilo no debe verla a medias
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self) -> None:
+        settings = Configuration().get_setting('usage') or {}
+        self.flush_interval = float(settings.get('flush_interval', DEFAULT_FLUSH_INTERVAL))
+        self.batch_size = int(settings.get('batch_size', DEFAULT_BATCH_SIZE))
+        self.prices: Dict[str, List[float]] = settings.get('prices') or {}
+        self.db_manager = DatabaseManager()
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._day = datetime.now().strftime('%Y-%m-%d')
+        self._spent_today = self._load_spent(self._day)
+        atexit.register(self.flush)
+
+    def _load_spent(self, day: str) -> Dict[str, float]:
+        """Gasto ya registrado del día, para no reiniciar el presupuesto al reiniciar"""
+        try:
+            with self.db_manager.get_db() as db:
+                rows = db.query(AIUsageDailyRollup.provider, func.sum(AIUsageDailyRollup.cost)) \
+                    .filter(AIUsageDailyRollup.day == day) \
+                    .group_by(AIUsageDailyRollup.provider).all()
+                return {provider: cost or 0.0 for provider, cost in rows}
+        except Exception as e:
+            Logger.error(f"Error leyendo consumo del día: {str(e)}")
+            return {}
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Costo estimado en USD; 0 si el modelo no tiene precio configurado"""
+        prompt_price, completion_price = (self.prices.get(model) or [0.0, 0.0])[:2]
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+    def record(self, provider: str, model: str, operation: str,
+               prompt_tokens: int, completion_tokens: int, ok: bool = True) -> None:
+        """
+        Registra una llamada. No escribe en la base de datos: la fila queda
+        pendiente hasta el próximo lote.
+        """
+        page, user = _attribution.get()
+        now = datetime.now()
+        day = now.strftime('%Y-%m-%d')
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        entry = {
+            'created_at': now,
+            'provider': provider,
+            'model': model,
+            'operation': operation,
+            'page': page,
+            'user': user,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cost': cost,
+            'ok': ok
+        }
+        with self._lock:
+            if day != self._day:
+                self._day = day
+                self._spent_today = {}
+            self._spent_today[provider] = self._spent_today.get(provider, 0.0) + cost
+            self._pending.append(entry)
+            pending = len(self._pending)
+
+        AI_TOKENS.labels(provider, model, 'prompt').inc(prompt_tokens)
+        AI_TOKENS.labels(provider, model, 'completion').inc(completion_tokens)
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def spent_today(self, provider: str) -> float:
+        """Gasto estimado del día en USD para el proveedor"""
+        with self._lock:
+            if datetime.now().strftime('%Y-%m-%d') != self._day:
+                return 0.0
+            return self._spent_today.get(provider, 0.0)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="usage-ledger",
+                                                 daemon=True)
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Escribe las filas pendientes y actualiza los rollups.
+
+        Returns:
+            Cantidad de filas escritas
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return 0
+
+            deltas: Dict[RollupKey, Dict[str, float]] = {}
+            for entry in entries:
+                key = (entry['created_at'].strftime('%Y-%m-%d'), entry['provider'], entry['model'])
+                row = deltas.setdefault(key, {
+                    'calls': 0, 'errors': 0, 'prompt_tokens': 0,
+                    'completion_tokens': 0, 'cost': 0.0
+                })
+                row['calls'] += 1
+                row['errors'] += 0 if entry['ok'] else 1
+                row['prompt_tokens'] += entry['prompt_tokens']
+                row['completion_tokens'] += entry['completion_tokens']
+                row['cost'] += entry['cost']
+
+            with self.db_manager.get_db() as db:
+                try:
+                    db.bulk_insert_mappings(AIUsageEntry, entries)
+                    table = AIUsageDailyRollup.__table__
+                    for (day, provider, model), values in deltas.items():
+                        upsert_add(db, table, {'day': day, 'provider': provider,
+                                               'model': model}, values)
+                    db.commit()
+                    return len(entries)
+                except Exception as e:
+                    db.rollback()
+                    Logger.error(f"Error guardando consumo de IA: {str(e)}")
+                    # Se reintenta en el próximo lote
+                    with self._lock:
+                        self._pending[:0] = entries
+                    return 0
+
+    def daily_usage(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Totales por día, proveedor y modelo de los últimos `days` días"""
+        self.flush()
+        since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        with self.db_manager.get_db() as db:
+            rows = db.query(AIUsageDailyRollup) \
+                .filter(AIUsageDailyRollup.day >= since) \
+                .order_by(AIUsageDailyRollup.day.desc(), AIUsageDailyRollup.cost.desc()).all()
+            return [{
+                'day': row.day,
+                'provider': row.provider,
+                'model': row.model,
+                'calls': row.calls,
+                'errors': row.errors,
+                'prompt_tokens': row.prompt_tokens,
+                'completion_tokens': row.completion_tokens,
+                'cost': round(row.cost, 4)
+            } for row in rows]
+
+    def breakdown(self, field: str, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Consumo agrupado por página o usuario.
+
+        Args:
+            field: 'page' o 'user'
+            days: Ventana en días
+        """
+        if field not in ('page', 'user'):
+            raise ValueError(f"Agrupación no soportada: {field}")
+        self.flush()
+        column = getattr(AIUsageEntry, field)
+        since = datetime.now() - timedelta(days=days)
+        with self.db_manager.get_db() as db:
+            rows = db.query(
+                column,
+                func.count(AIUsageEntry.id),
+                func.sum(AIUsageEntry.prompt_tokens + AIUsageEntry.completion_tokens),
+                func.sum(AIUsageEntry.cost)
+            ).filter(AIUsageEntry.created_at >= since).group_by(column).all()
+            return sorted(({
+                field: key or 'N/A',
+                'calls': calls,
+                'tokens': tokens or 0,
+                'cost': round(cost or 0.0, 4)
+            } for key, calls, tokens, cost in rows), key=lambda r: r['cost'], reverse=True)
+
+
+class BudgetGuard:
+    """
+    Elige el modelo de cada llamada según el presupuesto diario del proveedor.
+
+    Cuando el gasto del día alcanza downgrade_ratio × daily_budget, las
+    llamadas pasan al modelo más económico de available_models (por precio
+    configurado, o el primero de la lista si no hay precios). Al día
+    siguiente se vuelve al modelo preferido.
+    """
+
+    def __init__(self, ledger: Optional[UsageLedger] = None):
+        self.ledger = ledger or UsageLedger()
+        self.config = Configuration()
+        settings = self.config.get_setting('usage') or {}
+        self.downgrade_ratio = float(settings.get('downgrade_ratio', DEFAULT_DOWNGRADE_RATIO))
+
+    def _provider_settings(self, provider: str) -> Dict[str, Any]:
+        return (self.config.get_setting('ai_providers') or {}).get(provider, {})
+
+    def _cheapest(self, models: List[str]) -> str:
+        if not any(model in self.ledger.prices for model in models):
+            return models[0]
+        return min(models, key=lambda m: sum(self.ledger.prices.get(m, [float('inf')])[:2]))
+
+    def model_for(self, provider: str, preferred: str) -> str:
+        """Modelo a usar en la próxima llamada al proveedor"""
+        settings = self._provider_settings(provider)
+        budget = float(settings.get('daily_budget') or 0)
+        models = settings.get('available_models') or []
+        if not budget or not models or not preferred:
+            return preferred
+        if self.ledger.spent_today(provider) < budget * self.downgrade_ratio:
+            return preferred
+        return self._cheapest(models)
+
+
+class MeteredService(AIServiceInterface):
+    """
+    Envoltorio que registra los tokens y el costo de cada llamada en el
+    libro de consumo y aplica el modelo que indique el control de presupuesto.
+    """
+
+    def __init__(self, provider: str, service: AIServiceInterface,
+                 ledger: Optional[UsageLedger] = None, guard: Optional[BudgetGuard] = None):
+        self.provider = provider
+        self.service = service
+        self.ledger = ledger or UsageLedger()
+        self.guard = guard or BudgetGuard(self.ledger)
+        self.preferred_model: str = getattr(service, 'model', '') or ''
+        self._downgraded = False
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def close(self) -> None:
+        self.service.close()
+
+    @property
+    def supports_native_batch(self) -> bool:
+        return self.service.supports_native_batch
+
+    @property
+    def batch_chunk_size(self) -> int:
+        return self.service.batch_chunk_size
+
+    def _select_model(self) -> str:
+        """
+        Modelo para esta llamada según el presupuesto. No modifica el servicio,
+        que es compartido: el modelo se pasa a la llamada con call_model.
+        """
+        model = self.guard.model_for(self.provider, self.preferred_model)
+        downgraded = bool(model) and model != self.preferred_model
+        with self._lock:
+            changed, self._downgraded = downgraded != self._downgraded, downgraded
+        if changed and downgraded:
+            AI_MODEL_DOWNGRADES.labels(self.provider, model).inc()
+            Logger.warning(f"Presupuesto de {self.provider} cerca del límite; "
+                           f"se usa {model} en lugar de {self.preferred_model}")
+        return model
+
+    def _record(self, model: str, operation: str, prompt_tokens: int,
+                completion_tokens: int, ok: bool) -> None:
+        try:
+            self.ledger.record(self.provider, model, operation,
+                               prompt_tokens, completion_tokens, ok)
+        except Exception as e:
+            Logger.error(f"Error registrando consumo de {self.provider}: {str(e)}")
+
+    def get_completion(self, prompt: str) -> str:
+        model = self._select_model()
+        ok, response = False, ''
+        try:
+            with call_model(model):
+                response = self.service.get_completion(prompt)
+            ok = True
+            return response
+        finally:
+            self._record(model, 'get_completion', estimate_tokens(prompt),
+                         estimate_tokens(response or '') if ok else 0, ok)
+
+    def process_request(self, request_data: dict) -> dict:
+        model = self._select_model()
+        ok, response = False, None
+        try:
+            with call_model(model):
+                response = self.service.process_request(request_data)
+            ok = True
+            return response
+        finally:
+            self._record(model, 'process_request', estimate_tokens(str(request_data)),
+                         estimate_tokens(str(response)) if ok else 0, ok)
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        model = self._select_model()
+        ok, size = False, 0
+        try:
+            # El modelo se fija solo mientras avanza el generador del proveedor:
+            # entre fragmentos el contexto vuelve a ser el de quien consume
+            chunks = iter(self.service.stream_completion(prompt))
+            while True:
+                with call_model(model):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+            ok = True
+        finally:
+            self._record(model, 'stream_completion', estimate_tokens(prompt),
+                         tokens_for_chars(size), ok)
+
+    async def aget_completion(self, prompt: str) -> str:
+        model = self._select_model()
+        ok, response = False, ''
+        try:
+            with call_model(model):
+                response = await self.service.aget_completion(prompt)
+            ok = True
+            return response
+        finally:
+            self._record(model, 'aget_completion', estimate_tokens(prompt),
+                         estimate_tokens(response or '') if ok else 0, ok)
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        model = self._select_model()
+        ok, response = False, None
+        try:
+            with call_model(model):
+                response = await self.service.aprocess_request(request_data)
+            ok = True
+            return response
+        finally:
+            self._record(model, 'aprocess_request', estimate_tokens(str(request_data)),
+                         estimate_tokens(str(response)) if ok else 0, ok)
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        model = self._select_model()
+        ok, outcomes = False, []
+        try:
+            with call_model(model):
+                outcomes = await self.service._acall_native_batch(chunk)
+            ok = True
+            return outcomes
+        finally:
+            self._record(model, 'process_batch', sum(estimate_tokens(str(r)) for r in chunk),
+                         sum(estimate_tokens(str(o)) for o in outcomes) if ok else 0, ok)
@@ -1,7 +1,8 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 from app.config.secrets_manager import SecretsManager
 from app.services.ai_service_interface import AIServiceInterface
+from app.services.http_transport import HttpTransport
 from app.utils.logger import Logger
 
 
@@ -13,8 +14,12 @@ def __init__(self):
 
     def _init_client(self) -> None:
         """Inicializa el cliente de Vertex AI"""
-        # Aquí iría la inicialización real del cliente
-        pass
+        # Aquí iría la inicialización real del cliente, sobre el pool compartido
+        self.http = HttpTransport.client("vertex")
+
+    def close(self) -> None:
+        """Cierra el pool de conexiones compartido del proveedor"""
+        HttpTransport.close("vertex")
 
     def get_completion(self, prompt: str) -> str:
         """
@@ -27,7 +32,7 @@ def get_completion(self, prompt: str) -> str:
             La respuesta generada por el modelo
         """
         try:
-            # Aquí iría la llamada real a Vertex AI
+            # Aquí iría la llamada real a Vertex AI vía self.http.post_json(...)
             return f"Vertex AI respuesta simulada para: {prompt}"
         except Exception as e:
             Logger.error(f"Error en Vertex AI completion: {str(e)}")
@@ -51,3 +56,57 @@ def process_request(self, request_data: Dict) -> Dict:
         except Exception as e:
             Logger.error(f"Error procesando solicitud Vertex AI: {str(e)}")
             raise
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        """
+        Obtiene la respuesta del modelo Vertex AI en fragmentos.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Yields:
+            Fragmentos consecutivos de la respuesta
+        """
+        try:
+            # Aquí iría la llamada real con streaming a Vertex AI
+            for word in f"Vertex AI respuesta simulada para: {prompt}".split(" "):
+                yield word + " "
+        except Exception as e:
+            Logger.error(f"Error en Vertex AI streaming: {str(e)}")
+            raise
+
+    async def aget_completion(self, prompt: str) -> str:
+        """
+        Obtiene una respuesta del modelo Vertex AI sin bloquear el loop.
+
+        Args:
+            prompt: El texto de entrada para el modelo
+
+        Returns:
+            La respuesta generada por el modelo
+        """
+        try:
+            # Aquí iría la llamada asíncrona real a Vertex AI
+            return f"Vertex AI respuesta simulada para: {prompt}"
+        except Exception as e:
+            Logger.error(f"Error en Vertex AI completion asíncrona: {str(e)}")
+            raise
+
+    async def aprocess_request(self, request_data: Dict) -> Dict:
+        """
+        Procesa una solicitud usando Vertex AI sin bloquear el loop.
+
+        Args:
+            request_data: Datos de la solicitud
+
+        Returns:
+            Respuesta procesada
+        """
+        try:
+            return {
+                "response": f"Vertex AI procesó: {request_data}",
+                "provider": "vertex"
+            }
+        except Exception as e:
+            Logger.error(f"Error procesando solicitud Vertex AI asíncrona: {str(e)}")
+            raise
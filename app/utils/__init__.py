@@ -6,9 +6,11 @@
 
 from app.utils.cache import CacheManager, cached
 from app.utils.logger import Logger
+from app.utils.metrics import MetricsRegistry
 
 __all__ = [
     'CacheManager',
     'cached',
-    'Logger'
+    'Logger',
+    'MetricsRegistry'
 ]
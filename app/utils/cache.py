@@ -5,6 +5,13 @@
 import redis
 
 from app.utils.logger import Logger
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.tracing import Tracer
+
+_CACHE_HITS = CACHE_REQUESTS.labels('manager', 'hit')
+_CACHE_MISSES = CACHE_REQUESTS.labels('manager', 'miss')
+_MEMO_HITS = CACHE_REQUESTS.labels('cached', 'hit')
+_MEMO_MISSES = CACHE_REQUESTS.labels('cached', 'miss')
 
 
 class CacheManager:
@@ -28,10 +35,16 @@ def _initialize_redis(self) -> Optional[redis.Redis]:
 
     def get(self, key: str) -> Any:
         """Obtiene un valor del caché"""
-        redis_value = self._get_from_redis(key)
-        if redis_value is not None:
-            return redis_value
-        return self._get_from_local(key)
+        with Tracer.start_span("cache.get", key=key) as span:
+            redis_value = self._get_from_redis(key)
+            if redis_value is not None:
+                _CACHE_HITS.inc()
+                span.set_attribute("result", "redis")
+                return redis_value
+            value = self._get_from_local(key)
+            (_CACHE_MISSES if value is None else _CACHE_HITS).inc()
+            span.set_attribute("result", "miss" if value is None else "local")
+            return value
 
     def _get_from_redis(self, key: str) -> Optional[Any]:
         """Obtiene un valor de Redis"""
@@ -67,8 +80,10 @@ def wrapper(*args: Any, **kwargs: Any) -> Any:
             if key in cache:
                 result, timestamp = cache[key]
                 if now - timestamp < timedelta(seconds=ttl):
+                    _MEMO_HITS.inc()
                     return result
 
+            _MEMO_MISSES.inc()
             result = func(*args, **kwargs)
             cache[key] = (result, now)
             return result
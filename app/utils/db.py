@@ -2,12 +2,15 @@
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Generator
+from typing import Dict, Generator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.models import conversations  # noqa: F401  registra las tablas del chat
+from app.models import usage  # noqa: F401  registra el libro de consumo de IA
 from app.models.database import Base, Client, ClientStatus, Equipment
+from app.models.rollups import rebuild_rollups, rollups_empty
 
 
 class DatabaseManager:
@@ -35,6 +38,11 @@ def __init__(self):
             bind=self.engine
         )
 
+        # Poblar rollups en bases creadas antes de que existieran
+        with self.get_db() as db:
+            if rollups_empty(db):
+                rebuild_rollups(db)
+
     @contextmanager
     def get_db(self) -> Generator[Session, None, None]:
         db = self.SessionLocal()
@@ -43,6 +51,11 @@ def get_db(self) -> Generator[Session, None, None]:
         finally:
             db.close()
 
+    def rebuild_rollups(self) -> Dict[str, int]:
+        """Reconstruye las tablas de rollup desde las tablas de origen"""
+        with self.get_db() as db:
+            return rebuild_rollups(db)
+
     def add_sample_data(self, db: Session) -> None:
         """Agrega datos de ejemplo a la base de datos"""
         try:
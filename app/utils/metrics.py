@@ -0,0 +1,377 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.logger import Logger
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str) -> Any:
+        """Obtiene la serie correspondiente a los valores de etiquetas"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: se esperaban etiquetas {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requiere etiquetas {self.labelnames}")
+        return self.labels()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        for values, child in list(self._children.items()):
+            lines.extend(self._collect_child(values, child))
+        return lines
+
+    def _collect_child(self, values: LabelValues, child: Any) -> List[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class _Value:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def get(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Un contador solo puede incrementarse")
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _collect_child(self, values: LabelValues, child: _HistogramValue) -> List[str]:
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip([*self.buckets, float('inf')], counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, ('le', _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso con exposición en formato Prometheus"""
+
+    _metrics: Dict[str, _Metric] = {}
+    _lock = threading.Lock()
+    _server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def _register(cls, metric_class, name: str, *args: Any, **kwargs: Any) -> Any:
+        metric = cls._metrics.get(name)
+        if metric is None:
+            with cls._lock:
+                metric = cls._metrics.get(name)
+                if metric is None:
+                    metric = metric_class(name, *args, **kwargs)
+                    cls._metrics[name] = metric
+        if not isinstance(metric, metric_class):
+            raise ValueError(f"La métrica {name} ya existe con otro tipo")
+        return metric
+
+    @classmethod
+    def counter(cls, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return cls._register(Counter, name, documentation, labelnames)
+
+    @classmethod
+    def gauge(cls, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return cls._register(Gauge, name, documentation, labelnames)
+
+    @classmethod
+    def histogram(cls, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return cls._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    @classmethod
+    def render(cls) -> str:
+        """Genera la exposición de todas las métricas en formato de texto"""
+        lines: List[str] = []
+        for metric in list(cls._metrics.values()):
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def start_http_server(cls, port: int, host: str = '127.0.0.1') -> bool:
+        """
+        Inicia (una sola vez por proceso) el endpoint /metrics en un hilo aparte.
+
+        Por defecto escucha solo en loopback: el endpoint no tiene
+        autenticación, así que exponerlo en otras interfaces debe pedirse
+        explícitamente con `host`.
+
+        Returns:
+            True si el servidor está activo
+        """
+        with cls._lock:
+            if cls._server is not None:
+                return True
+            try:
+                cls._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                cls._server.daemon_threads = True
+            except OSError as e:
+                Logger.warning(f"No se pudo iniciar el endpoint de métricas en {port}: {e}")
+                return False
+
+        thread = threading.Thread(
+            target=cls._server.serve_forever,
+            name="metrics-exporter",
+            daemon=True
+        )
+        thread.start()
+        Logger.info(f"Métricas disponibles en http://{host}:{port}/metrics")
+        return True
+
+    @classmethod
+    def stop_http_server(cls) -> None:
+        """Detiene el endpoint de métricas si está activo"""
+        with cls._lock:
+            if cls._server is not None:
+                cls._server.shutdown()
+                cls._server.server_close()
+                cls._server = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = MetricsRegistry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+# Métricas predefinidas de la aplicación
+PAGE_RENDER_SECONDS = MetricsRegistry.histogram(
+    'acma_page_render_seconds',
+    'Tiempo de renderizado de cada página',
+    ['page']
+)
+STORE_OPERATION_SECONDS = MetricsRegistry.histogram(
+    'acma_store_operation_seconds',
+    'Latencia de operaciones sobre los almacenes de datos',
+    ['store', 'operation']
+)
+CACHE_REQUESTS = MetricsRegistry.counter(
+    'acma_cache_requests_total',
+    'Consultas al caché por resultado (hit/miss)',
+    ['cache', 'result']
+)
+AI_CALL_SECONDS = MetricsRegistry.histogram(
+    'acma_ai_call_seconds',
+    'Latencia de llamadas a proveedores de IA',
+    ['provider', 'operation']
+)
+AI_TIME_TO_FIRST_TOKEN_SECONDS = MetricsRegistry.histogram(
+    'acma_ai_time_to_first_token_seconds',
+    'Tiempo hasta el primer fragmento de una respuesta en streaming',
+    ['provider']
+)
+AI_RETRIES = MetricsRegistry.counter(
+    'acma_ai_retries_total',
+    'Reintentos de llamadas a proveedores de IA',
+    ['provider', 'operation']
+)
+AI_HEDGED_REQUESTS = MetricsRegistry.counter(
+    'acma_ai_hedged_requests_total',
+    'Solicitudes de cobertura enviadas y las que respondieron primero (sent/won)',
+    ['provider', 'result']
+)
+AI_ROUTER_DECISIONS = MetricsRegistry.counter(
+    'acma_ai_router_decisions_total',
+    'Backends elegidos por el router y fallas que provocaron failover',
+    ['provider', 'decision']
+)
+AI_RATE_LIMIT_WAIT_SECONDS = MetricsRegistry.histogram(
+    'acma_ai_rate_limit_wait_seconds',
+    'Espera en cola por cuota del proveedor antes de cada llamada',
+    ['provider']
+)
+AI_RATE_LIMITED = MetricsRegistry.counter(
+    'acma_ai_rate_limited_total',
+    'Llamadas rechazadas por cuota agotada',
+    ['provider']
+)
+HTTP_CONNECTIONS = MetricsRegistry.counter(
+    'acma_http_connections_total',
+    'Conexiones HTTP hacia proveedores por evento (opened/reused)',
+    ['host', 'event']
+)
+AI_CALL_ERRORS = MetricsRegistry.counter(
+    'acma_ai_call_errors_total',
+    'Llamadas a proveedores de IA que fallaron',
+    ['provider', 'operation']
+)
+AI_TOKENS = MetricsRegistry.counter(
+    'acma_ai_tokens_total',
+    'Tokens estimados enviados y recibidos por proveedor y modelo (prompt/completion)',
+    ['provider', 'model', 'kind']
+)
+AI_MODEL_DOWNGRADES = MetricsRegistry.counter(
+    'acma_ai_model_downgrades_total',
+    'Cambios a un modelo más económico por presupuesto',
+    ['provider', 'model']
+)
+TRIAGE_QUEUE_DEPTH = MetricsRegistry.gauge(
+    'acma_triage_queue_depth',
+    'Solicitudes en espera de pre-análisis'
+)
+TRIAGE_JOBS = MetricsRegistry.counter(
+    'acma_triage_jobs_total',
+    'Trabajos de pre-análisis por evento (queued/rejected/failed/done)',
+    ['result']
+)
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable:
+    """
+    Decorador que registra la duración de la función en un histograma.
+
+    Args:
+        histogram: Histograma destino
+        labels: Valores de etiquetas fijos para la serie
+    """
+    child = histogram.labels(**labels) if labels else histogram.labels()
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
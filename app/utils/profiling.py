@@ -0,0 +1,169 @@
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# Modos de perfilado de un rerun
+TIMING = 'timing'    # solo árbol de tiempos
+PROFILE = 'profile'  # árbol de tiempos + cProfile
+
+
+class RenderSpan:
+    """Nodo del árbol de tiempos de un rerun"""
+
+    __slots__ = ('name', 'start', 'duration', 'children')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.children: List['RenderSpan'] = []
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, 'RenderSpan']]:
+        """Recorre el árbol en profundidad junto con el nivel de cada nodo"""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+_current_span: ContextVar[Optional[RenderSpan]] = ContextVar('render_span', default=None)
+
+# cProfile admite un solo perfilador activo por proceso (Python 3.12+), y
+# perfilar varios reruns a la vez distorsiona los tiempos: uno por vez
+_profile_lock = threading.Lock()
+
+
+def render_timing(name: Optional[str] = None) -> Callable:
+    """
+    Decorador que registra la duración de un render como hijo del span activo.
+
+    Si no hay un perfilado en curso la función se llama directamente, por lo
+    que el costo con el perfilado desactivado es una lectura de ContextVar.
+
+    Args:
+        name: Nombre del span; por defecto el nombre calificado de la función
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            parent = _current_span.get()
+            if parent is None:
+                return func(*args, **kwargs)
+
+            span = RenderSpan(span_name)
+            parent.children.append(span)
+            token = _current_span.set(span)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                span.duration = time.perf_counter() - span.start
+                _current_span.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+class RenderProfiler:
+    """
+    Contexto que perfila un rerun completo.
+
+    En modo PROFILE se usa cProfile solo si ningún otro rerun del proceso se
+    está perfilando; si no, o si cProfile no puede activarse, se registra
+    solo el árbol de tiempos y `notice` explica el motivo.
+
+    Args:
+        mode: None (desactivado), TIMING o PROFILE
+        name: Nombre del span raíz
+    """
+
+    def __init__(self, mode: Optional[str], name: str = 'rerun'):
+        self.mode = mode
+        self.name = name
+        self.root: Optional[RenderSpan] = None
+        self.profile: Optional[cProfile.Profile] = None
+        self.notice: Optional[str] = None
+        self._token = None
+
+    @property
+    def active(self) -> bool:
+        return self.root is not None
+
+    def __enter__(self) -> 'RenderProfiler':
+        if self.mode not in (TIMING, PROFILE):
+            return self
+        if self.mode == PROFILE:
+            self.profile = self._start_profile()
+            if self.profile is None:
+                self.mode = TIMING
+        self.root = RenderSpan(self.name)
+        self._token = _current_span.set(self.root)
+        return self
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        if not _profile_lock.acquire(blocking=False):
+            self.notice = "Otro rerun se está perfilando; se registran solo los tiempos"
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Otro perfilador activo en el proceso (p. ej. un depurador)
+            _profile_lock.release()
+            self.notice = f"cProfile no disponible ({e}); se registran solo los tiempos"
+            return None
+        return profile
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.root is None:
+            return
+        if self.profile is not None:
+            try:
+                self.profile.disable()
+            finally:
+                _profile_lock.release()
+        self.root.duration = time.perf_counter() - self.root.start
+        _current_span.reset(self._token)
+
+    def span_rows(self) -> List[dict]:
+        """Filas del árbol de tiempos, en orden de ejecución"""
+        if self.root is None:
+            return []
+        return [
+            {
+                'span': f"{'  ' * depth}{span.name}",
+                'ms': round(span.duration * 1000, 2),
+                '% rerun': round(100 * span.duration / self.root.duration, 1)
+                if self.root.duration else 0.0
+            }
+            for depth, span in self.root.walk()
+        ]
+
+    def stats_text(self, limit: int = 25) -> str:
+        """Resumen de cProfile ordenado por tiempo acumulado"""
+        if self.profile is None:
+            return ''
+        buffer = io.StringIO()
+        pstats.Stats(self.profile, stream=buffer).sort_stats('cumulative').print_stats(limit)
+        return buffer.getvalue()
+
+    def stats_bytes(self) -> bytes:
+        """Contenido del archivo .pstats del rerun perfilado"""
+        if self.profile is None:
+            return b''
+        fd, path = tempfile.mkstemp(suffix='.pstats')
+        os.close(fd)
+        try:
+            self.profile.dump_stats(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
@@ -0,0 +1,173 @@
+import hashlib
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Primo de Mersenne 2^61 - 1 para las permutaciones universales de MinHash
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class DDSketch:
+    """
+    Sketch de cuantiles con error relativo acotado (DDSketch).
+
+    Los valores positivos se agrupan en intervalos logarítmicos, por lo que
+    cualquier cuantil estimado está dentro de un error relativo `alpha` del
+    valor real. Dos sketches con el mismo `alpha` se combinan sumando sus
+    intervalos, lo que permite agregar datos de varios procesos.
+    """
+
+    def __init__(self, alpha: float = 0.01, max_bins: int = 2048):
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        """Agrega un valor no negativo al sketch"""
+        if value < 0:
+            raise ValueError(f"DDSketch no admite valores negativos: {value}")
+
+        if value == 0:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'DDSketch') -> None:
+        """Combina otro sketch con la misma precisión en este"""
+        if other.alpha != self.alpha:
+            raise ValueError("Solo se pueden combinar sketches con el mismo alpha")
+        if not other.count:
+            return
+
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima el cuantil q (entre 0 y 1).
+
+        Returns:
+            El valor estimado o None si el sketch está vacío
+        """
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError(f"Cuantil fuera de rango: {q}")
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Promedio exacto de los valores agregados"""
+        return self.sum / self.count if self.count else None
+
+    def _collapse(self) -> None:
+        """Une los intervalos más bajos para respetar max_bins"""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins + 1
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa el sketch a un diccionario compatible con JSON"""
+        return {
+            'alpha': self.alpha,
+            'max_bins': self.max_bins,
+            'bins': {str(k): v for k, v in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DDSketch':
+        """Reconstruye un sketch serializado con to_dict"""
+        sketch = cls(alpha=data['alpha'], max_bins=data.get('max_bins', 2048))
+        sketch.bins = {int(k): v for k, v in data['bins'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
+
+
+class MinHash:
+    """
+    Firma MinHash para estimar la similitud de Jaccard entre conjuntos.
+
+    Todas las firmas creadas con el mismo `num_perm` y `seed` son
+    comparables; la fracción de posiciones iguales estima la similitud.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # a < 2^31 y x < 2^32 mantienen a*x + b dentro de 64 bits sin desbordar
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray:
+        """Firma de un conjunto de shingles; un conjunto vacío da todo _MAX_HASH"""
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+             for s in set(shingles)],
+            dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # (a*x + b) mod p, truncado a 32 bits
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_MERSENNE_PRIME)
+        return (permuted & np.uint64(_MAX_HASH)).min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Similitud de Jaccard estimada entre dos firmas"""
+        return float(np.mean(first == second))
+
+    @staticmethod
+    def bands(signature: np.ndarray, bands: int) -> List[Tuple[int, bytes]]:
+        """
+        Divide la firma en bandas para indexarla (LSH): dos firmas con
+        alguna banda igual son candidatas a ser similares.
+        """
+        rows = len(signature) // bands
+        return [(i, signature[i * rows:(i + 1) * rows].tobytes()) for i in range(bands)]
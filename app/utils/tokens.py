@@ -0,0 +1,18 @@
+import math
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def tokens_for_chars(chars: int) -> int:
+    """Tokens estimados para un texto de `chars` caracteres"""
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimación rápida de tokens (~4 caracteres por token, más un margen por
+    mensaje); suficiente para acotar contextos y cuotas sin depender del
+    tokenizador de cada proveedor.
+    """
+    return tokens_for_chars(len(text)) + MESSAGE_OVERHEAD_TOKENS
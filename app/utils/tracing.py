@@ -0,0 +1,294 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.logger import Logger
+
+
+class Span:
+    """Intervalo de trabajo con atributos y vínculo a su span padre"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start_ns', 'end_ns', 'status', '_token')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = 'ok'
+        self._token = None
+
+    @property
+    def sampled(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.status = 'error'
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        Tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': (self.end_ns - self.start_ns) / 1e6,
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+
+class _NoopSpan:
+    """Span descartado por el muestreo; sus hijos también se descartan"""
+
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _current_span.reset(self._token)
+
+
+class _DisabledSpan:
+    """
+    Span sin efecto que no toca el contexto; se usa con el tracing desactivado
+    y para los descendientes de una traza no muestreada.
+    """
+
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_DisabledSpan':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_DISABLED = _DisabledSpan()
+_current_span: ContextVar[Any] = ContextVar('trace_span', default=None)
+
+
+class JsonLinesExporter:
+    """Escribe cada span como una línea JSON en un archivo local"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with self.path.open('a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + '\n')
+
+
+class OTLPJsonExporter:
+    """Envía spans a un colector compatible con OTLP/HTTP en formato JSON"""
+
+    def __init__(self, endpoint: str, service_name: str = 'acma-dashboard', timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': self.service_name}}
+                ]},
+                'scopeSpans': [{
+                    'scope': {'name': 'app.utils.tracing'},
+                    'spans': [self._to_otlp(span) for span in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, default=str).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    @staticmethod
+    def _to_otlp(span: Span) -> Dict[str, Any]:
+        otlp = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [
+                {'key': k, 'value': {'stringValue': str(v)}}
+                for k, v in span.attributes.items()
+            ],
+            'status': {'code': 2 if span.status == 'error' else 1}
+        }
+        if span.parent_id:
+            otlp['parentSpanId'] = span.parent_id
+        return otlp
+
+
+class Tracer:
+    """
+    Configuración global del tracing.
+
+    El muestreo se decide en el span raíz y se hereda en toda la traza; los
+    spans terminados se encolan y un hilo aparte los exporta por lotes.
+    """
+
+    _enabled = False
+    _sample_rate = 1.0
+    _exporter: Any = None
+    _queue: 'queue.Queue[Span]' = queue.Queue(maxsize=10000)
+    _worker: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+    _batch_size = 256
+    _flush_interval = 1.0
+
+    @classmethod
+    def configure(cls, settings: Optional[Dict[str, Any]]) -> None:
+        """
+        Configura el tracing a partir de Configuration.settings['tracing'].
+
+        Args:
+            settings: enabled, sample_rate, exporter ('jsonl' u 'otlp'),
+                path y otlp_endpoint
+        """
+        settings = settings or {}
+        with cls._lock:
+            cls._enabled = bool(settings.get('enabled'))
+            cls._sample_rate = float(settings.get('sample_rate', 1.0))
+            if not cls._enabled:
+                return
+            if settings.get('exporter') == 'otlp':
+                cls._exporter = OTLPJsonExporter(
+                    settings.get('otlp_endpoint', 'http://localhost:4318/v1/traces')
+                )
+            else:
+                cls._exporter = JsonLinesExporter(settings.get('path', 'logs/traces.jsonl'))
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(
+                    target=cls._run_exporter, name="trace-exporter", daemon=True
+                )
+                cls._worker.start()
+
+    @classmethod
+    def start_span(cls, name: str, **attributes: Any) -> Any:
+        """
+        Crea un span hijo del span activo (o uno raíz) para usar con `with`.
+
+        Args:
+            name: Nombre de la operación
+            attributes: Atributos iniciales del span
+        """
+        if not cls._enabled:
+            return _DISABLED
+        parent = _current_span.get()
+        if parent is None:
+            if random.random() >= cls._sample_rate:
+                return _NoopSpan()
+            return Span(name, os.urandom(16).hex(), None, attributes)
+        if not parent.sampled:
+            return _DISABLED
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+
+    @classmethod
+    def current_span(cls) -> Any:
+        """Retorna el span activo o None"""
+        return _current_span.get()
+
+    @classmethod
+    def export(cls, span: Span) -> None:
+        try:
+            cls._queue.put_nowait(span)
+        except queue.Full:
+            pass  # se prefiere perder spans a bloquear el render
+
+    @classmethod
+    def flush(cls) -> None:
+        """Exporta de inmediato los spans pendientes"""
+        batch: List[Span] = []
+        while True:
+            try:
+                batch.append(cls._queue.get_nowait())
+            except queue.Empty:
+                break
+        cls._export_batch(batch)
+
+    @classmethod
+    def _export_batch(cls, batch: List[Span]) -> None:
+        if not batch or cls._exporter is None:
+            return
+        try:
+            cls._exporter.export(batch)
+        except Exception as e:
+            Logger.warning(f"Error exportando {len(batch)} spans: {str(e)}")
+
+    @classmethod
+    def _run_exporter(cls) -> None:
+        while True:
+            batch: List[Span] = []
+            try:
+                batch.append(cls._queue.get(timeout=cls._flush_interval))
+                while len(batch) < cls._batch_size:
+                    batch.append(cls._queue.get_nowait())
+            except queue.Empty:
+                pass
+            cls._export_batch(batch)
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """
+    Decorador que ejecuta la función dentro de un span.
+
+    Args:
+        name: Nombre del span; por defecto el nombre calificado de la función
+        attributes: Atributos fijos del span
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with Tracer.start_span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
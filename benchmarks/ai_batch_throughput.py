@@ -0,0 +1,92 @@
+"""
+Benchmark de throughput de process_batch contra un proveedor simulado.
+
+Compara process_request secuencial, process_batch con fan-out por bloques y
+process_batch con lote nativo. Ejecutar desde la raíz del proyecto:
+
+    python benchmarks/ai_batch_throughput.py --requests 500 --latency 0.05
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.factory import ServiceFactory
+
+LATENCY = 0.05
+
+
+class MockBatchProvider(AIServiceInterface):
+    """Proveedor local con latencia fija por llamada"""
+
+    def get_completion(self, prompt: str) -> str:
+        time.sleep(LATENCY)
+        return prompt.upper()
+
+    def process_request(self, request_data: dict) -> dict:
+        time.sleep(LATENCY)
+        return {"response": str(request_data.get("observations", "")).upper()}
+
+    async def aprocess_request(self, request_data: dict) -> dict:
+        await asyncio.sleep(LATENCY)
+        if request_data.get("fail"):
+            raise ValueError("solicitud inválida")
+        return {"response": str(request_data.get("observations", "")).upper()}
+
+
+class MockNativeBatchProvider(MockBatchProvider):
+    """Proveedor que procesa cada bloque en una sola llamada"""
+
+    async def _acall_native_batch(self, chunk: List[dict]) -> List[Any]:
+        await asyncio.sleep(LATENCY * 2)
+        return [{"response": str(r.get("observations", "")).upper()} for r in chunk]
+
+
+def _report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<28} {count:>6} solicitudes  {elapsed:8.3f} s  {count / elapsed:10.1f} req/s")
+
+
+def main() -> None:
+    global LATENCY
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--sequential", type=int, default=50,
+                        help="solicitudes a medir en modo secuencial")
+    args = parser.parse_args()
+    LATENCY = args.latency
+
+    ServiceFactory.register_service("mock-batch", MockBatchProvider)
+    ServiceFactory.register_service("mock-native-batch", MockNativeBatchProvider)
+    requests: List[Dict] = [
+        {"id": i, "observations": f"balanza analítica serie B{i:06d}", "fail": i % 97 == 0}
+        for i in range(args.requests)
+    ]
+
+    service = ServiceFactory.get_service("mock-batch")
+    start = time.perf_counter()
+    for request in requests[:args.sequential]:
+        service.process_request(request)
+    _report("secuencial", args.sequential, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = service.process_batch(requests)
+    _report("fan-out por bloques", len(results), time.perf_counter() - start)
+    errors = sum(1 for r in results if r["error"])
+    ordered = all(r["result"] is None or r["result"]["response"] == q["observations"].upper()
+                  for r, q in zip(results, requests))
+    print(f"  errores por ítem: {errors}, orden preservado: {ordered}")
+
+    native = ServiceFactory.get_service("mock-native-batch")
+    start = time.perf_counter()
+    results = native.process_batch(requests)
+    _report("lote nativo", len(results), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Prueba de carga de los caminos de IA (chat y pre-análisis) sin proveedores reales.
+
+Registra el proveedor simulado "mock" (app.services.mock_service) con la
+distribución de latencia, tasa de error y velocidad de streaming indicadas, y
+corre N sesiones simultáneas que envían mensajes a través de
+Chat._handle_user_input, cada una con su propio session_state de Streamlit
+(AppTest). Opcionalmente encola pre-análisis de solicitudes en paralelo.
+Reporta throughput, latencias p50/p99 y memoria. Ejecutar desde la raíz:
+
+    python benchmarks/ai_load_test.py --sessions 20 --messages 5 \\
+        --latency lognormal --median 0.4 --sigma 0.8 --error-rate 0.02 --triage 100
+
+La base de datos y los logs se crean en un directorio temporal.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from streamlit.testing.v1 import AppTest
+
+from app.services.mock_service import MockService
+
+APOLOGY = "Lo siento"
+
+
+def _chat_app() -> None:
+    """Script de Streamlit de cada sesión simulada"""
+    import streamlit as st
+
+    from app.components.chat import Chat
+
+    chat = Chat()
+    message = st.session_state.pop('load_message', None)
+    if message:
+        chat._handle_user_input(message)
+
+
+class SessionResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+
+
+def _run_session(index: int, args: argparse.Namespace, barrier: threading.Barrier,
+                 result: SessionResult) -> None:
+    app = AppTest.from_function(_chat_app, default_timeout=args.timeout)
+    app.session_state['current_provider'] = args.provider
+    app.run()
+    barrier.wait()
+    for i in range(args.messages):
+        if args.think_time:
+            time.sleep(args.think_time)
+        app.session_state['load_message'] = (
+            f"Sesión {index}, consulta {i}: ¿cuál es la tolerancia de una balanza "
+            f"clase II con carga de {100 + i} g?"
+        )
+        start = time.perf_counter()
+        try:
+            app.run()
+        except Exception:
+            result.errors += 1
+            continue
+        result.latencies.append(time.perf_counter() - start)
+        replies = app.chat_message
+        failed = bool(app.exception) or not replies or any(
+            APOLOGY in block.value for block in replies[-1].markdown
+        )
+        if failed:
+            result.errors += 1
+
+
+def _run_triage(count: int, provider: str) -> Dict[str, float]:
+    """Encola `count` pre-análisis y espera a que la cola se vacíe"""
+    from app.components.solicitudes import Solicitudes
+    from app.services.triage_worker import TriageQueue
+
+    store = Solicitudes()
+    queue = TriageQueue()
+    queue.provider = provider
+    submitted: Dict[str, float] = {}
+    accepted = 0
+    start = time.perf_counter()
+    for i in range(count):
+        request = {
+            'id': f'LOAD{i:05d}',
+            'service_type': 'Calibración de Balanzas',
+            'urgency': 'Normal',
+            'equipment': {'model': f'XPE{i}', 'serial': f'B{i:08d}'},
+            'observations': f'Balanza modelo XPE{i}, serie B{i:08d}, urgente'
+        }
+        store.add_request(request)
+        submitted[request['id']] = time.time()
+        accepted += queue.submit(store, request)
+    queue.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for request_id, submitted_at in submitted.items():
+        triage = store.get_request_by_id(request_id).get('ai_triage') or {}
+        if triage.get('status') == 'done':
+            latencies.append(triage['completed_at'].timestamp() - submitted_at)
+    return {
+        'accepted': accepted,
+        'skipped': count - accepted,
+        'elapsed': elapsed,
+        'latencies': latencies
+    }
+
+
+def _percentiles(values: List[float]) -> str:
+    if not values:
+        return "sin datos"
+    p50, p99 = np.percentile(values, [50, 99])
+    return f"p50 {p50 * 1000:8.1f} ms  p99 {p99 * 1000:8.1f} ms  máx {max(values) * 1000:8.1f} ms"
+
+
+def _rss_mb() -> float:
+    """Memoria residente actual (Linux) o máxima del proceso"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=5, help="mensajes por sesión")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="pausa entre mensajes de una sesión (s)")
+    parser.add_argument("--latency", choices=["fixed", "lognormal", "pareto"],
+                        default="lognormal")
+    parser.add_argument("--median", type=float, default=0.2,
+                        help="mediana de la latencia al primer fragmento (s)")
+    parser.add_argument("--sigma", type=float, default=0.6)
+    parser.add_argument("--alpha", type=float, default=2.0, help="índice de la Pareto")
+    parser.add_argument("--tail-prob", type=float, default=0.0)
+    parser.add_argument("--tail-mult", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tps", type=float, default=200.0, help="tokens por segundo")
+    parser.add_argument("--tokens", type=int, default=60, help="tokens por respuesta")
+    parser.add_argument("--triage", type=int, default=0,
+                        help="pre-análisis a encolar en paralelo")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="medir el pico de memoria de Python (más lento)")
+    args = parser.parse_args()
+    args.provider = "mock"
+
+    os.chdir(tempfile.mkdtemp(prefix="acma-load-"))
+    MockService.configure(
+        latency=args.latency, median_latency=args.median, sigma=args.sigma,
+        pareto_alpha=args.alpha, tail_probability=args.tail_prob,
+        tail_multiplier=args.tail_mult, error_rate=args.error_rate,
+        tokens_per_second=args.tps, response_tokens=args.tokens, seed=args.seed
+    )
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = _rss_mb()
+
+    results = [SessionResult() for _ in range(args.sessions)]
+    barrier = threading.Barrier(args.sessions + 1)
+    threads = [
+        threading.Thread(target=_run_session, args=(i, args, barrier, result),
+                         name=f"load-session-{i}")
+        for i, result in enumerate(results)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+
+    triage = _run_triage(args.triage, args.provider) if args.triage else None
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for result in results for latency in result.latencies]
+    errors = sum(result.errors for result in results)
+    sent = args.sessions * args.messages
+    print(f"chat: {args.sessions} sesiones × {args.messages} mensajes, "
+          f"latencia {args.latency} mediana {args.median}s, error {args.error_rate:.1%}")
+    print(f"  {sent} mensajes en {elapsed:.2f} s  {sent / elapsed:8.1f} msj/s  "
+          f"errores {errors}")
+    print(f"  latencia por mensaje: {_percentiles(latencies)}")
+
+    if triage is not None:
+        print(f"pre-análisis: {triage['accepted']} encolados, {triage['skipped']} omitidos, "
+              f"cola vacía en {triage['elapsed']:.2f} s")
+        print(f"  latencia por solicitud: {_percentiles(triage['latencies'])}")
+
+    from app.services.telemetry import TelemetryRegistry
+    stats = TelemetryRegistry.get(args.provider).snapshot()
+    print(f"proveedor: {stats['calls']} intentos, {stats['errors']} fallidos, "
+          f"promedio {stats['avg_latency'] * 1000:.1f} ms")
+
+    print(f"memoria: RSS {rss_before:.1f} → {_rss_mb():.1f} MB", end='')
+    if args.tracemalloc:
+        _, peak = tracemalloc.get_traced_memory()
+        print(f", pico Python {peak / 2 ** 20:.1f} MB", end='')
+    print()
+
+
+if __name__ == "__main__":
+    main()
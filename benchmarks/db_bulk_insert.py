@@ -0,0 +1,161 @@
+"""
+Benchmark de carga masiva en la tabla requests.
+
+Con PostgreSQL (DATABASE_URL o --dsn) compara un INSERT por fila, bulk_insert
+(execute_values) y copy_insert (COPY FROM STDIN) de utils.database.Database,
+sobre una copia temporal de la tabla requests. Sin PostgreSQL disponible solo
+mide en SQLite un INSERT y un commit por fila contra executemany por bloques:
+da una idea del costo de confirmar fila por fila, pero no ejecuta
+bulk_insert ni copy_insert y no dice nada de su rendimiento. Ejecutar desde la
+raíz del proyecto:
+
+    DATABASE_URL=postgresql://... python benchmarks/db_bulk_insert.py --rows 20000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+import psycopg2
+from psycopg2.extras import Json
+
+COLUMNS = ['user_data', 'type', 'status', 'created_at']
+TYPES = ['Calibración de Balanzas', 'Calibración de Termómetros', 'Verificación de Balanzas']
+STATUSES = ['pending', 'approved', 'in_progress', 'completed']
+
+
+def generate_rows(count: int, seed: int = 1) -> Iterator[Dict]:
+    """Solicitudes históricas sintéticas"""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    for i in range(count):
+        yield {
+            'user_data': {
+                'client': f'Cliente {rng.randint(1, 500)}',
+                'contact': 'Juan Pérez',
+                'email': f'contacto{i}@lab.com',
+                'equipment': {'model': f'XPE{rng.randint(100, 999)}', 'serial': f'B{i:09d}'}
+            },
+            'type': rng.choice(TYPES),
+            'status': rng.choice(STATUSES),
+            'created_at': start + timedelta(minutes=17 * i)
+        }
+
+
+def _report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<32} {count:>8} filas  {elapsed:8.3f} s  {count / elapsed:10.0f} filas/s")
+
+
+def _connect(dsn: Optional[str]):
+    if not dsn:
+        return None
+    try:
+        return psycopg2.connect(dsn, connect_timeout=3)
+    except psycopg2.Error as e:
+        print(f"PostgreSQL no disponible ({str(e).strip()}); se usa SQLite")
+        return None
+
+
+def run_postgres(dsn: str, rows: int, row_by_row: int) -> None:
+    os.environ["DATABASE_URL"] = dsn
+    from utils.database import Database
+
+    db = Database()
+    table = "bench_requests"
+    with db.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+            cur.execute(f"CREATE TABLE {table} (LIKE requests INCLUDING ALL)")
+    try:
+        start = time.perf_counter()
+        with db.connection() as conn:
+            with conn.cursor() as cur:
+                for row in generate_rows(row_by_row):
+                    cur.execute(
+                        f"INSERT INTO {table} (user_data, type, status, created_at) "
+                        f"VALUES (%s, %s, %s, %s) RETURNING id",
+                        (Json(row['user_data']), row['type'],
+                         row['status'], row['created_at'])
+                    )
+                    cur.fetchone()
+        _report("INSERT por fila", row_by_row, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ids = db.bulk_insert(table, generate_rows(rows), COLUMNS)
+        _report("bulk_insert (VALUES)", len(ids), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        count = db.copy_insert(table, generate_rows(rows), COLUMNS)
+        _report("copy_insert (COPY)", count, time.perf_counter() - start)
+    finally:
+        with db.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def run_sqlite(rows: int, row_by_row: int, chunk_size: int) -> None:
+    import json
+
+    print("AVISO: referencia en SQLite con sqlite3; no mide bulk_insert ni copy_insert "
+          "de utils.database (requieren PostgreSQL)")
+    path = Path(tempfile.mkdtemp()) / "bench.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE requests (id INTEGER PRIMARY KEY, user_data TEXT NOT NULL, "
+        "type TEXT NOT NULL, status TEXT NOT NULL, created_at TIMESTAMP)"
+    )
+    insert = "INSERT INTO requests (user_data, type, status, created_at) VALUES (?, ?, ?, ?)"
+
+    def values(row: Dict):
+        return (json.dumps(row['user_data'], ensure_ascii=False), row['type'],
+                row['status'], row['created_at'].isoformat())
+
+    start = time.perf_counter()
+    for row in generate_rows(row_by_row):
+        conn.execute(insert, values(row))
+        conn.commit()
+    _report("sqlite3 INSERT + commit/fila", row_by_row, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batch = []
+    for row in generate_rows(rows):
+        batch.append(values(row))
+        if len(batch) == chunk_size:
+            conn.executemany(insert, batch)
+            conn.commit()
+            batch = []
+    if batch:
+        conn.executemany(insert, batch)
+        conn.commit()
+    _report(f"sqlite3 executemany ({chunk_size}/tx)", rows, time.perf_counter() - start)
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--row-by-row", type=int, default=2000,
+                        help="filas a medir con un INSERT por fila")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    conn = _connect(args.dsn)
+    if conn is not None:
+        conn.close()
+        run_postgres(args.dsn, args.rows, args.row_by_row)
+    else:
+        run_sqlite(args.rows, args.row_by_row, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
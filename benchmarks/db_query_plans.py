@@ -0,0 +1,272 @@
+"""
+Benchmark de planes de consulta sobre requests/certificates, con y sin índices.
+
+Con PostgreSQL (DATABASE_URL o --dsn) crea las tablas de utils.database
+(SCHEMA_QUERIES) en un esquema temporal, las carga, y corre con EXPLAIN
+ANALYZE las consultas típicas (estado con rango de fechas, tipo, join de
+certificados por request_id y búsquedas por cliente y número de serie en
+user_data) antes y después de crear INDEX_QUERIES. Muestra los nodos de cada
+plan (Seq Scan contra Index/Bitmap Scan) y el tiempo de ejecución.
+
+Sin PostgreSQL disponible repite la comparación de los índices B-tree en
+SQLite con EXPLAIN QUERY PLAN; SQLite no tiene índices GIN, así que las
+búsquedas en user_data siguen recorriendo la tabla. Ejecutar desde la raíz:
+
+    DATABASE_URL=postgresql://... python benchmarks/db_query_plans.py --rows 200000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from utils.database import INDEX_QUERIES, SCHEMA_QUERIES
+
+SCHEMA = "bench_plans"
+START = datetime(2023, 1, 1)
+# Tipos con frecuencias desiguales, como en producción: los raros son los
+# que el índice por tipo acelera
+TYPES = [
+    ('Calibración de Balanzas', 45),
+    ('Calibración de Termómetros', 30),
+    ('Verificación de Balanzas', 15),
+    ('Calibración de Pesas', 6),
+    ('Mantenimiento Preventivo', 3),
+    ('Calibración de Manómetros', 1)
+]
+STATUSES = [('completed', 70), ('approved', 10), ('in_progress', 10), ('pending', 10)]
+
+
+def generate_rows(count: int, seed: int = 1) -> Iterator[Dict[str, Any]]:
+    """Solicitudes históricas sintéticas, una cada 5 minutos desde START"""
+    rng = random.Random(seed)
+    types, type_weights = zip(*TYPES)
+    statuses, status_weights = zip(*STATUSES)
+    for i in range(count):
+        yield {
+            'user_data': {
+                'client': f'Cliente {rng.randint(1, 2000)}',
+                'contact': 'Juan Pérez',
+                'email': f'contacto{i}@lab.com',
+                'equipment': {'model': f'XPE{rng.randint(100, 999)}', 'serial': f'B{i:09d}'}
+            },
+            'type': rng.choices(types, type_weights)[0],
+            'status': rng.choices(statuses, status_weights)[0],
+            'created_at': START + timedelta(minutes=5 * i)
+        }
+
+
+def _queries(rows: int) -> List[Tuple[str, str, str, Tuple]]:
+    """(nombre, SQL PostgreSQL, SQL SQLite, parámetros) de cada consulta medida"""
+    end = START + timedelta(minutes=5 * rows)
+    month = (end - timedelta(days=30), end)
+    week = (end - timedelta(days=7), end)
+    serial = f'B{rows // 2:09d}'
+    return [
+        ("estado + fechas",
+         "SELECT id, type, created_at FROM requests WHERE status = %s "
+         "AND created_at >= %s AND created_at < %s ORDER BY created_at DESC",
+         "SELECT id, type, created_at FROM requests WHERE status = ? "
+         "AND created_at >= ? AND created_at < ? ORDER BY created_at DESC",
+         ('pending',) + month),
+        ("tipo",
+         "SELECT count(*) FROM requests WHERE type = %s",
+         "SELECT count(*) FROM requests WHERE type = ?",
+         ('Calibración de Manómetros',)),
+        ("join certificados",
+         "SELECT r.id, c.file_path FROM requests r "
+         "JOIN certificates c ON c.request_id = r.id "
+         "WHERE r.status = %s AND r.created_at >= %s AND r.created_at < %s",
+         "SELECT r.id, c.file_path FROM requests r "
+         "JOIN certificates c ON c.request_id = r.id "
+         "WHERE r.status = ? AND r.created_at >= ? AND r.created_at < ?",
+         ('completed',) + week),
+        ("cliente (user_data)",
+         "SELECT id FROM requests WHERE user_data @> %s",
+         "SELECT id FROM requests WHERE json_extract(user_data, '$.client') = ?",
+         ({'client': 'Cliente 42'},)),
+        ("serie (user_data)",
+         "SELECT id FROM requests WHERE user_data @> %s",
+         "SELECT id FROM requests WHERE json_extract(user_data, '$.equipment.serial') = ?",
+         ({'equipment': {'serial': serial}},))
+    ]
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """Nodos de acceso a tablas de un plan JSON de EXPLAIN"""
+    nodes = []
+    if 'Relation Name' in plan or 'Index Name' in plan:
+        target = plan.get('Index Name') or plan['Relation Name']
+        nodes.append(f"{plan['Node Type']} on {target}")
+    for child in plan.get('Plans', []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def _report(phase: str, results: List[Tuple[str, List[str], float]]) -> None:
+    print(f"\n{phase}")
+    for name, nodes, elapsed in results:
+        print(f"  {name:<22} {elapsed * 1000:9.2f} ms  {'; '.join(nodes)}")
+
+
+def _connect(dsn: Optional[str]):
+    if not dsn:
+        return None
+    try:
+        return psycopg2.connect(dsn, connect_timeout=3)
+    except psycopg2.Error as e:
+        print(f"PostgreSQL no disponible ({str(e).strip()}); se usa SQLite")
+        return None
+
+
+def _explain_postgres(conn, queries, show_plans: bool) -> List[Tuple[str, List[str], float]]:
+    results = []
+    with conn.cursor() as cur:
+        for name, query, _, params in queries:
+            params = tuple(Json(p) if isinstance(p, dict) else p for p in params)
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+            explain = cur.fetchone()[0][0]
+            results.append((name, _plan_nodes(explain['Plan']),
+                            explain['Execution Time'] / 1000))
+            if show_plans:
+                cur.execute("EXPLAIN ANALYZE " + query, params)
+                print('\n'.join(row[0] for row in cur.fetchall()))
+    return results
+
+
+def run_postgres(conn, rows: int, show_plans: bool) -> None:
+    """Carga un esquema temporal y compara los planes sin y con índices"""
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        # Las sentencias de utils.database no califican el esquema
+        cur.execute(f"SET search_path TO {SCHEMA}")
+    try:
+        with conn.cursor() as cur:
+            for query in SCHEMA_QUERIES:
+                cur.execute(query)
+            start = time.perf_counter()
+            execute_values(
+                cur,
+                "INSERT INTO requests (user_data, type, status, created_at) VALUES %s",
+                ((Json(r['user_data']), r['type'], r['status'], r['created_at'])
+                 for r in generate_rows(rows)),
+                page_size=5000
+            )
+            cur.execute(
+                "INSERT INTO certificates (request_id, file_path, created_at) "
+                "SELECT id, 'certificados/' || id || '.pdf', created_at + interval '2 days' "
+                "FROM requests WHERE status = 'completed'"
+            )
+            cur.execute("ANALYZE requests")
+            cur.execute("ANALYZE certificates")
+            print(f"{rows} solicitudes cargadas en {time.perf_counter() - start:.1f} s")
+
+        queries = _queries(rows)
+        _report("sin índices", _explain_postgres(conn, queries, show_plans))
+
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            for query in INDEX_QUERIES:
+                cur.execute(query)
+            cur.execute("ANALYZE requests")
+            cur.execute("ANALYZE certificates")
+            cur.execute(
+                "SELECT indexrelname, pg_size_pretty(pg_relation_size(indexrelid)) "
+                "FROM pg_stat_user_indexes WHERE schemaname = %s ORDER BY 1", (SCHEMA,)
+            )
+            sizes = cur.fetchall()
+        print(f"\níndices creados en {time.perf_counter() - start:.1f} s: "
+              + ', '.join(f"{name} {size}" for name, size in sizes))
+        _report("con índices", _explain_postgres(conn, queries, show_plans))
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+def _explain_sqlite(conn, queries, repeat: int) -> List[Tuple[str, List[str], float]]:
+    results = []
+    for name, _, query, params in queries:
+        params = tuple(
+            (p.get('client') or p['equipment']['serial']) if isinstance(p, dict)
+            else p.isoformat(' ') if isinstance(p, datetime) else p
+            for p in params
+        )
+        nodes = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(query, params).fetchall()
+        results.append((name, nodes, (time.perf_counter() - start) / repeat))
+    return results
+
+
+def run_sqlite(rows: int, repeat: int) -> None:
+    path = Path(tempfile.mkdtemp()) / "bench.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE requests (id INTEGER PRIMARY KEY, user_data TEXT NOT NULL, "
+        "type TEXT NOT NULL, status TEXT NOT NULL, created_at TIMESTAMP)"
+    )
+    conn.execute(
+        "CREATE TABLE certificates (id INTEGER PRIMARY KEY, "
+        "request_id INTEGER REFERENCES requests(id), file_path TEXT NOT NULL, "
+        "created_at TIMESTAMP)"
+    )
+    start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO requests (user_data, type, status, created_at) VALUES (?, ?, ?, ?)",
+        ((json.dumps(r['user_data'], ensure_ascii=False), r['type'], r['status'],
+          r['created_at'].isoformat(' ')) for r in generate_rows(rows))
+    )
+    conn.execute(
+        "INSERT INTO certificates (request_id, file_path, created_at) "
+        "SELECT id, 'certificados/' || id || '.pdf', created_at "
+        "FROM requests WHERE status = 'completed'"
+    )
+    conn.commit()
+    print(f"{rows} solicitudes cargadas en {time.perf_counter() - start:.1f} s")
+
+    queries = _queries(rows)
+    _report("sin índices", _explain_sqlite(conn, queries, repeat))
+    # Mismos índices B-tree que INDEX_QUERIES; el GIN no existe en SQLite
+    for query in INDEX_QUERIES:
+        if "USING GIN" not in query:
+            conn.execute(query)
+    conn.execute("ANALYZE")
+    _report("con índices B-tree (sin GIN)", _explain_sqlite(conn, queries, repeat))
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="repeticiones por consulta en SQLite")
+    parser.add_argument("--show-plans", action="store_true",
+                        help="imprimir el EXPLAIN ANALYZE completo (PostgreSQL)")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    conn = _connect(args.dsn)
+    if conn is not None:
+        run_postgres(conn, args.rows, args.show_plans)
+    else:
+        run_sqlite(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark del pool HTTP keep-alive contra un servidor local simulado.
+
+Compara una conexión nueva por solicitud (como hacía cada llamada sin pool)
+con el HttpClient compartido, y reporta cuántas conexiones aceptó el
+servidor. Con --tls se usa un certificado autofirmado generado con openssl,
+de modo que la diferencia incluye el handshake TLS. Ejecutar desde la raíz:
+
+    python benchmarks/http_keepalive.py --requests 500 --threads 8 --tls
+"""
+import argparse
+import http.client
+import json
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from app.services.http_transport import HttpClient
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    """Responde como un endpoint de completions, con keep-alive"""
+
+    protocol_version = "HTTP/1.1"
+    # Sin esto, encabezados y cuerpo van en escrituras separadas y el ACK
+    # diferido agrega ~40 ms a cada solicitud sobre una conexión reutilizada
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        body = json.dumps({"choices": [{"text": str(payload.get("prompt", "")).upper()}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    """Servidor que cuenta las conexiones TCP aceptadas"""
+
+    daemon_threads = True
+
+    def __init__(self, *args, ssl_context: Optional[ssl.SSLContext] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ssl_context = ssl_context
+        self.accepted = 0
+        self._count_lock = threading.Lock()
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        with self._count_lock:
+            self.accepted += 1
+        if self.ssl_context is not None:
+            sock = self.ssl_context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False)
+        return sock, addr
+
+
+def _self_signed_context(workdir: Path) -> ssl.SSLContext:
+    cert, key = workdir / "cert.pem", workdir / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def _run(name: str, server: CountingServer, count: int, threads: int,
+         call: Callable[[int], None]) -> None:
+    accepted_before = server.accepted
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(count)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {count:>6} solicitudes  {elapsed:8.3f} s  "
+          f"{count / elapsed:10.1f} req/s  {server.accepted - accepted_before:>6} conexiones")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tls", action="store_true", help="usar HTTPS con certificado autofirmado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_context = _self_signed_context(Path(tmp)) if args.tls else None
+        server = CountingServer(("127.0.0.1", 0), MockCompletionHandler, ssl_context=server_context)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        scheme = "https" if args.tls else "http"
+        host, port = server.server_address[:2]
+        url = f"{scheme}://{host}:{port}/v1/completions"
+        client_context = ssl._create_unverified_context() if args.tls else None
+        body = lambda i: json.dumps({"prompt": f"balanza {i}"}).encode()
+        headers = {"Content-Type": "application/json"}
+
+        def new_connection_call(i: int) -> None:
+            if args.tls:
+                conn = http.client.HTTPSConnection(host, port, context=client_context)
+            else:
+                conn = http.client.HTTPConnection(host, port)
+            try:
+                conn.request("POST", "/v1/completions", body=body(i), headers=headers)
+                conn.getresponse().read()
+            finally:
+                conn.close()
+
+        client = HttpClient(max_connections=args.threads, max_keepalive=args.threads,
+                            ssl_context=client_context)
+
+        def pooled_call(i: int) -> None:
+            client.post_json(url, {"prompt": f"balanza {i}"})
+
+        print(f"Servidor simulado en {url}")
+        _run("conexión por solicitud", server, args.requests, args.threads, new_connection_call)
+        _run("pool keep-alive", server, args.requests, args.threads, pooled_call)
+
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
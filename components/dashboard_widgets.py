@@ -44,22 +44,6 @@ def show_requests_timeline(self) -> None:
         ))
         st.plotly_chart(fig)
 
-    def show_provider_stats(self) -> None:
-        st.subheader("Estadísticas por Proveedor")
-        providers = {
-            'openai': {'requests': 0, 'success': 0},
-            'vertex': {'requests': 0, 'success': 0},
-            'sambanova': {'requests': 0, 'success': 0}
-        }
-
-        fig = go.Figure(data=[
-            go.Bar(name='Solicitudes', x=list(providers.keys()),
-                  y=[p['requests'] for p in providers.values()]),
-            go.Bar(name='Exitosas', x=list(providers.keys()),
-                  y=[p['success'] for p in providers.values()])
-        ])
-        st.plotly_chart(fig)
-
     def _calculate_success_rate(self) -> float:
         requests = self.solicitudes.get_requests()
         if not requests:
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+
+def pytest_sessionstart(session):
+    # La base de datos, los logs y los archivos de datos se crean relativos
+    # al directorio actual: las pruebas corren en uno temporal
+    os.chdir(tempfile.mkdtemp(prefix="acma-tests-"))
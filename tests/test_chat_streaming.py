@@ -0,0 +1,132 @@
+"""Streaming del chat con un proveedor simulado, a través de los envoltorios de ServiceFactory"""
+from typing import Iterator, List, Optional
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.factory import ServiceFactory
+from app.services.http_transport import HttpError
+from app.services.resilience import ResilientService
+from app.services.telemetry import TelemetryRegistry
+
+PROVIDER = "fake-stream"
+CHUNKS = ["Hola", ", ", "¿en qué ", "puedo ayudar?"]
+BEFORE = 'before'  # falla antes del primer fragmento
+AFTER = 'after'    # falla después del primer fragmento
+
+
+class FakeStreamingService(AIServiceInterface):
+    """
+    Proveedor que emite CHUNKS. `failures` indica, por intento, si falla y
+    cuándo: (BEFORE o AFTER, excepción), o None para un intento exitoso.
+    """
+
+    model = "fake-1"
+    failures: List[Optional[tuple]] = []
+    attempts = 0
+
+    def get_completion(self, prompt: str) -> str:
+        return ''.join(self.stream_completion(prompt))
+
+    def process_request(self, request_data: dict) -> dict:
+        return {"response": self.get_completion(str(request_data))}
+
+    def stream_completion(self, prompt: str) -> Iterator[str]:
+        cls = type(self)
+        cls.attempts += 1
+        failure = cls.failures.pop(0) if cls.failures else None
+        if failure and failure[0] == BEFORE:
+            raise failure[1]
+        for i, chunk in enumerate(CHUNKS):
+            if i == 1 and failure and failure[0] == AFTER:
+                raise failure[1]
+            yield chunk
+
+
+@pytest.fixture
+def service():
+    FakeStreamingService.failures = []
+    FakeStreamingService.attempts = 0
+    ServiceFactory.register_service(PROVIDER, FakeStreamingService)
+    service = ServiceFactory.get_service(PROVIDER)
+    assert isinstance(service, ResilientService)
+    service.retry_delay = 0.0
+    yield service
+    ServiceFactory.refresh(PROVIDER)
+    ServiceFactory._services.pop(PROVIDER, None)
+
+
+def _chat_app() -> None:
+    """Script de Streamlit que envía el mensaje pendiente del session_state"""
+    import streamlit as st
+
+    from app.components.chat import Chat
+
+    chat = Chat()
+    message = st.session_state.pop('test_message', None)
+    if message:
+        chat._handle_user_input(message)
+
+
+def _send(message: str) -> AppTest:
+    app = AppTest.from_function(_chat_app, default_timeout=30)
+    app.session_state['current_provider'] = PROVIDER
+    app.session_state['test_message'] = message
+    app.run()
+    assert not app.exception
+    return app
+
+
+def _saved_messages(app: AppTest) -> List[dict]:
+    from app.services.conversation_store import ConversationStore
+    return ConversationStore().get_messages(app.session_state['conversation_id'])
+
+
+def _assistant_text(app: AppTest) -> str:
+    return ''.join(block.value for block in app.chat_message[-1].markdown)
+
+
+def test_stream_passes_through_wrappers_in_order(service):
+    calls_before = TelemetryRegistry.get(PROVIDER).snapshot()['calls']
+
+    assert list(service.stream_completion("hola")) == CHUNKS
+    assert FakeStreamingService.attempts == 1
+    assert TelemetryRegistry.get(PROVIDER).snapshot()['calls'] == calls_before + 1
+
+
+def test_failure_before_first_chunk_is_retried(service):
+    FakeStreamingService.failures = [(BEFORE, HttpError(503, "no disponible"))]
+
+    assert list(service.stream_completion("hola")) == CHUNKS
+    assert FakeStreamingService.attempts == 2
+
+
+def test_failure_after_first_chunk_is_not_retried(service):
+    FakeStreamingService.failures = [(AFTER, HttpError(503, "corte"))]
+    received = []
+
+    with pytest.raises(HttpError):
+        for chunk in service.stream_completion("hola"):
+            received.append(chunk)
+    assert received == CHUNKS[:1]
+    assert FakeStreamingService.attempts == 1
+
+
+def test_chat_streams_and_saves_response(service):
+    app = _send("¿Qué incluye una calibración?")
+
+    assert _assistant_text(app) == ''.join(CHUNKS)
+    messages = _saved_messages(app)
+    assert [m['role'] for m in messages] == ['user', 'assistant']
+    assert messages[-1]['content'] == ''.join(CHUNKS)
+
+
+def test_chat_shows_error_when_provider_fails_before_first_chunk(service):
+    # Error no reintentable: se muestra la disculpa en lugar de la respuesta
+    FakeStreamingService.failures = [(BEFORE, ValueError("prompt inválido"))]
+
+    app = _send("Mensaje que falla")
+
+    assert _assistant_text(app).startswith("Lo siento")
+    assert FakeStreamingService.attempts == 1
@@ -0,0 +1,40 @@
+"""Límites de cuota con un backend Redis lento"""
+import asyncio
+import time
+
+from app.services.rate_limiter import RateLimiter
+
+REDIS_DELAY = 0.5
+
+
+class SlowRedisBuckets:
+    """Sustituto de RedisBuckets cuya llamada bloquea como un Redis que no responde"""
+
+    calls = 0
+
+    def try_acquire(self, amounts, force=False) -> float:
+        type(self).calls += 1
+        time.sleep(REDIS_DELAY)
+        return 0.0
+
+
+def test_slow_redis_does_not_block_event_loop():
+    limiter = RateLimiter("slow-redis", 600, 0)
+    limiter.buckets = SlowRedisBuckets()
+    ticks = []
+
+    async def ticker() -> None:
+        # Otro proveedor en el mismo loop: debe seguir avanzando
+        end = time.monotonic() + REDIS_DELAY
+        while time.monotonic() < end:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(limiter.aacquire(10), ticker())
+
+    asyncio.run(main())
+    assert SlowRedisBuckets.calls == 1
+    # Con la llamada a Redis en el loop, el ticker quedaría detenido medio segundo
+    assert len(ticks) > 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < REDIS_DELAY / 2
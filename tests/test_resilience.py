@@ -0,0 +1,73 @@
+"""Plazos de ResilientService con un proveedor que nunca responde"""
+import threading
+import time
+
+import pytest
+
+from app.services import resilience
+from app.services.ai_service_interface import AIServiceInterface
+from app.services.resilience import (AttemptPool, AttemptTimeout, ProviderSaturated,
+                                     ResilientService)
+
+TIMEOUT = 0.3
+
+
+class HangingService(AIServiceInterface):
+    """Proveedor cuyas llamadas quedan colgadas hasta que se libera `release`"""
+
+    release = threading.Event()
+
+    def get_completion(self, prompt: str) -> str:
+        self.release.wait()
+        return prompt
+
+    def process_request(self, request_data: dict) -> dict:
+        return {"response": self.get_completion(str(request_data))}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = AttemptPool(2)
+    monkeypatch.setattr(resilience, "_executor", pool)
+    HangingService.release.clear()
+    yield pool
+    HangingService.release.set()
+
+
+def _service(max_abandoned: int) -> ResilientService:
+    service = ResilientService("hanging", HangingService())
+    service.timeout = TIMEOUT
+    service.max_retries = 0
+    service.max_abandoned = max_abandoned
+    return service
+
+
+def _timed_call(service: ResilientService) -> float:
+    start = time.monotonic()
+    with pytest.raises((AttemptTimeout, ProviderSaturated)):
+        service.process_request({"id": 1})
+    return time.monotonic() - start
+
+
+def test_pool_exhausted_by_hung_calls_still_times_out(pool):
+    service = _service(max_abandoned=100)
+    # Las dos primeras llamadas dejan colgados los dos hilos del pool
+    assert _timed_call(service) < 2 * TIMEOUT
+    assert _timed_call(service) < 2 * TIMEOUT
+    # Sin hilos libres, la espera en cola también respeta el plazo
+    assert _timed_call(service) < 2 * TIMEOUT
+    assert all(thread.daemon for thread in pool._threads)
+
+
+def test_abandoned_attempts_cap_fails_fast(pool):
+    service = _service(max_abandoned=1)
+    assert _timed_call(service) < 2 * TIMEOUT
+    with pytest.raises(ProviderSaturated):
+        service.process_request({"id": 2})
+
+    # Cuando la llamada colgada termina, el proveedor vuelve a aceptar intentos
+    HangingService.release.set()
+    deadline = time.monotonic() + 2
+    while service._abandoned and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.process_request({"id": 3}) == {"response": "{'id': 3}"}
@@ -0,0 +1,46 @@
+"""Sketches de tiempos de atención escritos por varios procesos en un mismo directorio"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.services.turnaround_metrics import TURNAROUND, TurnaroundMetrics
+
+ROOT = Path(__file__).resolve().parent.parent
+PER_PROCESS = 50
+
+RECORD_SCRIPT = f"""
+from datetime import datetime, timedelta
+from app.services.turnaround_metrics import TurnaroundMetrics
+
+metrics = TurnaroundMetrics()
+now = datetime.now()
+for i in range({PER_PROCESS}):
+    metrics.record_completed({{
+        'created_at': now - timedelta(hours=2 + i),
+        'started_at': now - timedelta(hours=1),
+        'completed_at': now,
+        'service_type': 'Calibración de Balanzas',
+        'urgency': 'Normal'
+    }})
+metrics.flush()
+"""
+
+
+def test_processes_sharing_a_directory_keep_their_own_sketches(tmp_path, monkeypatch):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    env.pop('ACMA_INSTANCE_ID', None)
+    processes = [
+        subprocess.Popen([sys.executable, "-c", RECORD_SCRIPT], cwd=tmp_path, env=env)
+        for _ in range(2)
+    ]
+    assert [process.wait(timeout=60) for process in processes] == [0, 0]
+    assert len(list((tmp_path / "data" / "sketches").glob("turnaround_*.json"))) == 2
+
+    # Una instancia más (este proceso) ve lo registrado por ambos
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('ACMA_INSTANCE_ID', raising=False)
+    reader = object.__new__(TurnaroundMetrics)
+    reader._initialize()
+    merged = reader.get_merged()
+    assert merged[(TURNAROUND, 'all', '*')].count == 2 * PER_PROCESS
@@ -1,73 +1,503 @@
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions, sql
+from psycopg2.extras import Json, RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
 from config.configuration import Configuration
 from config.secrets_manager import SecretsManager
+from utils.logger import Logger
+from utils.monitoring import PerformanceMonitor
+
+# Valores por defecto si la configuración no los define
+DEFAULT_MIN_CONNECTIONS = 1
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_POOL_TIMEOUT = 30.0          # espera máxima por una conexión libre
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # ociosidad a partir de la cual se verifica
+DEFAULT_CONNECT_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 0.5
+MAX_RETRY_BACKOFF = 10.0
+DEFAULT_STREAM_BATCH_SIZE = 2000
+DEFAULT_BULK_CHUNK_SIZE = 1000    # filas por sentencia y por transacción
+DEFAULT_COPY_CHUNK_SIZE = 50000   # filas por transacción con COPY
+
+SCHEMA_QUERIES = [
+    """
+    CREATE TABLE IF NOT EXISTS requests (
+        id SERIAL PRIMARY KEY,
+        user_data JSONB NOT NULL,
+        type VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS certificates (
+        id SERIAL PRIMARY KEY,
+        request_id INTEGER REFERENCES requests(id),
+        file_path VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+]
+
+# Índices secundarios. (status, created_at) cubre los filtros por estado con
+# rango de fechas y el orden por fecha; PostgreSQL no indexa solo las claves
+# foráneas, de ahí certificates.request_id. El GIN con jsonb_path_ops solo
+# sirve al operador @> (p. ej. user_data @> '{"client": "..."}'), a cambio de
+# ser más chico y rápido que el jsonb_ops por defecto.
+# Nota: en tablas ya pobladas CREATE INDEX bloquea las escrituras mientras se
+# construye; en producción conviene crearlos antes con CREATE INDEX CONCURRENTLY.
+INDEX_QUERIES = [
+    "CREATE INDEX IF NOT EXISTS ix_requests_status_created_at ON requests (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_requests_type ON requests (type)",
+    "CREATE INDEX IF NOT EXISTS ix_certificates_request_id ON certificates (request_id)",
+    "CREATE INDEX IF NOT EXISTS ix_requests_user_data ON requests "
+    "USING GIN (user_data jsonb_path_ops)"
+]
+
+# Errores que indican una conexión rota, no un error de la consulta
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Valor de las columnas que falten en una fila de bulk_insert: respeta el
+# DEFAULT de la columna (p. ej. created_at) en lugar de insertar NULL
+_COLUMN_DEFAULT = extensions.AsIs('DEFAULT')
+
+
+def _adapt(value: Any) -> Any:
+    """Envuelve dicts y listas para que se guarden como JSONB"""
+    if isinstance(value, (dict, list)):
+        return Json(value)
+    return value
+
+
+def _copy_value(value: Any) -> str:
+    """Codifica un valor en el formato de texto de COPY"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        text = 't' if value else 'f'
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, (datetime, date)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class _CopyStream:
+    """
+    Archivo de solo lectura para copy_expert que codifica las filas a
+    medida que PostgreSQL las lee, sin materializar el lote completo.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], columns: Sequence[str]):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._buffer = bytearray()
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            missing = [column for column in self._columns if column not in row]
+            if missing:
+                # COPY no tiene DEFAULT por fila: escribir \N guardaría NULL
+                raise ValueError(f"Fila {self.count + 1} del bloque sin columnas "
+                                 f"{', '.join(missing)}")
+            line = '\t'.join(_copy_value(row[column]) for column in self._columns)
+            self._buffer += (line + '\n').encode('utf-8')
+            self.count += 1
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class PoolTimeout(Exception):
+    """No hubo una conexión libre dentro del plazo"""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones psycopg2 con espera acotada y verificación de salud.
+
+    ThreadedConnectionPool falla de inmediato cuando todas las conexiones
+    están en uso; aquí un semáforo hace esperar turno hasta `timeout`
+    segundos. Al entregar una conexión que estuvo ociosa más de
+    health_check_interval segundos se verifica con SELECT 1, y si está rota
+    se descarta y se abre otra, reintentando con backoff exponencial.
+    """
+
+    def __init__(self, dsn: str, min_connections: int = DEFAULT_MIN_CONNECTIONS,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 timeout: float = DEFAULT_POOL_TIMEOUT,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 connect_retries: int = DEFAULT_CONNECT_RETRIES,
+                 retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 monitor: Optional[PerformanceMonitor] = None):
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.connect_retries = connect_retries
+        self.retry_backoff = retry_backoff
+        self.monitor = monitor or PerformanceMonitor()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._last_used: Dict[int, float] = {}
+        self._in_use = 0
+        self._reconnects = 0
+        self._lock = threading.Lock()
+        self._pool = self._with_retries(
+            lambda: ThreadedConnectionPool(min_connections, max_connections, dsn,
+                                           cursor_factory=RealDictCursor)
+        )
+
+    def _with_retries(self, connect):
+        """Ejecuta `connect` reintentando errores de conexión con backoff y jitter"""
+        attempt = 0
+        while True:
+            try:
+                return connect()
+            except CONNECTION_ERRORS as e:
+                attempt += 1
+                if attempt > self.connect_retries:
+                    raise
+                delay = min(MAX_RETRY_BACKOFF, self.retry_backoff * 2 ** (attempt - 1))
+                Logger.warning(f"Conexión a la base de datos fallida (intento {attempt}), "
+                               f"reintentando en {delay:.1f}s: {e}")
+                time.sleep(random.uniform(delay / 2, delay))
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        # Una conexión recién abierta no necesita verificación
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    def _checkout(self):
+        conn = self._with_retries(self._pool.getconn)
+        while not self._healthy(conn):
+            self._discard(conn)
+            with self._lock:
+                self._reconnects += 1
+            self.monitor.record_metric('db.pool.reconnects', 1)
+            Logger.warning("Conexión a la base de datos rota; se reemplaza")
+            conn = self._with_retries(self._pool.getconn)
+        return conn
+
+    def _discard(self, conn) -> None:
+        self._last_used.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except Exception as e:
+            Logger.error(f"Error descartando conexión: {e}")
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Presta una conexión sana por la duración del bloque.
+
+        Al salir sin errores confirma la transacción; con un error la
+        revierte, y si el error fue de conexión la descarta del pool.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            self.monitor.record_metric('db.pool.timeouts', 1)
+            raise PoolTimeout(f"Sin conexiones libres tras {self.timeout:.0f}s")
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        self.monitor.record_metric('db.pool.wait_seconds', time.perf_counter() - start)
+        with self._lock:
+            self._in_use += 1
+
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            if broken or conn.closed or \
+                    conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._discard(conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Conexiones en uso, reconexiones y espera por una conexión (p50/p99, s)"""
+        with self._lock:
+            in_use, reconnects = self._in_use, self._reconnects
+        return {
+            'in_use': in_use,
+            'max_connections': self.max_connections,
+            'reconnects': reconnects,
+            'wait_p50': self.monitor.percentile('db.pool.wait_seconds', 50),
+            'wait_p99': self.monitor.percentile('db.pool.wait_seconds', 99)
+        }
+
+    def close(self) -> None:
+        self._pool.closeall()
+
 
 class Database:
     _instance = None
-    
+    _instance_lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialize()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
-    
+
     def _initialize(self):
         self.config = Configuration()
-        self.conn = None
-        self._connect()
-        
-    def _connect(self):
+        self.monitor = PerformanceMonitor()
+        self.pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
         try:
-            db_url = SecretsManager.get_secret("DATABASE_URL") or \
-                     self.config.get_setting("database_url")
-            
-            self.conn = psycopg2.connect(
-                db_url,
-                cursor_factory=RealDictCursor
-            )
-            self._create_tables()
+            self._connect()
         except Exception as e:
-            print(f"Error de conexión: {e}")
-    
-    def _create_tables(self):
-        queries = [
-            """
-            CREATE TABLE IF NOT EXISTS requests (
-                id SERIAL PRIMARY KEY,
-                user_data JSONB NOT NULL,
-                type VARCHAR(50) NOT NULL,
-                status VARCHAR(20) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS certificates (
-                id SERIAL PRIMARY KEY,
-                request_id INTEGER REFERENCES requests(id),
-                file_path VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        ]
-        
-        with self.conn.cursor() as cur:
-            for query in queries:
+            Logger.error(f"Error de conexión: {e}")
+
+    def _connect(self) -> ConnectionPool:
+        with self._pool_lock:
+            if self.pool is None:
+                db_url = SecretsManager.get_secret("DATABASE_URL") or \
+                         self.config.get_setting("database_url")
+                settings = self.config.get_setting("database_pool") or {}
+                pool = ConnectionPool(
+                    db_url,
+                    min_connections=int(settings.get("min_connections", DEFAULT_MIN_CONNECTIONS)),
+                    max_connections=int(settings.get("max_connections", DEFAULT_MAX_CONNECTIONS)),
+                    timeout=float(settings.get("timeout", DEFAULT_POOL_TIMEOUT)),
+                    health_check_interval=float(settings.get(
+                        "health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL)),
+                    connect_retries=int(settings.get("connect_retries", DEFAULT_CONNECT_RETRIES)),
+                    retry_backoff=float(settings.get("retry_backoff", DEFAULT_RETRY_BACKOFF)),
+                    monitor=self.monitor
+                )
+                with pool.connection() as conn:
+                    self._create_tables(conn)
+                self.pool = pool
+            return self.pool
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Conexión del pool para varias consultas en una misma transacción"""
+        pool = self.pool or self._connect()
+        with pool.connection() as conn:
+            yield conn
+
+    def _create_tables(self, conn):
+        with conn.cursor() as cur:
+            for query in SCHEMA_QUERIES + INDEX_QUERIES:
                 cur.execute(query)
-        self.conn.commit()
-    
+
     def execute(self, query, params=None):
-        if not self.conn:
-            self._connect()
-            
-        with self.conn.cursor() as cur:
-            cur.execute(query, params or ())
-            return cur.fetchall()
-    
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params or ())
+                return cur.fetchall()
+
     def execute_one(self, query, params=None):
-        if not self.conn:
-            self._connect()
-            
-        with self.conn.cursor() as cur:
-            cur.execute(query, params or ())
-            return cur.fetchone() 
\ No newline at end of file
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params or ())
+                return cur.fetchone()
+
+    def execute_stream(self, query, params=None, batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+                       as_dicts: bool = True,
+                       batches: bool = False) -> Iterator[Union[Any, List[Any]]]:
+        """
+        Recorre el resultado de una consulta sin cargarlo completo en memoria.
+
+        Usa un cursor con nombre (del lado del servidor): PostgreSQL envía las
+        filas de a batch_size, así la memoria no depende del tamaño del
+        resultado. La conexión queda tomada del pool hasta agotar o cerrar el
+        generador.
+
+        Args:
+            query: Consulta SELECT
+            params: Parámetros de la consulta
+            batch_size: Filas por viaje al servidor
+            as_dicts: False para recibir tuplas, más livianas que los dicts
+            batches: True para recibir listas de hasta batch_size filas
+
+        Yields:
+            Filas, o lotes de filas si batches es True
+        """
+        cursor_factory = RealDictCursor if as_dicts else extensions.cursor
+        with self.connection() as conn:
+            with conn.cursor(name=f"acma_stream_{uuid.uuid4().hex}",
+                             cursor_factory=cursor_factory) as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params or ())
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if batches:
+                        yield rows
+                    else:
+                        yield from rows
+
+    def find_requests(self, criteria: Dict[str, Any], status: Optional[str] = None,
+                      limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Busca solicitudes cuyo user_data contiene `criteria`, usando el
+        índice GIN de user_data (operador @>).
+
+        Args:
+            criteria: Subdocumento a buscar, p. ej. {'client': 'Lab X'} o
+                {'equipment': {'serial': 'B123'}}
+            status: Filtra además por estado
+            limit: Máximo de filas, las más recientes primero
+
+        Returns:
+            Filas de requests
+        """
+        query = "SELECT * FROM requests WHERE user_data @> %s"
+        params: List[Any] = [Json(criteria)]
+        if status:
+            query += " AND status = %s"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT %s"
+        params.append(limit)
+        return self.execute(query, params)
+
+    def bulk_insert(self, table: str, rows: Iterable[Dict[str, Any]],
+                    columns: Optional[Sequence[str]] = None,
+                    chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+                    returning: Optional[str] = 'id') -> List[Any]:
+        """
+        Inserta filas con INSERT ... VALUES de varias filas por sentencia
+        (execute_values), en lugar de un viaje al servidor por fila.
+
+        Cada bloque de chunk_size filas se confirma en su propia transacción:
+        si uno falla se lanza el error y los bloques anteriores quedan
+        guardados. Los dicts y listas (p. ej. user_data) se guardan como JSONB.
+        Las columnas que falten en una fila toman su DEFAULT (no NULL); para
+        guardar NULL hay que pasar la clave con None.
+
+        Args:
+            table: Tabla destino
+            rows: Filas como dicts; se puede pasar un generador
+            columns: Columnas a insertar; por defecto las claves de la primera fila
+            chunk_size: Filas por sentencia y por transacción
+            returning: Columna a retornar por cada fila insertada (None para ninguna)
+
+        Returns:
+            Valores de la columna `returning` de las filas insertadas.
+            PostgreSQL no garantiza que RETURNING siga el orden de VALUES: para
+            emparejarlos con las filas, retornar una columna que las identifique
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return []
+        columns = list(columns or first.keys())
+        statement = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+            sql.Identifier(table), sql.SQL(', ').join(map(sql.Identifier, columns))
+        )
+        if returning:
+            statement += sql.SQL(" RETURNING {}").format(sql.Identifier(returning))
+
+        ids: List[Any] = []
+        rows = itertools.chain([first], rows)
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=extensions.cursor) as cur:
+                while True:
+                    chunk = [tuple(_adapt(row[column]) if column in row else _COLUMN_DEFAULT
+                                   for column in columns)
+                             for row in itertools.islice(rows, chunk_size)]
+                    if not chunk:
+                        break
+                    result = execute_values(cur, statement, chunk, page_size=chunk_size,
+                                            fetch=bool(returning))
+                    if returning:
+                        ids.extend(row[0] for row in result)
+                    conn.commit()
+        return ids
+
+    def copy_insert(self, table: str, rows: Iterable[Dict[str, Any]],
+                    columns: Sequence[str],
+                    chunk_size: int = DEFAULT_COPY_CHUNK_SIZE) -> int:
+        """
+        Inserta filas con COPY FROM STDIN, la vía más rápida para cargas
+        grandes. Las filas se codifican a medida que se envían, así un
+        generador se carga sin tenerlo completo en memoria. COPY no retorna
+        los ids generados; para obtenerlos usar bulk_insert.
+
+        Cada fila debe traer todas las columnas de `columns` (None se guarda
+        como NULL). COPY no admite DEFAULT por fila, así que una fila a la que
+        le falte alguna lanza ValueError y se revierte su bloque; los bloques
+        anteriores quedan guardados. Para que una columna tome su DEFAULT (p.
+        ej. created_at) hay que dejarla fuera de `columns`.
+
+        Args:
+            table: Tabla destino
+            rows: Filas como dicts
+            columns: Columnas a cargar, en orden
+            chunk_size: Filas por transacción
+
+        Returns:
+            Cantidad de filas insertadas
+        """
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table), sql.SQL(', ').join(map(sql.Identifier, columns))
+        )
+        rows = iter(rows)
+        total = 0
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                while True:
+                    stream = _CopyStream(itertools.islice(rows, chunk_size), columns)
+                    cur.copy_expert(statement, stream)
+                    if stream.count:
+                        conn.commit()
+                        total += stream.count
+                    if stream.count < chunk_size:
+                        break
+        return total
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estado del pool de conexiones"""
+        return self.pool.stats() if self.pool else {}
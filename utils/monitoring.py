@@ -1,24 +1,98 @@
-from datetime import datetime
+import threading
 import time
 from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096
+
+
+class RingBuffer:
+    """
+    Serie temporal de tamaño fijo (timestamp en ns, valor) sobre arreglos
+    NumPy preasignados. Al llenarse sobrescribe las muestras más antiguas.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero")
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def append(self, value: float, timestamp_ns: Optional[int] = None):
+        with self._lock:
+            self.timestamps[self._next] = time.time_ns() if timestamp_ns is None else timestamp_ns
+            self.values[self._next] = value
+            self._next = (self._next + 1) % self.capacity
+            if self.size < self.capacity:
+                self.size += 1
+
+    def window(self, seconds: Optional[float] = None) -> np.ndarray:
+        """Retorna los valores de los últimos `seconds` segundos (o todos)"""
+        with self._lock:
+            timestamps = self.timestamps[:self.size].copy()
+            values = self.values[:self.size].copy()
+        if seconds is None:
+            return values
+        cutoff = time.time_ns() - int(seconds * 1e9)
+        return values[timestamps >= cutoff]
+
 
 class PerformanceMonitor:
-    def __init__(self):
-        self.metrics = {}
-        
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.metrics: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, name: str) -> RingBuffer:
+        buffer = self.metrics.get(name)
+        if buffer is None:
+            with self._lock:
+                buffer = self.metrics.setdefault(name, RingBuffer(self.capacity))
+        return buffer
+
     def record_metric(self, name: str, value: float):
-        if name not in self.metrics:
-            self.metrics[name] = []
-        self.metrics[name].append({
-            'value': value,
-            'timestamp': datetime.now()
-        })
-        
+        self._buffer(name).append(value)
+
     @contextmanager
     def measure_time(self, operation_name: str):
-        start_time = time.time()
+        """Mide la duración del bloque y la registra en segundos"""
+        start = time.perf_counter_ns()
         try:
             yield
         finally:
-            duration = time.time() - start_time
-            self.record_metric(operation_name, duration)
+            self.record_metric(operation_name, (time.perf_counter_ns() - start) / 1e9)
+
+    def percentile(self, name: str, q: float, window: Optional[float] = None) -> Optional[float]:
+        """
+        Percentil q (0-100) de la métrica.
+
+        Args:
+            name: Nombre de la métrica
+            q: Percentil a calcular
+            window: Ventana en segundos; None usa todas las muestras retenidas
+        """
+        values = self._values(name, window)
+        return float(np.percentile(values, q)) if values.size else None
+
+    def mean(self, name: str, window: Optional[float] = None) -> Optional[float]:
+        """Promedio de la métrica en la ventana"""
+        values = self._values(name, window)
+        return float(values.mean()) if values.size else None
+
+    def rate(self, name: str, window: float) -> float:
+        """Muestras por segundo registradas en la ventana"""
+        if window <= 0:
+            raise ValueError("La ventana debe ser mayor que cero")
+        return self._values(name, window).size / window
+
+    def _values(self, name: str, window: Optional[float]) -> np.ndarray:
+        buffer = self.metrics.get(name)
+        if buffer is None:
+            return np.empty(0)
+        return buffer.window(window)